@@ -1,9 +1,12 @@
-from carbon import computation_logger, compute_footprints, logger
-from carbon.compute_footprints import Co2Cost
+import sys
+
+from carbon import cli, computation_logger, compute_footprints, logger
 from carbon.digital_carbon_framework import Framework
 from carbon.utils import Distribution
 
-if __name__ == "__main__":
+
+def demo():
+    """Show the costs of a few example campaigns."""
     logger.setLevel("INFO")
     computation_logger.setLevel("INFO")
 
@@ -52,8 +55,6 @@ if __name__ == "__main__":
     )
     print(results.shows())
 
-    test = Co2Cost(use=0.1, manufacturing=0.2)
-
     a = compute_footprints.bids_cost(campaign, nb_bids=1000)
     print(a.shows())
 
@@ -62,3 +63,9 @@ if __name__ == "__main__":
     )
 
     print(a.shows())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli.main())
+    demo()
@@ -0,0 +1,208 @@
+"""
+Computation of the Co2 cost of Apache Arrow record batches, read from and written to Parquet or Arrow IPC files.
+
+Requires pyarrow. Parquet files are read by :class:`pyarrow.parquet.ParquetFile`, which decodes a whole row group at a time
+and yields it as record batches, and the record batches of Arrow IPC files are sliced from the memory-mapped file.
+The memory used is thus bounded by the size of a row group or of an IPC record batch, whatever the size of the file.
+Numeric columns without missing values are read by NumPy without any copy, and the input columns are written back as
+is, next to the columns of the results, which are built over the NumPy arrays of the costs without any copy either.
+
+.. code-block:: python
+
+    from carbon import arrow
+
+    arrow.transform(framework, "impressions.parquet", "costs.parquet", arrow.BatchScorer(country_column="country"))
+"""
+
+import typing
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from carbon import batch, logger
+from carbon.digital_carbon_framework import Framework
+from carbon.streaming import KINDS, TOTAL_COLUMN, Kind
+
+Format = typing.Literal["parquet", "ipc"]
+
+BATCH_SIZE = 100_000
+"""Default number of rows per record batch."""
+
+
+def format_of(path: str) -> Format:
+    """Return the format of a file from its extension."""
+    if path.endswith((".parquet", ".pq")):
+        return "parquet"
+    if path.endswith((".arrow", ".feather", ".ipc")):
+        return "ipc"
+    raise ValueError(
+        f"Can not infer the format of {path}, expected a parquet or arrow file"
+    )
+
+
+def _numeric(array: pa.Array, name: str) -> np.ndarray:
+    """Return the values of a numeric column as float64, without copy if they already are."""
+    if array.type != pa.float64():
+        array = array.cast(pa.float64())
+    if array.null_count:
+        batch._raise_on_rows(
+            array.is_null().to_numpy(zero_copy_only=False), f"Missing value of {name}"
+        )
+    return array.to_numpy(zero_copy_only=True)
+
+
+def _text(array: pa.Array, name: str) -> np.ndarray:
+    """Return the values of a string column, decoded once per distinct value."""
+    if array.null_count:
+        batch._raise_on_rows(
+            array.is_null().to_numpy(zero_copy_only=False), f"Missing value of {name}"
+        )
+    if not pa.types.is_dictionary(array.type):
+        array = pc.dictionary_encode(array)
+    values = np.asarray(array.dictionary.to_pylist(), dtype=str)
+    return values[array.indices.to_numpy(zero_copy_only=False)]
+
+
+class BatchScorer(typing.NamedTuple):
+    """Compute the Co2 cost of record batches, appending the columns of the results to their columns."""
+
+    kind: Kind = "impressions"
+    country_column: str | None = None
+    """Column holding the target country of each row, as any code or name of :mod:`carbon.countries`. Defaults to the target country of the framework."""
+    details: bool = False
+    """Whether to append the use and manufacturing costs of every pillar, besides the total cost."""
+
+    @property
+    def output_columns(self) -> tuple[str, ...]:
+        """Columns appended to the record batches."""
+        columns = ()
+        if self.details:
+            columns += tuple(
+                f"{pillar}_{part}"
+                for pillar in KINDS[self.kind].result._fields
+                for part in ("use", "manufacturing")
+            )
+        return columns + (TOTAL_COLUMN,)
+
+    def schema(self, schema: pa.Schema) -> pa.Schema:
+        """Return the schema of the results of record batches of the given schema."""
+        for name in self.output_columns:
+            schema = schema.append(pa.field(name, pa.float64()))
+        return schema
+
+    def score(
+        self, framework: Framework, record_batch: pa.RecordBatch
+    ) -> pa.RecordBatch:
+        """
+        Return the record batch, with the columns of its costs appended.
+
+        Raises:
+            ValueError: if any row holds an invalid value, or a column is missing.
+            KeyError: if any country is not referenced.
+        """
+        kind = KINDS[self.kind]
+        names = record_batch.schema.names
+
+        def _column(name: str, convert: typing.Callable) -> typing.Any:
+            if name in names:
+                return convert(record_batch.column(name), name)
+            if name in kind.defaults:
+                return kind.defaults[name]
+            raise ValueError(f"Missing column {name!r}")
+
+        arguments = {name: _column(name, _numeric) for name in kind.numeric}
+        arguments.update({name: _column(name, _text) for name in kind.text})
+        if self.country_column is not None:
+            arguments["country"] = _column(self.country_column, _text)
+        costs = kind.function(framework, **arguments)
+
+        columns = []
+        if self.details:
+            columns.extend(costs.to_dict().values())
+        columns.append(costs.overall.total)
+        shape = (record_batch.num_rows,)
+        return pa.RecordBatch.from_arrays(
+            [
+                *record_batch.columns,
+                *(
+                    pa.array(np.ascontiguousarray(np.broadcast_to(column, shape)))
+                    for column in columns
+                ),
+            ],
+            schema=self.schema(record_batch.schema),
+        )
+
+
+def read_batches(
+    path: str, batch_size: int = BATCH_SIZE
+) -> tuple[pa.Schema, typing.Iterator[pa.RecordBatch]]:
+    """
+    Return the schema of a Parquet or Arrow IPC file, and an iterator over its record batches of at most ``batch_size`` rows.
+
+    The row groups of Parquet files are read and decoded whole, one at a time, then split into batches, and the batches
+    of IPC files are sliced from the memory-mapped file without any copy.
+    """
+    if format_of(path) == "parquet":
+        parquet = pq.ParquetFile(path, memory_map=True)
+        return parquet.schema_arrow, parquet.iter_batches(batch_size=batch_size)
+
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+
+    def _batches() -> typing.Iterator[pa.RecordBatch]:
+        for index in range(reader.num_record_batches):
+            record_batch = reader.get_batch(index)
+            for offset in range(0, record_batch.num_rows, batch_size):
+                yield record_batch.slice(offset, batch_size)
+
+    return reader.schema, _batches()
+
+
+def transform(
+    framework: Framework,
+    source: str,
+    destination: str,
+    scorer: BatchScorer | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Compute the Co2 cost of all the rows of a Parquet or Arrow IPC file, and write them with the costs to another file.
+
+    At most ``batch_size`` rows are held in memory at once, whatever the size of the file.
+
+    Args:
+        framework (Framework): Framework object
+        source (str): path of the rows to compute, a ``.parquet`` or ``.arrow`` file
+        destination (str): path of the results, a ``.parquet`` or ``.arrow`` file
+        scorer (BatchScorer, optional): columns to read and write. Defaults to the total cost of impressions.
+        batch_size (int, optional): number of rows computed at once. Defaults to 100 000.
+
+    Raises:
+        ValueError: if any row is invalid. The first row of its batch is given in the message.
+        KeyError: if any country is not referenced.
+
+    Returns:
+        int: the number of rows computed.
+    """
+    if scorer is None:
+        scorer = BatchScorer()
+    schema, batches = read_batches(source, batch_size)
+    schema = scorer.schema(schema)
+    if format_of(destination) == "parquet":
+        writer = pq.ParquetWriter(destination, schema)
+    else:
+        writer = pa.ipc.new_file(destination, schema)
+
+    rows = 0
+    with writer:
+        for record_batch in batches:
+            try:
+                results = scorer.score(framework, record_batch)
+            except (ValueError, KeyError) as error:
+                raise type(error)(f"Batch starting at row {rows}: {error}") from error
+            writer.write_batch(results)
+            logger.info("Computed rows %s to %s", rows, rows + record_batch.num_rows)
+            rows += record_batch.num_rows
+    return rows
@@ -0,0 +1,224 @@
+"""
+Ingestion of auction logs, holding one line per bid request or ad call, into the Co2 cost of each key such as an SSP.
+
+Lines are only counted while they are read, per group of the key fields and of the fields the cost depends on, such
+as the creative type of ad calls. The counting is done by :class:`collections.Counter` as the lines are parsed, so
+that the memory used only depends on the number of groups. The costs are then computed once for all the groups, in a
+single vectorized pass of :mod:`carbon.batch`, instead of once per line.
+
+.. code-block:: python
+
+    totals = auctions.ingest(
+        framework,
+        ["bids-01.jsonl.gz", "bids-02.jsonl.gz"],
+        auctions.AuctionLog(kind="bids", keys=("ssp", "timestamp"), period="hour"),
+    )
+    totals["appnexus", "2024-01-01T13"].to_model()  # BidCost of the bid requests of the hour
+"""
+
+import collections
+import csv
+import itertools
+import json
+import operator
+import typing
+from collections.abc import Iterable, Mapping
+
+from carbon import batch, logger
+from carbon.compute_footprints import CostAccumulator
+from carbon.digital_carbon_framework import Framework
+from carbon.streaming import KINDS, Format, format_of, open_text
+
+AuctionKind = typing.Literal["bids", "adcalls"]
+Period = typing.Literal["year", "month", "day", "hour", "minute"]
+
+PERIODS: dict[str, int] = {"year": 4, "month": 7, "day": 10, "hour": 13, "minute": 16}
+"""Length of the prefix of ISO 8601 timestamps, such as ``2024-01-01T13:05:00Z``, identifying each period."""
+
+
+class AuctionLog(typing.NamedTuple):
+    """How to read the lines of an auction log, and the fields to group them by."""
+
+    kind: AuctionKind = "bids"
+    """Kind of the lines, each one being either a bid request or an ad call."""
+    input_format: Format = "jsonl"
+    fieldnames: tuple[str, ...] = ()
+    """Fields of the CSV records, read from the header of the file."""
+    keys: tuple[str, ...] = ("ssp",)
+    """Fields the costs are reported by."""
+    country_field: str | None = None
+    """Field holding the target country of each line. Defaults to the target country of the framework."""
+    creative_type_field: str = "creative_type"
+    """Field holding the creative type of ad calls, either ``video`` or ``display``."""
+    timestamp_field: str = "timestamp"
+    """Field holding the ISO 8601 timestamp of each line, truncated to :attr:`period` when it is one of the keys."""
+    period: Period | None = None
+
+    @property
+    def group_fields(self) -> tuple[str, ...]:
+        """Fields the lines are counted by: the keys, then the other fields of the cost."""
+        fields = list(self.keys)
+        for field in (
+            self.country_field,
+            self.creative_type_field if self.kind == "adcalls" else None,
+        ):
+            if field is not None and field not in fields:
+                fields.append(field)
+        return tuple(fields)
+
+    def _getter(self) -> typing.Callable[[typing.Any], tuple]:
+        """Return the function of a parsed record returning its group."""
+        fields = self.group_fields
+        if self.input_format == "csv":
+            missing = [field for field in fields if field not in self.fieldnames]
+            if missing:
+                raise ValueError(f"Fields {missing} not in {self.fieldnames}")
+            items = [self.fieldnames.index(field) for field in fields]
+        else:
+            items = list(fields)
+        getter = operator.itemgetter(*items)
+        if self.period is not None and self.timestamp_field in fields:
+            position = fields.index(self.timestamp_field)
+            length = PERIODS[self.period]
+            values = getter
+
+            def getter(record) -> tuple:
+                group = values(record)
+                if len(items) == 1:
+                    return (group[:length],)
+                return (
+                    group[:position]
+                    + (group[position][:length],)
+                    + group[position + 1 :]
+                )
+
+        elif len(items) == 1:
+            # A single item is returned as is by itemgetter, instead of a tuple.
+            item = items[0]
+            return lambda record: (record[item],)
+        return getter
+
+    def count(
+        self,
+        lines: Iterable[str],
+        counts: collections.Counter | None = None,
+        *,
+        first_line: int = 1,
+    ) -> collections.Counter:
+        """
+        Count the lines of each group of :attr:`group_fields`, in a single pass over ``lines``.
+
+        :param lines: lines of the log. For CSV records, the header must already be consumed, see :attr:`fieldnames`.
+        :param counts: counts of previous lines, such as the other files of the log, updated in place.
+        :param first_line: number of the first of ``lines``, reported in the errors.
+        :raises ValueError: if any line misses a field, holds an invalid value, or is not a valid record. The number
+            of the line is reported.
+        """
+        counts = collections.Counter() if counts is None else counts
+        getter = self._getter()
+        if self.input_format == "csv":
+            reader = csv.reader(lines)
+            records = filter(None, reader)
+
+            def line() -> int:
+                return first_line + reader.line_num - 1
+
+        else:
+            # Numbered in C as they are read, the number of the line being read is the last one drawn.
+            numbers = itertools.count(first_line)
+            lines = map(operator.itemgetter(1), zip(numbers, lines))
+            records = map(json.loads, filter(str.strip, lines))
+
+            def line() -> int:
+                return next(numbers) - 1
+
+        try:
+            counts.update(map(getter, records))
+        except (KeyError, IndexError) as error:
+            raise ValueError(
+                f"Line {line()} without the {self.group_fields} fields: {error!r}"
+            ) from error
+        except TypeError as error:
+            # Values such as lists can not be grouped, and lines such as JSON arrays have no fields.
+            raise ValueError(
+                f"Line {line()} with an invalid value of the {self.group_fields} fields: {error}"
+            ) from error
+        except (ValueError, csv.Error) as error:
+            raise ValueError(
+                f"Line {line()} is not a valid {self.input_format} record: {error}"
+            ) from error
+        return counts
+
+    def costs(
+        self, framework: Framework, counts: Mapping[tuple, int]
+    ) -> dict[tuple, CostAccumulator]:
+        """
+        Return the accumulated costs of the lines of each key, computed once per group of ``counts``.
+
+        :param counts: number of lines of each group, as returned by :meth:`count`.
+        :returns: the accumulator of each tuple of the values of :attr:`keys`, whose ``count`` is the number of lines.
+        :raises ValueError: if any group holds an invalid creative type.
+        :raises KeyError: if any country is not referenced.
+        """
+        if not counts:
+            return {}
+        fields = self.group_fields
+        groups = dict(zip(fields, zip(*counts)))
+        arguments: dict[str, typing.Any] = {
+            KINDS[self.kind].numeric[0]: list(counts.values())
+        }
+        if self.country_field is not None:
+            arguments["country"] = groups[self.country_field]
+        if self.kind == "adcalls":
+            arguments["creative_type"] = groups[self.creative_type_field]
+        costs = KINDS[self.kind].function(framework, **arguments)
+
+        keys: dict[tuple, int] = {}
+        key_ids = [
+            keys.setdefault(group[: len(self.keys)], len(keys)) for group in counts
+        ]
+        accumulators = batch.accumulate(costs, key_ids, list(counts.values()))
+        return {key: accumulators[key_id] for key, key_id in keys.items()}
+
+
+def ingest(
+    framework: Framework,
+    paths: Iterable[str],
+    log: AuctionLog | None = None,
+) -> dict[tuple, CostAccumulator]:
+    """
+    Return the accumulated costs of the lines of each key of auction log files.
+
+    All the files are counted first, then the costs of their groups are computed at once.
+
+    Args:
+        framework (Framework): Framework object
+        paths (Iterable[str]): CSV files with a header, or JSON lines files, optionally gzipped.
+            The format of each file is inferred from its extension.
+        log (AuctionLog, optional): the kind of the lines and the fields to group them by. Defaults to bid requests by SSP.
+
+    Raises:
+        ValueError: if any line misses a field, holds an invalid value or is not a valid record, reported with the path
+            and the number of the line, or if any group holds an invalid creative type.
+        KeyError: if any country is not referenced.
+
+    Returns:
+        dict: the accumulator of the costs of each tuple of the values of the keys.
+    """
+    log = AuctionLog() if log is None else log
+    counts = collections.Counter()
+    for path in paths:
+        with open_text(path) as file:
+            file_log = log._replace(input_format=format_of(path))
+            first_line = 1
+            if file_log.input_format == "csv":
+                file_log = file_log._replace(
+                    fieldnames=tuple(next(csv.reader(file), ()))
+                )
+                first_line = 2
+            try:
+                file_log.count(file, counts, first_line=first_line)
+            except ValueError as error:
+                raise ValueError(f"{path}: {error}") from error
+        logger.info("Counted %s groups after %s", len(counts), path)
+    return log.costs(framework, counts)
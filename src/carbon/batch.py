@@ -0,0 +1,671 @@
+"""
+Vectorized computation of the Co2 cost of advertising campaigns over NumPy columns.
+
+Every function of this module mirrors its scalar counterpart of :mod:`carbon.compute_footprints`,
+but takes one array per input field and evaluates all the rows in a single pass.
+"""
+
+import typing
+
+import numpy as np
+
+from carbon import computation_logger, countries, metrics
+from carbon.compute_footprints import (
+    AdcallCost,
+    AdcallCostAccumulator,
+    BidCost,
+    BidCostAccumulator,
+    Co2CampaignCost,
+    Co2CampaignCostAccumulator,
+    Co2Cost,
+    CostAccumulator,
+)
+from carbon.digital_carbon_framework import Coefficients, Framework
+from carbon.utils import DEVICES, Distribution
+
+ArrayLike = typing.Any
+"""Anything accepted by :func:`numpy.asarray`: arrays, buffer-protocol objects, sequences or scalars."""
+
+
+class Co2CostArray(typing.NamedTuple):
+    """Represents the Co2 costs of a component of the programmatic chain, one value per row."""
+
+    use: np.ndarray
+    """Co2 cost associated to the utilisation of the component"""
+    manufacturing: np.ndarray
+    """Co2 cost associated to the fabrication, use and life cycle of the component"""
+
+    def __add__(self, other: "Co2CostArray") -> "Co2CostArray":
+        return Co2CostArray(
+            use=self.use + other.use,
+            manufacturing=self.manufacturing + other.manufacturing,
+        )
+
+    @property
+    def total(self) -> np.ndarray:
+        """Return the total kgco2 cost of each row."""
+        return self.use + self.manufacturing
+
+
+class Co2CampaignCostArray(typing.NamedTuple):
+    """Columnar counterpart of :class:`carbon.compute_footprints.Co2CampaignCost`."""
+
+    kgco2_distrib_server: Co2CostArray
+    """Co2 cost associated to server usage, for the distribution."""
+    kgco2_distrib_network: Co2CostArray
+    """Co2 cost associated to network usage, for the distribution."""
+    kgco2_distrib_terminal: Co2CostArray
+    """Co2 cost associated to terminal usage, for the distribution."""
+    kgco2_allocation_network: Co2CostArray
+    """Co2 cost associated to network usage, for the allocation."""
+    kgco2_allocation_server: Co2CostArray
+    """Co2 cost associated to server usage, for the allocation."""
+
+    @property
+    def overall(self) -> Co2CostArray:
+        """Co2CostArray: the CO2 emissions of the 5 attributes combined, per row."""
+        return (
+            self.kgco2_distrib_server
+            + self.kgco2_distrib_network
+            + self.kgco2_distrib_terminal
+            + self.kgco2_allocation_network
+            + self.kgco2_allocation_server
+        )
+
+    def row(self, index) -> Co2CampaignCost:
+        """Return the :class:`Co2CampaignCost` of a single row."""
+        return _row(self, Co2CampaignCost, index)
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        """Flatten the costs into ``{"<pillar>_use": ..., "<pillar>_manufacturing": ...}`` columns."""
+        return _to_dict(self)
+
+
+class BidCostArray(typing.NamedTuple):
+    """Columnar counterpart of :class:`carbon.compute_footprints.BidCost`."""
+
+    kgco2_allocation_network: Co2CostArray
+    """Co2 cost associated to network usage"""
+    kgco2_allocation_server: Co2CostArray
+    """Co2 cost associated to server usage"""
+
+    @property
+    def overall(self) -> Co2CostArray:
+        return self.kgco2_allocation_network + self.kgco2_allocation_server
+
+    def row(self, index) -> BidCost:
+        """Return the :class:`BidCost` of a single row."""
+        return _row(self, BidCost, index)
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        """Flatten the costs into ``{"<pillar>_use": ..., "<pillar>_manufacturing": ...}`` columns."""
+        return _to_dict(self)
+
+
+class AdcallCostArray(typing.NamedTuple):
+    """Columnar counterpart of :class:`carbon.compute_footprints.AdcallCost`."""
+
+    kgco2_allocation_network: Co2CostArray
+    """Co2 cost associated to network usage"""
+    kgco2_allocation_server: Co2CostArray
+    """Co2 cost associated to server usage"""
+
+    @property
+    def overall(self) -> Co2CostArray:
+        return self.kgco2_allocation_network + self.kgco2_allocation_server
+
+    def row(self, index) -> AdcallCost:
+        """Return the :class:`AdcallCost` of a single row."""
+        return _row(self, AdcallCost, index)
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        """Flatten the costs into ``{"<pillar>_use": ..., "<pillar>_manufacturing": ...}`` columns."""
+        return _to_dict(self)
+
+
+def _row(costs: typing.NamedTuple, model: type, index):
+    return model(
+        **{
+            name: Co2Cost(use=cost.use[index], manufacturing=cost.manufacturing[index])
+            for name, cost in zip(costs._fields, costs)
+        }
+    )
+
+
+def _to_dict(costs: typing.NamedTuple) -> dict[str, np.ndarray]:
+    columns = {}
+    for name, cost in zip(costs._fields, costs):
+        columns[f"{name}_use"] = cost.use
+        columns[f"{name}_manufacturing"] = cost.manufacturing
+    return columns
+
+
+def _as_float(values: ArrayLike) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _raise_on_rows(invalid: np.ndarray, message: str):
+    if invalid.any():
+        rows = np.flatnonzero(invalid)
+        raise ValueError(
+            f"{message} (invalid rows: {rows[:10].tolist()}, total: {rows.size})"
+        )
+
+
+def _validate_creative_type(creative_type: ArrayLike) -> np.ndarray:
+    """Return the mask of video rows, raising if any row is neither video nor display."""
+    creative_type = np.asarray(creative_type)
+    video = creative_type == "video"
+    _raise_on_rows(
+        ~(video | (creative_type == "display")),
+        "creative_type is either 'display' or 'video'",
+    )
+    return video
+
+
+def _validate_allocation(allocation: ArrayLike) -> np.ndarray:
+    """Return the mask of direct rows, raising if any row is neither direct nor programmatic."""
+    allocation = np.asarray(allocation)
+    direct = allocation == "direct"
+    _raise_on_rows(
+        ~(direct | (allocation == "programmatic")),
+        "allocation is either 'programmatic' or 'direct'",
+    )
+    return direct
+
+
+class DistributionMatrix(typing.NamedTuple):
+    """Delivery repartitions of many rows, as a row × device matrix of weights with columns ordered as :data:`carbon.utils.DEVICES`."""
+
+    weights: np.ndarray
+    """Weights of the devices of each row, stored column by column."""
+    total_weights: np.ndarray
+    """Sum of the weights of each row."""
+
+    @classmethod
+    def from_weights(cls, weights: ArrayLike) -> "DistributionMatrix":
+        """
+        Validate a row × device matrix of weights, or a single row broadcasted to all the rows.
+
+        Raises:
+            ValueError: if any row holds a negative weight, or only null weights. The offending rows are listed in the message.
+        """
+        weights = np.asfortranarray(_as_float(weights))
+        if weights.shape[-1:] != (len(DEVICES),):
+            raise ValueError(
+                f"Expected one weight per device {DEVICES}, got shape {weights.shape}"
+            )
+        columns = [weights[..., column] for column in range(len(DEVICES))]
+        negative = columns[0] < 0
+        for column in columns[1:]:
+            negative |= column < 0
+        _raise_on_rows(negative, "Distribution expect only positive weights")
+        # Summed in the order of the devices, as ``Distribution`` sums its weights.
+        total_weights = columns[0]
+        for column in columns[1:]:
+            total_weights = total_weights + column
+        _raise_on_rows(total_weights == 0, "At least one weight must be non-null")
+        return cls(weights, total_weights)
+
+    @classmethod
+    def from_columns(
+        cls,
+        desktop: ArrayLike,
+        smart_phone: ArrayLike,
+        tablet: ArrayLike,
+        connected_tv: ArrayLike,
+    ) -> "DistributionMatrix":
+        """Validate one column of weights per device, scalars being broadcasted to all the rows."""
+        columns = np.broadcast_arrays(
+            *map(_as_float, (desktop, smart_phone, tablet, connected_tv))
+        )
+        # Stacked device by device, so that the matrix is stored column by column without another copy.
+        return cls.from_weights(np.moveaxis(np.stack(columns), 0, -1))
+
+    @classmethod
+    def from_distributions(
+        cls, distributions: typing.Iterable[Distribution]
+    ) -> "DistributionMatrix":
+        """Stack the ratios of already validated distributions, one row each."""
+        weights = np.array(
+            [distribution.device_ratios for distribution in distributions],
+            dtype=np.float64,
+        ).reshape(-1, len(DEVICES))
+        return cls.from_weights(weights)
+
+    def column(self, device: str) -> np.ndarray:
+        """Return the weights of a device of :data:`carbon.utils.DEVICES`, one per row."""
+        return self.weights[..., DEVICES.index(device)]
+
+    @property
+    def ratios(self) -> np.ndarray:
+        """Ratio of each device in each row."""
+        return self.weights / self.total_weights[..., np.newaxis]
+
+
+def _pack_alpha_codes(alpha_codes: np.ndarray) -> np.ndarray | None:
+    """
+    Pack alpha codes of up to 3 characters into integers, preserving their order.
+
+    Integers are much faster to search than strings. Return None for longer codes.
+    """
+    width = alpha_codes.dtype.itemsize // 4
+    if width > 3:
+        return None
+    chars = np.ascontiguousarray(alpha_codes).view(np.uint32)
+    chars = chars.reshape(alpha_codes.shape + (width,))
+    keys = np.zeros(alpha_codes.shape, dtype=np.uint64)
+    for position in range(width):
+        # Unicode code points are lower than 2**21.
+        keys |= chars[..., position].astype(np.uint64) << np.uint64(21 * (2 - position))
+    return keys
+
+
+def _search_exact(
+    keys: np.ndarray, alpha_codes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    if alpha_codes.dtype.kind != "U":
+        alpha_codes = alpha_codes.astype(str)
+    packed_keys = _pack_alpha_codes(keys)
+    searched = _pack_alpha_codes(alpha_codes)
+    if packed_keys is None or searched is None:
+        packed_keys, searched = keys, alpha_codes
+    rows = np.searchsorted(packed_keys, searched)
+    np.minimum(rows, len(packed_keys) - 1, out=rows)
+    return rows, packed_keys[rows] != searched
+
+
+def search_countries(
+    keys: np.ndarray, alpha_codes: ArrayLike
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the index of each country in the sorted alpha codes ``keys``, and the mask of the unknown countries.
+
+    Codes found as is are searched in a single vectorized pass. The other ones, such as lower case, numeric codes
+    or names, are resolved once per distinct value through :func:`carbon.countries.country_index`, to the alpha-2 code
+    searched instead. Categorical columns (exposing ``codes`` and ``categories``, such as :class:`pandas.Categorical`)
+    are resolved through their categories only.
+    """
+    if hasattr(alpha_codes, "categories"):
+        codes = np.asarray(alpha_codes.codes)
+        # Missing values are coded -1, and resolved as the empty, unknown, alpha code.
+        categories = np.append(np.asarray(alpha_codes.categories, dtype=str), "")
+        rows, unknown = search_countries(keys, categories)
+        return rows[codes], unknown[codes]
+
+    alpha_codes = np.asarray(alpha_codes)
+    shape = alpha_codes.shape
+    alpha_codes = alpha_codes.reshape(-1)
+    rows, unknown = _search_exact(keys, alpha_codes)
+    if unknown.any():
+        missing, inverse = np.unique(alpha_codes[unknown], return_inverse=True)
+        index = countries.country_index()
+        resolved = np.array(
+            [index.get(code, "") for code in missing.tolist()], dtype="U2"
+        )
+        resolved_rows, still_unknown = _search_exact(keys, resolved)
+        rows[unknown] = resolved_rows[inverse]
+        unknown[unknown] = still_unknown[inverse]
+    return rows.reshape(shape), unknown.reshape(shape)
+
+
+def resolve_countries(alpha_codes: ArrayLike) -> np.ndarray:
+    """
+    Return the alpha-2 code of each country code or name, resolved once per distinct value.
+
+    Raises:
+        KeyError: if any country is not referenced. All the unknown countries are listed in the message.
+    """
+    index = countries.country_index()
+    keys = np.array(sorted(set(index.alpha_2.values())))
+    rows, unknown = search_countries(keys, alpha_codes)
+    _raise_on_unknown_countries(alpha_codes, unknown)
+    return keys[rows]
+
+
+def _raise_on_unknown_countries(alpha_codes: ArrayLike, unknown: np.ndarray):
+    if unknown.any():
+        unknown_codes = np.unique(np.asarray(alpha_codes, dtype=str)[unknown])
+        raise KeyError(
+            f"Alpha codes not in database: {unknown_codes[:10].tolist()}, "
+            f"total: {unknown_codes.size} codes in {np.count_nonzero(unknown)} rows"
+        )
+
+
+class CountryCoefficients(typing.NamedTuple):
+    """Coefficients of a Framework for every referenced target country, as a country × coefficient matrix."""
+
+    alpha_codes: np.ndarray
+    """Sorted iso2 and iso3 alpha codes of the countries, indexing the rows of the matrix."""
+    matrix: np.ndarray
+    """Coefficients of each country, with columns ordered as the fields of :class:`Coefficients`."""
+
+    @classmethod
+    def from_framework(cls, framework: Framework) -> "CountryCoefficients":
+        by_country = framework.coefficients_by_country
+        alpha_codes = np.array(sorted(by_country))
+        return cls(
+            alpha_codes=alpha_codes,
+            matrix=np.array(
+                [by_country[code] for code in alpha_codes], dtype=np.float64
+            ),
+        )
+
+    def lookup(self, alpha_codes: ArrayLike) -> np.ndarray:
+        """
+        Return the row of the matrix of each alpha code, in a single vectorized search.
+
+        Alpha codes are resolved as by :func:`search_countries`: numeric codes and names of countries, in any case,
+        are accepted too.
+
+        Raises:
+            KeyError: if any alpha code is not referenced. All the unknown codes are listed in the message.
+        """
+        rows, unknown = search_countries(self.alpha_codes, alpha_codes)
+        _raise_on_unknown_countries(alpha_codes, unknown)
+        return rows
+
+    def take(self, alpha_codes: ArrayLike) -> Coefficients:
+        """Return the coefficients of each alpha code, as one array per coefficient."""
+        rows = self.lookup(alpha_codes)
+        return Coefficients(*(np.take(column, rows) for column in self.matrix.T))
+
+
+def country_coefficients(framework: Framework) -> CountryCoefficients:
+    """Return the country × coefficient matrix of the framework, cached until the next mutation of its parameters."""
+    return framework.cached("country_coefficients", CountryCoefficients.from_framework)
+
+
+def _coefficients(
+    framework: Framework | Coefficients, country: ArrayLike | None
+) -> Coefficients:
+    if isinstance(framework, Coefficients):
+        if country is not None:
+            raise TypeError("country can not be given along with coefficients")
+        return framework
+    if country is None:
+        return framework.coefficients
+    with metrics.timer("country_lookup"):
+        return country_coefficients(framework).take(country)
+
+
+def _rows(costs: BidCostArray | AdcallCostArray | Co2CampaignCostArray) -> int:
+    return costs.kgco2_allocation_network.use.size
+
+
+def _allocation_costs(
+    coefficients: Coefficients, paths: np.ndarray
+) -> dict[str, Co2CostArray]:
+    return {
+        "kgco2_allocation_network": Co2CostArray(
+            use=coefficients.allocation_network_use * paths,
+            manufacturing=coefficients.allocation_network_manufacturing * paths,
+        ),
+        "kgco2_allocation_server": Co2CostArray(
+            use=coefficients.allocation_server_use * paths,
+            manufacturing=coefficients.allocation_server_manufacturing * paths,
+        ),
+    }
+
+
+@metrics.instrument("batch.bids_cost", rows=_rows)
+def bids_cost(
+    framework: Framework | Coefficients,
+    nb_bids: ArrayLike,
+    country: ArrayLike | None = None,
+) -> BidCostArray:
+    """
+    Return the kgco2 cost of many numbers of bids at once.
+    See :func:`carbon.compute_footprints.bids_cost`.
+
+    Args:
+        framework (Framework | Coefficients): Framework object, or coefficients with one value per row, such as samples of :mod:`carbon.uncertainty`
+        nb_bids (ArrayLike): number of bids, per row.
+        country (ArrayLike, optional): target country per row, as any code or name of :mod:`carbon.countries`. Defaults to the target country of the framework.
+
+    Raises:
+        KeyError: if any country is not referenced.
+
+    Return:
+        BidCostArray: the Co2 cost of the bids of each row.
+
+    """
+    nb_bids = _as_float(nb_bids)
+    computation_logger.info("Starting vectorized bids_cost for %s rows.", nb_bids.size)
+
+    allocation_factor = 4
+    return BidCostArray(
+        **_allocation_costs(
+            _coefficients(framework, country), allocation_factor * nb_bids
+        )
+    )
+
+
+@metrics.instrument("batch.adcalls_cost", rows=_rows)
+def adcalls_cost(
+    framework: Framework | Coefficients,
+    nb_ad_calls: ArrayLike,
+    creative_type: ArrayLike,
+    country: ArrayLike | None = None,
+) -> AdcallCostArray:
+    """
+    Return the kgco2 cost of many numbers of ad calls at once.
+    See :func:`carbon.compute_footprints.adcalls_cost`.
+
+    Args:
+        framework (Framework | Coefficients): Framework object, or coefficients with one value per row, such as samples of :mod:`carbon.uncertainty`
+        nb_ad_calls (ArrayLike): number of ad calls, per row.
+        creative_type (ArrayLike): Type of the creative, either 'video' or 'display'
+        country (ArrayLike, optional): target country per row, as any code or name of :mod:`carbon.countries`. Defaults to the target country of the framework.
+
+    Raises:
+        ValueError: if any row holds an invalid creative type.
+        KeyError: if any country is not referenced.
+
+    Returns:
+        AdcallCostArray: the Co2 cost of the ad calls of each row.
+
+    """
+    nb_ad_calls = _as_float(nb_ad_calls)
+    computation_logger.info(
+        "Starting vectorized adcalls_cost for %s rows.", nb_ad_calls.size
+    )
+    with metrics.timer("validation"):
+        video = _validate_creative_type(creative_type)
+
+    coefficients = _coefficients(framework, country)
+    allocation_factor = np.where(
+        video, coefficients.adcall_paths_video, coefficients.adcall_paths_display
+    )
+    return AdcallCostArray(
+        **_allocation_costs(coefficients, allocation_factor * nb_ad_calls)
+    )
+
+
+@metrics.instrument("batch.impressions_cost", rows=_rows)
+def impressions_cost(
+    framework: Framework | Coefficients,
+    nb_impressions: ArrayLike,
+    creative_type: ArrayLike,
+    allocation: ArrayLike,
+    creative_size_ko: ArrayLike,
+    creative_avg_view_s: ArrayLike = 3,
+    *,
+    desktop: ArrayLike = None,
+    smart_phone: ArrayLike = None,
+    tablet: ArrayLike = None,
+    connected_tv: ArrayLike = None,
+    devices_repartition: DistributionMatrix | None = None,
+    country: ArrayLike | None = None,
+) -> Co2CampaignCostArray:
+    """Return the kgco2 cost of many advertising campaigns at once.
+
+    Each argument is either a column (one value per campaign) or a scalar broadcasted to all the campaigns.
+    Row ``i`` of the result is equal to the result of :func:`carbon.compute_footprints.impressions_cost`
+    called with the values of row ``i``, the framework set to the country of row ``i``, and a device distribution with weights ordered as
+    ``desktop``, ``smart_phone``, ``tablet``, ``connected_tv``.
+
+    Args:
+        framework (Framework | Coefficients): Framework object, or coefficients with one value per row, such as samples of :mod:`carbon.uncertainty`
+        nb_impressions (ArrayLike): Total number of impressions
+        creative_type (ArrayLike): Type of the creative, either 'video' or 'display'
+        allocation (ArrayLike): Campaign allocation type, either 'direct' or 'programmatic'
+        creative_size_ko (ArrayLike): Size of the creative, in ko (kB)
+        creative_avg_view_s (ArrayLike, optional): average duration view of the creative, in seconds. Mandatory for a display creative. Defaults to 3.
+        desktop (ArrayLike): Weight of desktop devices in the delivery repartition
+        smart_phone (ArrayLike): Weight of smart phones in the delivery repartition
+        tablet (ArrayLike): Weight of tablets in the delivery repartition
+        connected_tv (ArrayLike): Weight of connected tvs in the delivery repartition
+        devices_repartition (DistributionMatrix, optional): Delivery repartition of each row, instead of the weights of each device
+        country (ArrayLike, optional): target country per row, as any code or name of :mod:`carbon.countries`. Defaults to the target country of the framework.
+
+    Raises:
+        ValueError: if any row holds an invalid value. The offending rows are listed in the message.
+        KeyError: if any country is not referenced.
+
+    Returns:
+        Co2CampaignCostArray: Carbon cost of each campaign
+    """
+    nb_impressions = _as_float(nb_impressions)
+    creative_size_ko = _as_float(creative_size_ko)
+    creative_avg_view_s = _as_float(creative_avg_view_s)
+    computation_logger.info(
+        "Starting vectorized impression_costs for %s rows.", nb_impressions.size
+    )
+
+    with metrics.timer("validation"):
+        video = _validate_creative_type(creative_type)
+        direct = _validate_allocation(allocation)
+        _raise_on_rows(
+            ~video & ~(creative_avg_view_s > 0.0),
+            "creative_avg_view_s is mandatory for creative_type='display'",
+        )
+        if devices_repartition is None:
+            devices_repartition = DistributionMatrix.from_columns(
+                desktop, smart_phone, tablet, connected_tv
+            )
+        total_weights = devices_repartition.total_weights
+
+    coefficients = _coefficients(framework, country)
+    volume_ko = creative_size_ko * nb_impressions
+    view_s = creative_avg_view_s * nb_impressions
+    shape = np.broadcast_shapes(
+        volume_ko.shape,
+        view_s.shape,
+        np.shape(total_weights),
+        video.shape,
+        direct.shape,
+        np.shape(coefficients.distrib_server_use),
+    )
+
+    def _cost(use, manufacturing) -> Co2CostArray:
+        return Co2CostArray(
+            use=np.broadcast_to(use, shape),
+            manufacturing=np.broadcast_to(manufacturing, shape),
+        )
+
+    with metrics.timer("pillar.kgco2_distrib_server"):
+        distrib_server = _cost(
+            coefficients.distrib_server_use * volume_ko,
+            coefficients.distrib_server_manufacturing * volume_ko,
+        )
+    with metrics.timer("pillar.kgco2_distrib_network"):
+        distrib_network = _cost(
+            coefficients.distrib_network_use * volume_ko,
+            coefficients.distrib_network_manufacturing * volume_ko,
+        )
+
+    with metrics.timer("pillar.kgco2_distrib_terminal"):
+        # Same accumulation order as ``compute_footprints.terminal_cost``.
+        terminal_use = 0.0
+        terminal_manufacturing = 0.0
+        for use, manufacturing, device in (
+            (
+                coefficients.connected_tv_use,
+                coefficients.connected_tv_manufacturing,
+                "connected_tv",
+            ),
+            (coefficients.desktop_use, coefficients.desktop_manufacturing, "desktop"),
+            (coefficients.tablet_use, coefficients.tablet_manufacturing, "tablet"),
+            (
+                coefficients.smart_phone_use,
+                coefficients.smart_phone_manufacturing,
+                "smart_phone",
+            ),
+        ):
+            ratio = devices_repartition.column(device) / total_weights
+            terminal_use = terminal_use + use * ratio
+            terminal_manufacturing = terminal_manufacturing + manufacturing * ratio
+        distrib_terminal = _cost(terminal_use * view_s, terminal_manufacturing * view_s)
+
+    with metrics.timer("pillar.allocation"):
+        allocation_factor = np.where(
+            direct,
+            1.0,
+            np.where(
+                video,
+                coefficients.programmatic_paths_video,
+                coefficients.programmatic_paths_display,
+            ),
+        )
+        allocation_costs = {
+            name: _cost(*cost)
+            for name, cost in _allocation_costs(
+                coefficients, allocation_factor * nb_impressions
+            ).items()
+        }
+
+    return Co2CampaignCostArray(
+        kgco2_distrib_server=distrib_server,
+        kgco2_distrib_network=distrib_network,
+        kgco2_distrib_terminal=distrib_terminal,
+        **allocation_costs,
+    )
+
+
+_ACCUMULATORS: dict[type, type[CostAccumulator]] = {
+    Co2CampaignCostArray: Co2CampaignCostAccumulator,
+    BidCostArray: BidCostAccumulator,
+    AdcallCostArray: AdcallCostAccumulator,
+}
+
+
+def accumulate(
+    costs: Co2CampaignCostArray | BidCostArray | AdcallCostArray,
+    keys: ArrayLike,
+    counts: ArrayLike | None = None,
+) -> dict[typing.Any, CostAccumulator]:
+    """
+    Sum the costs of the rows sharing the same key, such as a campaign identifier, in a single pass.
+
+    The accumulators of successive batches are combined with :meth:`CostAccumulator.merge`.
+
+    Args:
+        costs: costs of each row
+        keys (ArrayLike): key of each row
+        counts (ArrayLike, optional): number of events of each row, such as the lines of a log grouped into the row.
+            Defaults to one event per row.
+
+    Returns:
+        dict: the accumulator of the costs of each key
+    """
+    keys, inverse = np.unique(np.asarray(keys), return_inverse=True)
+    inverse = inverse.ravel()
+    if counts is None:
+        counts = np.bincount(inverse, minlength=keys.size)
+    else:
+        counts = np.bincount(
+            inverse, weights=np.ravel(counts), minlength=keys.size
+        ).astype(np.int64)
+    sums = [
+        np.bincount(inverse, weights=column.ravel(), minlength=keys.size)
+        for cost in costs
+        for column in (cost.use, cost.manufacturing)
+    ]
+    accumulator = _ACCUMULATORS[type(costs)]
+    return {
+        key: accumulator(count, row)
+        for key, count, row in zip(
+            keys.tolist(), counts.tolist(), np.column_stack(sums).tolist()
+        )
+    }
@@ -0,0 +1,213 @@
+"""
+Benchmarks of the computation entry points, reporting their throughput and peak memory.
+
+.. code-block:: bash
+
+    python -m carbon benchmark --sizes 1000 100000 --output baseline.json
+    # After a change, fail if any benchmark is 20% slower than the baseline
+    python -m carbon benchmark --sizes 1000 100000 --baseline baseline.json --tolerance 0.2
+"""
+
+import gc
+import itertools
+import json
+import time
+import tracemalloc
+import typing
+from collections.abc import Callable, Iterator
+
+from carbon import compute_footprints
+from carbon.digital_carbon_framework import Framework
+from carbon.utils import Distribution
+
+SIZES = (1_000, 100_000, 1_000_000)
+"""Default numbers of rows of the benchmarks of the :mod:`carbon.pandas` helpers."""
+
+
+class Benchmark(typing.NamedTuple):
+    name: str
+    rows: int
+    """Number of rows processed by each call."""
+    setup: Callable[[], Callable[[], typing.Any]]
+    """Return the function to measure, called without argument."""
+
+
+class Result(typing.NamedTuple):
+    name: str
+    rows: int
+    seconds: float
+    """Best time of a call."""
+    peak_memory: int
+    """Peak of the memory allocated during a call, in bytes."""
+
+    @property
+    def throughput(self) -> float:
+        """Rows processed per second."""
+        return self.rows / self.seconds
+
+
+def _scalar_benchmarks() -> Iterator[Benchmark]:
+    devices = Distribution(
+        weights={"desktop": 60, "smart_phone": 20, "tablet": 0, "connected_tv": 20}
+    )
+
+    def _load():
+        return Framework.load
+
+    def _change_target_country():
+        framework = Framework.load()
+        countries = itertools.cycle(["FR", "DE"])
+        return lambda: framework.change_target_country(next(countries))
+
+    def _impressions_cost():
+        framework = Framework.load()
+        return lambda: compute_footprints.impressions_cost(
+            framework,
+            nb_impressions=10000,
+            creative_type="display",
+            allocation="programmatic",
+            creative_size_ko=1200,
+            devices_repartition=devices,
+            creative_avg_view_s=5,
+        )
+
+    def _bids_cost():
+        framework = Framework.load()
+        return lambda: compute_footprints.bids_cost(framework, nb_bids=1000)
+
+    def _adcalls_cost():
+        framework = Framework.load()
+        return lambda: compute_footprints.adcalls_cost(
+            framework, nb_ad_calls=1000, creative_type="video"
+        )
+
+    yield Benchmark("Framework.load", 1, _load)
+    yield Benchmark("Framework.change_target_country", 1, _change_target_country)
+    yield Benchmark("compute_footprints.impressions_cost", 1, _impressions_cost)
+    yield Benchmark("compute_footprints.bids_cost", 1, _bids_cost)
+    yield Benchmark("compute_footprints.adcalls_cost", 1, _adcalls_cost)
+
+
+def _pandas_benchmarks(sizes: typing.Iterable[int]) -> Iterator[Benchmark]:
+    try:
+        import numpy as np
+        import pandas as pd
+
+        from carbon import pandas as carbon_pandas
+    except ImportError:
+        return
+
+    def _frame(rows: int) -> "pd.DataFrame":
+        random = np.random.default_rng(0)
+        return pd.DataFrame(
+            {
+                "nb_impressions": random.integers(1, 10_000, rows),
+                "nb_bids": random.integers(1, 10_000, rows),
+                "nb_ad_calls": random.integers(1, 10_000, rows),
+                "creative_type": random.choice(["video", "display"], rows),
+                "allocation": random.choice(["direct", "programmatic"], rows),
+                "creative_size_ko": random.uniform(10, 2000, rows),
+                "creative_avg_view_s": random.uniform(0.5, 30, rows),
+                **{
+                    column: random.uniform(0.01, 1, rows)
+                    for column in carbon_pandas.DEVICES_COLUMNS
+                },
+                "country": random.choice(["FR", "DE", "USA"], rows),
+            }
+        )
+
+    for rows in sizes:
+        for function in ("impressions_cost", "bids_cost", "adcalls_cost"):
+            for country_column in (None, "country"):
+
+                def _setup(rows=rows, function=function, country_column=country_column):
+                    framework = Framework.load()
+                    df = _frame(rows)
+                    compute = getattr(carbon_pandas, function)
+                    return lambda: compute(df, framework, country_column=country_column)
+
+                name = f"pandas.{function}"
+                if country_column is not None:
+                    name += "[country]"
+                yield Benchmark(f"{name}[{rows}]", rows, _setup)
+
+
+def benchmarks(sizes: typing.Iterable[int] = SIZES) -> list[Benchmark]:
+    """Return the benchmarks of the entry points, with the :mod:`carbon.pandas` helpers run on ``sizes`` rows if pandas is installed."""
+    return [*_scalar_benchmarks(), *_pandas_benchmarks(sizes)]
+
+
+def run(benchmark: Benchmark, min_time: float = 0.2, repeat: int = 3) -> Result:
+    """
+    Measure a benchmark.
+
+    The function is called in loops lasting at least ``min_time`` seconds, and the best of ``repeat`` loops is kept.
+    Its peak memory is measured on an additional call, traced by :mod:`tracemalloc`.
+    """
+    function = benchmark.setup()
+    function()  # Warm up the caches.
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(benchmark.name, benchmark.rows, best, peak)
+
+
+def report(results: typing.Iterable[Result], baseline: dict | None = None) -> str:
+    """Return a table of the results, compared to the throughputs of a baseline if given."""
+    lines = [
+        f"{'benchmark':<44s} {'rows':>9s} {'time/call':>11s} {'rows/s':>12s} {'peak memory':>12s}"
+        + ("  vs baseline" if baseline else "")
+    ]
+    for result in results:
+        line = (
+            f"{result.name:<44s} {result.rows:>9d} {result.seconds * 1e3:>9.3f}ms"
+            f" {result.throughput:>12.4g} {result.peak_memory / 2**20:>10.2f}MB"
+        )
+        if baseline and result.name in baseline:
+            ratio = result.throughput / baseline[result.name]["throughput"]
+            line += f"  {ratio:>10.2f}x"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def to_json(results: typing.Iterable[Result]) -> str:
+    return json.dumps(
+        {
+            result.name: {**result._asdict(), "throughput": result.throughput}
+            for result in results
+        },
+        indent=2,
+    )
+
+
+def regressions(
+    results: typing.Iterable[Result], baseline: dict, tolerance: float
+) -> list[str]:
+    """Return the names of the benchmarks whose throughput dropped by more than ``tolerance`` from the baseline."""
+    return [
+        result.name
+        for result in results
+        if result.name in baseline
+        and result.throughput < baseline[result.name]["throughput"] * (1 - tolerance)
+    ]
@@ -0,0 +1,249 @@
+"""
+Command line interface of the framework.
+
+.. code-block:: bash
+
+    python -m carbon batch impressions.csv.gz --output costs.csv --workers 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import sys
+import typing
+
+from carbon import logger, metrics
+
+
+def _batch(args: argparse.Namespace) -> int:
+    from carbon import streaming
+    from carbon.digital_carbon_framework import Framework
+
+    framework = Framework.load(args.config, frozen=True)
+    if args.country is not None:
+        framework = framework.with_country(args.country)
+
+    input_format = args.input_format or (
+        "jsonl" if args.input == "-" else streaming.format_of(args.input)
+    )
+    output_format = args.output_format or (
+        input_format if args.output == "-" else streaming.format_of(args.output)
+    )
+    with contextlib.ExitStack() as stack:
+        source = sys.stdin
+        if args.input != "-":
+            source = stack.enter_context(streaming.open_text(args.input))
+        destination = sys.stdout
+        if args.output != "-":
+            destination = stack.enter_context(streaming.open_text(args.output, "w"))
+        fieldnames = ()
+        if input_format == "csv":
+            fieldnames = tuple(next(csv.reader(source), ()))
+        scorer = streaming.ChunkScorer(
+            kind=args.kind,
+            input_format=input_format,
+            output_format=output_format,
+            fieldnames=fieldnames,
+            country_field=args.country_field,
+            keep=tuple(args.keep),
+            details=args.details,
+        )
+        records = streaming.stream(
+            framework,
+            source,
+            destination,
+            scorer,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+        )
+    logger.info("Computed %s records", records)
+    return 0
+
+
+def _benchmark(args: argparse.Namespace) -> int:
+    from carbon import benchmark
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = []
+    for case in benchmark.benchmarks(args.sizes):
+        if args.filter is None or args.filter in case.name:
+            results.append(benchmark.run(case, min_time=args.min_time))
+            logger.info("%s: %s rows/s", case.name, results[-1].throughput)
+    print(benchmark.report(results, baseline))
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            file.write(benchmark.to_json(results))
+    if baseline is not None:
+        regressions = benchmark.regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(
+                f"Slower than the baseline: {', '.join(regressions)}", file=sys.stderr
+            )
+            return 1
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from carbon import server
+    from carbon.digital_carbon_framework import Framework
+
+    framework = Framework.load(args.config, frozen=True)
+    if args.country is not None:
+        framework = framework.with_country(args.country)
+    if args.metrics:
+        metrics.enable()
+    service = server.Server(
+        framework,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.batch_window_ms / 1000,
+    )
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m carbon",
+        description="Compute the carbon footprint of digital campaigns.",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="log the progress")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch",
+        help="compute the Co2 cost of every record of a CSV or JSON lines log file",
+        description=(
+            "Compute the Co2 cost of every record of a CSV or JSON lines log file, optionally gzipped. "
+            "The file is streamed by chunks, so that the memory used does not depend on its size."
+        ),
+    )
+    batch.add_argument("input", help="log file, or - for JSON lines on stdin")
+    batch.add_argument(
+        "-o", "--output", default="-", help="result file, defaults to stdout"
+    )
+    batch.add_argument(
+        "--kind",
+        choices=("impressions", "bids", "adcalls"),
+        default="impressions",
+        help="kind of the records, defaults to impressions",
+    )
+    batch.add_argument("--input-format", choices=("csv", "jsonl"))
+    batch.add_argument("--output-format", choices=("csv", "jsonl"))
+    batch.add_argument(
+        "--config", help="config file of the framework, defaults to the reference one"
+    )
+    batch.add_argument(
+        "--country",
+        help="target country, as an ISO 3166-1 alpha-2, alpha-3 or numeric code, or a country name",
+    )
+    batch.add_argument(
+        "--country-field",
+        help="field holding the target country of each record, as any code or name accepted by --country",
+    )
+    batch.add_argument(
+        "--keep",
+        action="append",
+        default=[],
+        metavar="FIELD",
+        help="field copied to the output, such as an identifier. Can be repeated",
+    )
+    batch.add_argument(
+        "--details",
+        action="store_true",
+        help="write the use and manufacturing costs of every pillar",
+    )
+    batch.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        help="number of records computed at once, defaults to 100000",
+    )
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help=f"number of processes computing the chunks (this machine has {os.cpu_count()} cpus), "
+        "defaults to 0, computing the chunks in the current process",
+    )
+    batch.set_defaults(handler=_batch)
+
+    benchmark = commands.add_parser(
+        "benchmark",
+        help="measure the throughput and peak memory of the computation entry points",
+    )
+    benchmark.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 100_000, 1_000_000],
+        help="numbers of rows of the pandas benchmarks, defaults to 1000 100000 1000000",
+    )
+    benchmark.add_argument(
+        "-k", "--filter", help="run only the benchmarks whose name contains FILTER"
+    )
+    benchmark.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimal duration of a measure, in seconds, defaults to 0.2",
+    )
+    benchmark.add_argument("-o", "--output", help="write the results to a JSON file")
+    benchmark.add_argument(
+        "--baseline", help="JSON file of results to compare the throughputs with"
+    )
+    benchmark.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fail if any throughput is lower than the baseline by more than this fraction, defaults to 0.2",
+    )
+    benchmark.set_defaults(handler=_benchmark)
+
+    serve = commands.add_parser(
+        "serve",
+        help="serve the computations over HTTP, coalescing concurrent requests into micro-batches",
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="defaults to 127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080, help="defaults to 8080")
+    serve.add_argument(
+        "--config", help="config file of the framework, defaults to the reference one"
+    )
+    serve.add_argument(
+        "--country",
+        help="default target country, as an ISO 3166-1 alpha-2, alpha-3 or numeric code, or a country name",
+    )
+    serve.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=1024,
+        help="number of waiting requests computed at once, defaults to 1024",
+    )
+    serve.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=2,
+        help="maximal time a request waits for other requests, in milliseconds, defaults to 2",
+    )
+    serve.add_argument(
+        "--metrics", action="store_true", help="collect the metrics served on /metrics"
+    )
+    serve.set_defaults(handler=_serve)
+    return parser
+
+
+def main(argv: typing.Sequence[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    if args.verbose:
+        logger.setLevel("INFO")
+    return args.handler(args)
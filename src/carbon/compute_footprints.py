@@ -2,12 +2,14 @@
 Contains functions to compute the Co2 cost of bids only, and of ad calls.
 """
 
+import functools
+import struct
 import sys
 import typing
 
 from pydantic import BaseModel
 
-from carbon import computation_logger
+from carbon import computation_logger, metrics
 from carbon.utils import Distribution
 
 
@@ -20,7 +22,7 @@ class Co2Cost(BaseModel):
     """Co2 cost associated to the fabrication, use and life cycle of the component"""
 
     def __add__(self, other: "Co2Cost"):
-        return Co2Cost(
+        return Co2Cost.model_construct(
             use=self.use + other.use,
             manufacturing=self.manufacturing + other.manufacturing,
         )
@@ -116,7 +118,267 @@ class AdcallCost(_ShowMixin, BaseModel):
         return self.kgco2_allocation_network + self.kgco2_allocation_server
 
 
-def bids_cost(framework, nb_bids: int) -> BidCost:
+class Co2CostTuple(typing.NamedTuple):
+    """Compact, unvalidated, counterpart of :class:`Co2Cost`, used for internal computations."""
+
+    use: float = 0
+    """Co2 cost associated to the utilisation of the component"""
+    manufacturing: float = 0
+    """Co2 cost associated to the fabrication, use and life cycle of the component"""
+
+    def __add__(self, other: "Co2CostTuple") -> "Co2CostTuple":
+        return Co2CostTuple(
+            self.use + other.use, self.manufacturing + other.manufacturing
+        )
+
+    def __mul__(self, factor: float) -> "Co2CostTuple":
+        return Co2CostTuple(self.use * factor, self.manufacturing * factor)
+
+    @property
+    def total(self) -> float:
+        return self.use + self.manufacturing
+
+    def to_model(self) -> Co2Cost:
+        return Co2Cost.model_construct(use=self.use, manufacturing=self.manufacturing)
+
+
+def _to_model(costs: typing.NamedTuple, model: type[BaseModel]):
+    return model.model_construct(
+        **{name: cost.to_model() for name, cost in zip(costs._fields, costs)}
+    )
+
+
+class Co2CampaignCostTuple(typing.NamedTuple):
+    """Compact counterpart of :class:`Co2CampaignCost`."""
+
+    kgco2_distrib_server: Co2CostTuple
+    kgco2_distrib_network: Co2CostTuple
+    kgco2_distrib_terminal: Co2CostTuple
+    kgco2_allocation_network: Co2CostTuple
+    kgco2_allocation_server: Co2CostTuple
+
+    @property
+    def overall(self) -> Co2CostTuple:
+        return (
+            self.kgco2_distrib_server
+            + self.kgco2_distrib_network
+            + self.kgco2_distrib_terminal
+            + self.kgco2_allocation_network
+            + self.kgco2_allocation_server
+        )
+
+    def to_model(self) -> Co2CampaignCost:
+        return _to_model(self, Co2CampaignCost)
+
+
+class BidCostTuple(typing.NamedTuple):
+    """Compact counterpart of :class:`BidCost`."""
+
+    kgco2_allocation_network: Co2CostTuple
+    kgco2_allocation_server: Co2CostTuple
+
+    @property
+    def overall(self) -> Co2CostTuple:
+        return self.kgco2_allocation_network + self.kgco2_allocation_server
+
+    def to_model(self) -> BidCost:
+        return _to_model(self, BidCost)
+
+
+class AdcallCostTuple(typing.NamedTuple):
+    """Compact counterpart of :class:`AdcallCost`."""
+
+    kgco2_allocation_network: Co2CostTuple
+    kgco2_allocation_server: Co2CostTuple
+
+    @property
+    def overall(self) -> Co2CostTuple:
+        return self.kgco2_allocation_network + self.kgco2_allocation_server
+
+    def to_model(self) -> AdcallCost:
+        return _to_model(self, AdcallCost)
+
+
+class CostAccumulator:
+    """
+    Running sums of the Co2 costs of the pillars of :attr:`model`, over any number of events or batches.
+
+    Partial accumulators, computed for instance in separate processes, are combined with :meth:`merge`,
+    and their compact state is exchanged with :meth:`to_bytes` and :meth:`from_bytes`.
+    """
+
+    model: typing.ClassVar[type[_ShowMixin]]
+    """Model of the accumulated costs."""
+
+    __slots__ = ("_sums", "count")
+
+    def __init__(self, count: int = 0, sums: typing.Iterable[float] | None = None):
+        self.count = count
+        """Number of accumulated events."""
+        self._sums = [0.0] * (2 * len(self.model.model_fields))
+        """Use and manufacturing sums of each pillar, ordered as the fields of the model."""
+        if sums is not None:
+            self._sums[:] = sums
+
+    def add(self, cost) -> typing.Self:
+        """
+        Add the costs of one event.
+
+        :param cost: costs of the event, either as a model or its compact tuple counterpart.
+        """
+        sums = self._sums
+        for i, name in enumerate(self.model.model_fields):
+            pillar = getattr(cost, name)
+            sums[2 * i] += pillar.use
+            sums[2 * i + 1] += pillar.manufacturing
+        self.count += 1
+        return self
+
+    def add_batch(self, costs) -> typing.Self:
+        """
+        Add the costs of a batch of events.
+
+        :param costs: costs of the events, as returned by the :mod:`carbon.batch` functions.
+        """
+        sums = self._sums
+        count = 0
+        for i, name in enumerate(self.model.model_fields):
+            pillar = getattr(costs, name)
+            sums[2 * i] += float(pillar.use.sum())
+            sums[2 * i + 1] += float(pillar.manufacturing.sum())
+            count = pillar.use.size
+        self.count += count
+        return self
+
+    def merge(self, other: typing.Self) -> typing.Self:
+        """Add the sums of another accumulator to this one."""
+        if type(other) is not type(self):
+            raise TypeError(
+                f"Can not merge {type(other).__name__} into {type(self).__name__}"
+            )
+        self._sums[:] = [a + b for a, b in zip(self._sums, other._sums)]
+        self.count += other.count
+        return self
+
+    def __add__(self, other: typing.Self) -> typing.Self:
+        return type(self)(self.count, self._sums).merge(other)
+
+    def to_bytes(self) -> bytes:
+        """Return the compact, binary, state of the accumulator."""
+        return struct.pack(f"<Q{len(self._sums)}d", self.count, *self._sums)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> typing.Self:
+        """Return the accumulator of a state returned by :meth:`to_bytes`."""
+        count, *sums = struct.unpack(f"<Q{2 * len(cls.model.model_fields)}d", data)
+        return cls(count, sums)
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    def to_model(self):
+        """Return the accumulated costs, as an instance of :attr:`model`."""
+        sums = self._sums
+        return self.model.model_construct(
+            **{
+                name: Co2Cost.model_construct(
+                    use=sums[2 * i], manufacturing=sums[2 * i + 1]
+                )
+                for i, name in enumerate(self.model.model_fields)
+            }
+        )
+
+    @property
+    def overall(self) -> Co2Cost:
+        return self.to_model().overall
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(count={self.count}, sums={self._sums})"
+
+
+class Co2CampaignCostAccumulator(CostAccumulator):
+    """Running sums of :class:`Co2CampaignCost`."""
+
+    model = Co2CampaignCost
+    __slots__ = ()
+
+
+class BidCostAccumulator(CostAccumulator):
+    """Running sums of :class:`BidCost`."""
+
+    model = BidCost
+    __slots__ = ()
+
+
+class AdcallCostAccumulator(CostAccumulator):
+    """Running sums of :class:`AdcallCost`."""
+
+    model = AdcallCost
+    __slots__ = ()
+
+
+def terminal_cost(coefficients, devices_repartition: Distribution) -> Co2CostTuple:
+    """
+    Return the kgco2 cost of the terminals, per second of view over a devices repartition.
+
+    Args:
+        coefficients (Coefficients): per-unit factors of a Framework
+        devices_repartition (Distribution): Device delivery repartition
+    """
+    desktop, smart_phone, tablet, connected_tv = devices_repartition.device_ratios
+    use = 0
+    manufacturing = 0
+    for device_use, device_manufacturing, ratio in (
+        (
+            coefficients.connected_tv_use,
+            coefficients.connected_tv_manufacturing,
+            connected_tv,
+        ),
+        (coefficients.desktop_use, coefficients.desktop_manufacturing, desktop),
+        (coefficients.tablet_use, coefficients.tablet_manufacturing, tablet),
+        (
+            coefficients.smart_phone_use,
+            coefficients.smart_phone_manufacturing,
+            smart_phone,
+        ),
+    ):
+        use += device_use * ratio
+        manufacturing += device_manufacturing * ratio
+    return Co2CostTuple(use, manufacturing)
+
+
+TERMINAL_CACHE_SIZE = 1024
+"""Maximal number of terminal costs kept by :func:`cached_terminal_cost`."""
+
+
+@functools.lru_cache(maxsize=TERMINAL_CACHE_SIZE)
+def cached_terminal_cost(
+    coefficients, devices_repartition: Distribution
+) -> Co2CostTuple:
+    """
+    Return :func:`terminal_cost`, keeping the most recently used costs.
+
+    The costs are keyed by the coefficients, which are a fingerprint of the parameters of their framework,
+    and by the ratios of the devices repartition. Hits and misses are returned by ``cached_terminal_cost.cache_info()``.
+    """
+    return terminal_cost(coefficients, devices_repartition)
+
+
+def _allocation_costs(coefficients, paths: float) -> tuple[Co2CostTuple, Co2CostTuple]:
+    return (
+        Co2CostTuple(
+            coefficients.allocation_network_use * paths,
+            coefficients.allocation_network_manufacturing * paths,
+        ),
+        Co2CostTuple(
+            coefficients.allocation_server_use * paths,
+            coefficients.allocation_server_manufacturing * paths,
+        ),
+    )
+
+
+@metrics.instrument("compute_footprints.bids_cost")
+def bids_cost(framework, nb_bids: int, as_model: bool = True) -> BidCost | BidCostTuple:
     """
     Return the kgco2 cost of a number of bids.
     A single bid can be approximated as direct buying process. However, due to internal process and calls when bidding, we estimate the number of paths activated to be 4.
@@ -124,34 +386,31 @@ def bids_cost(framework, nb_bids: int) -> BidCost:
     Args:
         framework (Framework): Framework object
         nb_bids (int): number of bids.
+        as_model (bool, optional): whether to return a BidCost model, or its compact BidCostTuple counterpart. Defaults to True.
 
     Return:
         BidCost: a BidCost object containing the Co2 cost of a number of bids.
 
     """
-    computation_logger.info(f"Starting bids_cost for {nb_bids} bids.")
+    computation_logger.info("Starting bids_cost for %s bids.", nb_bids)
 
     allocation_factor = 4
-    bid_cost = BidCost(
-        kgco2_allocation_network=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_allocation_network, allocation_factor * nb_bids
-            ).dict()
-        ),
-        kgco2_allocation_server=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_allocation_server, allocation_factor * nb_bids
-            ).dict()
-        ),
-    )
+    with metrics.timer("pillar.allocation"):
+        bid_cost = BidCostTuple(
+            *_allocation_costs(framework.coefficients, allocation_factor * nb_bids)
+        )
 
     computation_logger.info(bid_cost)
-    return bid_cost
+    return bid_cost.to_model() if as_model else bid_cost
 
 
+@metrics.instrument("compute_footprints.adcalls_cost")
 def adcalls_cost(
-    framework, nb_ad_calls: int, creative_type: typing.Literal["video", "display"]
-) -> AdcallCost:
+    framework,
+    nb_ad_calls: int,
+    creative_type: typing.Literal["video", "display"],
+    as_model: bool = True,
+) -> AdcallCost | AdcallCostTuple:
     """
     Return the kgco2 cost of a number of ad calls.
     We approximate the number of SSPs connected to be 10 on average for each prebid auction.
@@ -162,39 +421,36 @@ def adcalls_cost(
         framework (Framework): Framework object
         nb_ad_calls (int): number of ad calls
         creative_type (typing.Literal[&quot;video&quot;, &quot;display&quot;]): Type of the creative
+        as_model (bool, optional): whether to return an AdcallCost model, or its compact AdcallCostTuple counterpart. Defaults to True.
 
     Returns:
         AdcallCost: a AdcallCost object containing the Co2 cost of a number of ad calls.
 
     """
     computation_logger.info(
-        f"Starting adcall_cost for {nb_ad_calls} ad calls. Creative type is {creative_type}"
+        "Starting adcall_cost for %s ad calls. Creative type is %s",
+        nb_ad_calls,
+        creative_type,
     )
 
+    coefficients = framework.coefficients
     allocation_factor = (
-        framework.allocation_network_servers.nb_paths_video
+        coefficients.adcall_paths_video
         if creative_type == "video"
-        else framework.allocation_network_servers.nb_paths_display
-    ) / 10
+        else coefficients.adcall_paths_display
+    )
 
-    computation_logger.debug(f"Allocation factor is set to {allocation_factor}.")
+    computation_logger.debug("Allocation factor is set to %s.", allocation_factor)
 
-    adcall_cost = AdcallCost(
-        kgco2_allocation_network=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_allocation_network, allocation_factor * nb_ad_calls
-            ).dict()
-        ),
-        kgco2_allocation_server=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_allocation_server, allocation_factor * nb_ad_calls
-            ).dict()
-        ),
-    )
+    with metrics.timer("pillar.allocation"):
+        adcall_cost = AdcallCostTuple(
+            *_allocation_costs(coefficients, allocation_factor * nb_ad_calls)
+        )
     computation_logger.info(adcall_cost)
-    return adcall_cost
+    return adcall_cost.to_model() if as_model else adcall_cost
 
 
+@metrics.instrument("compute_footprints.impressions_cost")
 def impressions_cost(
     framework,
     nb_impressions: int,
@@ -203,7 +459,8 @@ def impressions_cost(
     creative_size_ko: float,
     devices_repartition: Distribution,
     creative_avg_view_s: float = 3,
-) -> Co2CampaignCost:
+    as_model: bool = True,
+) -> Co2CampaignCost | Co2CampaignCostTuple:
     """Return the kgco2 cost of an advertising campaign.
 
     Args:
@@ -213,71 +470,66 @@ def impressions_cost(
         creative_size_ko (float): Size of the creative, in ko (kB)
         devices_repartition (Distribution): Device delivery repartition
         creative_avg_view_s (float, optional): average duration view of the creative, in seconds. Mandatory for a display creative. Defaults to 3.
+        as_model (bool, optional): whether to return a Co2CampaignCost model, or its compact Co2CampaignCostTuple counterpart. Defaults to True.
 
     Returns:
         Co2CampaignCost: Carbon cost of the campaign
     """
 
     computation_logger.info(
-        f"Starting impression_costs for {nb_impressions} impressions."
+        "Starting impression_costs for %s impressions.", nb_impressions
     )
-    computation_logger.debug("Asserting creative_type either video or display")
-    assert (creative_type == "display") or (
-        creative_type == "video"
-    ), "creative_type is either 'display' or 'video' "
-    computation_logger.debug("creative_type field: correct")
-
-    computation_logger.debug("Asserting allocation either direct or programmatic")
-    assert (allocation == "programmatic") or (
-        allocation == "direct"
-    ), "allocation is either 'programmatic' or 'direct' "
-    computation_logger.debug("allocation field: correct")
-
-    if creative_type == "display":
-        assert (
-            creative_avg_view_s > 0.0
-        ), "creative_avg_view_s is mandatory for creative_type='display' "
-
+    with metrics.timer("validation"):
+        computation_logger.debug("Asserting creative_type either video or display")
+        assert (creative_type == "display") or (
+            creative_type == "video"
+        ), "creative_type is either 'display' or 'video' "
+        computation_logger.debug("creative_type field: correct")
+
+        computation_logger.debug("Asserting allocation either direct or programmatic")
+        assert (allocation == "programmatic") or (
+            allocation == "direct"
+        ), "allocation is either 'programmatic' or 'direct' "
+        computation_logger.debug("allocation field: correct")
+
+        if creative_type == "display":
+            assert (
+                creative_avg_view_s > 0.0
+            ), "creative_avg_view_s is mandatory for creative_type='display' "
+
+    coefficients = framework.coefficients
     computation_logger.debug("Setting allocation_factor")
     if allocation == "direct":
         allocation_factor = 1
     else:
         allocation_factor = (
-            framework.allocation_factor
-            * framework.allocation_network_servers.nb_paths_video
+            coefficients.programmatic_paths_video
             if creative_type == "video"
-            else framework.allocation_factor
-            * framework.allocation_network_servers.nb_paths_display
+            else coefficients.programmatic_paths_display
         )
-    computation_logger.debug(f"allocation_factor setted to {allocation_factor}")
+    computation_logger.debug("allocation_factor setted to %s", allocation_factor)
 
-    co2_campaign_cost = Co2CampaignCost(
-        kgco2_distrib_server=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_distrib_server, creative_size_ko * nb_impressions
-            ).dict()
-        ),
-        kgco2_distrib_network=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_distrib_network, creative_size_ko * nb_impressions
-            ).dict()
-        ),
-        kgco2_distrib_terminal=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_distrib_terminal(devices_repartition),
-                creative_avg_view_s * nb_impressions,
-            ).dict()
-        ),
-        kgco2_allocation_network=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_allocation_network, allocation_factor * nb_impressions
-            ).dict()
-        ),
-        kgco2_allocation_server=Co2Cost(
-            **framework.multiply_attributes(
-                framework.kgco2_allocation_server, allocation_factor * nb_impressions
-            ).dict()
-        ),
+    volume_ko = creative_size_ko * nb_impressions
+    with metrics.timer("pillar.kgco2_distrib_server"):
+        distrib_server = Co2CostTuple(
+            coefficients.distrib_server_use * volume_ko,
+            coefficients.distrib_server_manufacturing * volume_ko,
+        )
+    with metrics.timer("pillar.kgco2_distrib_network"):
+        distrib_network = Co2CostTuple(
+            coefficients.distrib_network_use * volume_ko,
+            coefficients.distrib_network_manufacturing * volume_ko,
+        )
+    with metrics.timer("pillar.kgco2_distrib_terminal"):
+        distrib_terminal = cached_terminal_cost(coefficients, devices_repartition) * (
+            creative_avg_view_s * nb_impressions
+        )
+    with metrics.timer("pillar.allocation"):
+        allocation_costs = _allocation_costs(
+            coefficients, allocation_factor * nb_impressions
+        )
+    co2_campaign_cost = Co2CampaignCostTuple(
+        distrib_server, distrib_network, distrib_terminal, *allocation_costs
     )
     computation_logger.info(co2_campaign_cost)
-    return co2_campaign_cost
+    return co2_campaign_cost.to_model() if as_model else co2_campaign_cost
@@ -0,0 +1,80 @@
+"""
+Index of the referenced countries, resolving their alpha-2, alpha-3 and numeric ISO 3166-1 codes, and their common names.
+
+Codes and names are normalized once when the index is built, and looked up in a single dictionary whatever their
+kind: case and surrounding or repeated spaces are ignored, and numeric codes may be given with or without their
+leading zeros.
+
+>>> countries.resolve("fra"), countries.resolve("250"), countries.resolve("France")
+('FR', 'FR', 'FR')
+"""
+
+import functools
+import os
+import typing
+
+from carbon.utils import load_yaml
+
+
+def normalize(code: typing.Any) -> str:
+    """Return the normalized form of a country code or name, as searched in the index."""
+    text = " ".join(str(code).split()).upper()
+    if text.isascii() and text.isdigit():
+        return str(int(text))
+    return text
+
+
+class CountryIndex(typing.NamedTuple):
+    """Alpha-2 code of each country, by normalized alpha-2, alpha-3 and numeric code, and by name."""
+
+    alpha_2: dict[str, str]
+
+    @classmethod
+    def from_countries(cls, countries: dict[str, dict]) -> "CountryIndex":
+        """
+        Return the index of countries given by alpha-2 code, each one with its ``alpha_3`` code,
+        its ``numeric`` code if any, and its ``names``.
+
+        Raises:
+            ValueError: if a code or a name refers to two different countries.
+        """
+        alpha_2 = {}
+        for code, country in countries.items():
+            keys = [code, country["alpha_3"], *country.get("names", ())]
+            if "numeric" in country:
+                keys.append(country["numeric"])
+            for key in map(normalize, keys):
+                if alpha_2.setdefault(key, code) != code:
+                    raise ValueError(
+                        f"{key} refers to both {alpha_2[key]} and {code} countries"
+                    )
+        return cls(alpha_2)
+
+    def get(self, code: typing.Any, default: str | None = None) -> str | None:
+        """Return the alpha-2 code of a country code or name, or ``default`` if it is not referenced."""
+        return self.alpha_2.get(normalize(code), default)
+
+    def resolve(self, code: typing.Any) -> str:
+        """
+        Return the alpha-2 code of a country code or name.
+
+        Raises:
+            KeyError: if the country is not referenced.
+        """
+        try:
+            return self.alpha_2[normalize(code)]
+        except KeyError:
+            raise KeyError(f"Country {code!r} not referenced") from None
+
+
+@functools.cache
+def country_index() -> CountryIndex:
+    """Return the index of the countries referenced by the package, loaded once."""
+    return CountryIndex.from_countries(
+        load_yaml(os.path.join(os.path.dirname(__file__), "countries.yml"))
+    )
+
+
+def resolve(code: typing.Any) -> str:
+    """Return the alpha-2 code of a country code or name, see :meth:`CountryIndex.resolve`."""
+    return country_index().resolve(code)
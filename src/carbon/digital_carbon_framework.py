@@ -2,14 +2,231 @@
 This is the python implementation of the DigitalCarbonFramework referential to compute the carbon emissions of an advertising campaign.
 """
 
+import dataclasses
+import functools
+import itertools
 import os
-from typing import Literal
+import types
+from collections.abc import Callable
+from typing import Literal, NamedTuple, TypeVar
 
-import yaml
 from pydantic.dataclasses import dataclass
 
-from carbon import logger
-from carbon.compute_footprints import Co2Cost, Distribution
+from carbon import countries, logger, metrics
+from carbon.compute_footprints import Co2Cost, Distribution, cached_terminal_cost
+from carbon.utils import load_yaml
+
+HOURS_IN_YEARS = 8766
+SECONDS_IN_YEARS = 24 * 365.25 * 3600
+FROM_KILO = 1 / 1000
+SECONDS_TO_HOUR = 1 / 3600
+
+_mutations = itertools.count(1)
+_mutation_count = 0
+"""Incremented on any mutation of any set of parameters, to invalidate the cached coefficients."""
+
+
+class _Parameters:
+    """Base class of the parameters, keeping track of their mutations, and forbidding them once frozen."""
+
+    _frozen = False
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+            return
+        if self._frozen:
+            raise dataclasses.FrozenInstanceError(
+                f"cannot assign to field {name!r} of a frozen {type(self).__name__}"
+            )
+        super().__setattr__(name, value)
+        global _mutation_count
+        _mutation_count = next(_mutations)
+
+
+_TARGET_COUNTRY_PARAMETERS = (
+    ("distribution_server_use", "emission_factor_target_country"),
+    ("distribution_network_use", "emission_factor_target_country"),
+    ("distribution_terminal_use", "emission_factor_target_country"),
+    ("allocation_servers_use", "emission_factor_country"),
+)
+"""Parameters set to the emission factor of the target country, by set of parameters."""
+
+
+@functools.cache
+def _load_emission_factors(file_name: str) -> dict[str, float]:
+    """Load emission factors by alpha code, once for all the frameworks."""
+    return load_yaml(os.path.join(os.path.dirname(__file__), file_name))
+
+
+class Coefficients(NamedTuple):
+    """Per-unit Co2 factors of a Framework, from which the costs of the pillars are derived.
+
+    Factors of the allocation pillars are expressed per active path, of the distribution servers & network per ko
+    delivered, and of the terminals per second of view on each device.
+    """
+
+    distrib_server_use: float
+    distrib_server_manufacturing: float
+    distrib_network_use: float
+    distrib_network_manufacturing: float
+    allocation_network_use: float
+    allocation_network_manufacturing: float
+    allocation_server_use: float
+    allocation_server_manufacturing: float
+
+    connected_tv_use: float
+    connected_tv_manufacturing: float
+    desktop_use: float
+    desktop_manufacturing: float
+    tablet_use: float
+    tablet_manufacturing: float
+    smart_phone_use: float
+    smart_phone_manufacturing: float
+
+    programmatic_paths_video: float
+    """Number of active paths of a programmatic video impression"""
+    programmatic_paths_display: float
+    """Number of active paths of a programmatic display impression"""
+    adcall_paths_video: float
+    """Number of active paths of a video ad call"""
+    adcall_paths_display: float
+    """Number of active paths of a display ad call"""
+
+
+def compile_coefficients(parameters) -> Coefficients:
+    """
+    Evaluate the formulas of the pillars into per-unit factors.
+
+    Only attributes lookups and arithmetic are involved, so this works for any object structured as a
+    :class:`Framework`, whatever the numeric type of its parameters.
+
+    :param parameters: a Framework, or any object exposing the same parameters.
+    :rtype: Coefficients
+    """
+    p = parameters
+    allocation_factor = (
+        p.allocation_network_servers.publisher_activated_paths_share
+        * p.allocation_network_servers.ssp_activated_paths_share
+    )
+    terminal = p.distribution_terminal_use
+    manufacturing = p.distribution_terminal_manufacturing
+    smart_phone_power = (
+        terminal.smart_phone_average_power_watt_app
+        if terminal.smartphone_usage == "app"
+        else terminal.smart_phone_average_power_watt_browser
+    )
+
+    def device_use(average_power_watt):
+        return (
+            average_power_watt
+            * FROM_KILO
+            * terminal.emission_factor_target_country
+            * SECONDS_TO_HOUR
+        )
+
+    def device_manufacturing(cost_kgco2, daily_use_hours, lifetime_years):
+        return cost_kgco2 * SECONDS_TO_HOUR / (daily_use_hours * lifetime_years * 365)
+
+    return Coefficients(
+        distrib_server_use=p.distribution_server_use.pue_mean
+        * (
+            p.distribution_server_use.server_share_local
+            * p.distribution_server_use.emission_factor_target_country
+            * p.distribution_server_use.energy_efficiency_server_target_country
+            + p.distribution_server_use.server_share_worldwide
+            * p.distribution_server_use.emission_factor_worldwide
+            * p.distribution_server_use.energy_efficiency_server_worldwide
+        ),
+        distrib_server_manufacturing=p.distribution_server_manufacturing.annual_manufacturing_cost_kgco2
+        / p.distribution_server_manufacturing.bandwidth_server_ko_per_s
+        / SECONDS_IN_YEARS,
+        distrib_network_use=(
+            p.distribution_network_use.fixed_mobile_usage_share
+            * p.distribution_network_use.energy_efficiency_mobile_in_use_kWh_per_kO
+            + p.distribution_network_use.fixed_network_usage_share
+            * p.distribution_network_use.energy_efficiency_fixed_network_in_use_kWh_per_kO
+        )
+        * (
+            p.distribution_network_use.server_share_local
+            * p.distribution_network_use.emission_factor_target_country
+            + p.distribution_network_use.server_share_datacenter
+            * p.distribution_network_use.emission_factor_worldwide
+        ),
+        distrib_network_manufacturing=(
+            p.distribution_network_manufacturing.fixed_network_usage_share
+            * p.distribution_network_manufacturing.transport_cost_on_fixed_network_kgCo2_per_kO
+            + p.distribution_network_manufacturing.fixed_mobile_usage_share
+            * p.distribution_network_manufacturing.transport_cost_on_mobile_kgCo2_per_kO
+        ),
+        allocation_network_use=(
+            p.allocation_network_use.nb_requests_per_active_path
+            * p.allocation_network_use.mean_https_request_k0
+            * (1 + p.allocation_network_use.uncertainty_margin)
+            * p.allocation_network_use.fixed_network_use
+            * p.allocation_network_use.energy_efficiency_fixed_network_in_use_kWh_per_kO
+            * p.allocation_network_use.network_trafic_in_datacenter_country_share
+            * p.allocation_network_use.emission_factor_server
+        ),
+        allocation_network_manufacturing=(
+            p.allocation_network_manufacturing.nb_requests_per_active_path
+            * p.allocation_network_manufacturing.mean_https_request_k0
+            * (1 + p.allocation_network_manufacturing.uncertainty_margin)
+            * p.allocation_network_manufacturing.fixed_network_use
+            * p.allocation_network_manufacturing.impact_1ko_transport_on_fixed_network_kgCo2_per_kO
+        ),
+        allocation_server_use=(
+            p.allocation_servers_use.nb_server_requests_per_active_path
+            * p.allocation_servers_use.pue
+            * (1 + p.allocation_servers_use.server_consumption)
+            * p.allocation_servers_use.server_time_calculation_during_auction_s
+            * p.allocation_servers_use.vm_mean_power_in_kW
+            * (
+                p.allocation_servers_use.server_share_local
+                * p.allocation_servers_use.emission_factor_country
+                + p.allocation_servers_use.server_share_worldwide
+                * p.allocation_servers_use.emission_factor_worldwide
+            )
+        ),
+        allocation_server_manufacturing=(
+            p.allocation_servers_manufacturing.nb_server_requests_per_active_path
+            * p.allocation_servers_manufacturing.annual_manufacturing_cost_kgco2
+            / p.allocation_servers_manufacturing.nb_vm_servers_per_physic_server
+            * (1 + p.allocation_servers_manufacturing.server_consumption)
+            * p.allocation_servers_manufacturing.server_time_calculation_during_auction_s
+            / HOURS_IN_YEARS
+        ),
+        connected_tv_use=device_use(terminal.tv_average_power_watt),
+        connected_tv_manufacturing=device_manufacturing(
+            manufacturing.tv_manufacturing_cost_kgco2,
+            manufacturing.tv_average_daily_use_hours_per_day,
+            manufacturing.tv_average_lifetime_years,
+        ),
+        desktop_use=device_use(terminal.desktop_average_power_watt),
+        desktop_manufacturing=device_manufacturing(
+            manufacturing.desktop_manufacturing_cost_kgco2,
+            manufacturing.desktop_average_daily_use_hours_per_day,
+            manufacturing.desktop_average_lifetime_years,
+        ),
+        tablet_use=device_use(terminal.tablet_average_power_watt),
+        tablet_manufacturing=device_manufacturing(
+            manufacturing.tablet_manufacturing_cost_kgco2,
+            manufacturing.tablet_average_daily_use_hours_per_day,
+            manufacturing.tablet_average_lifetime_years,
+        ),
+        smart_phone_use=device_use(smart_phone_power),
+        smart_phone_manufacturing=device_manufacturing(
+            manufacturing.smart_phone_manufacturing_cost_kgco2,
+            manufacturing.smart_phone_average_daily_use_hours_per_day,
+            manufacturing.smart_phone_average_lifetime_years,
+        ),
+        programmatic_paths_video=allocation_factor
+        * p.allocation_network_servers.nb_paths_video,
+        programmatic_paths_display=allocation_factor
+        * p.allocation_network_servers.nb_paths_display,
+        adcall_paths_video=p.allocation_network_servers.nb_paths_video / 10,
+        adcall_paths_display=p.allocation_network_servers.nb_paths_display / 10,
+    )
 
 
 @dataclass
@@ -29,11 +246,11 @@ class Device:
 
 
 @dataclass
-class Framework:
+class Framework(_Parameters):
     """Class representating all the component of the programmatic advertising chain."""
 
     @dataclass
-    class AllocationNetworkUse:
+    class AllocationNetworkUse(_Parameters):
         """Parameters related to the utilization of the network for the Allocation part."""
 
         nb_requests_per_active_path: int
@@ -52,7 +269,7 @@ class Framework:
         """Emission factor for the electricity consumed by the servers (to be adapted depending on the location of the servers) (kgCO2e/kWh)"""
 
     @dataclass
-    class AllocationNetworkManufacturing:
+    class AllocationNetworkManufacturing(_Parameters):
         """Parameters related to the fabrication, utilization and life cycle of the network for the Allocation part."""
 
         nb_requests_per_active_path: int
@@ -66,7 +283,7 @@ class Framework:
         """Impact of transporting 1 KB of data via fixed network including manufacturing, transport and end of life (excluding use) (kgCO2e/ko)"""
 
     @dataclass
-    class AllocationServersUse:
+    class AllocationServersUse(_Parameters):
         """Parameters related to the utilization of the servers for the Allocation part."""
 
         nb_server_requests_per_active_path: int
@@ -89,7 +306,7 @@ class Framework:
         """International electricity emission factor for IT uses"""
 
     @dataclass
-    class AllocationServersManufacturing:
+    class AllocationServersManufacturing(_Parameters):
         """Parameters related to the to the fabrication, utilization and life cycle  of the servers for the Allocation part."""
 
         nb_server_requests_per_active_path: int
@@ -104,7 +321,7 @@ class Framework:
         """Modeling of server consumption linked to uses excluding auctions and distribution (reporting, machine learning, back-end, etc.)"""
 
     @dataclass
-    class AllocationAndServers:
+    class AllocationAndServers(_Parameters):
         """Parameters related to the to the fabrication, utilization and life cycle of both network &  servers for the Allocation part."""
 
         nb_paths_display: int
@@ -117,7 +334,7 @@ class Framework:
         """Share of potential paths activated at each print (ssp)"""
 
     @dataclass
-    class DistributionServerUse:
+    class DistributionServerUse(_Parameters):
         """Parameters related to the utilization of the server for the distribution part."""
 
         pue_mean: float
@@ -136,7 +353,7 @@ class Framework:
         """Electricity emission factor in the target country (kgCO2e/kWh)"""
 
     @dataclass
-    class DistributionServerManufacturing:
+    class DistributionServerManufacturing(_Parameters):
         """Parameters related to the fabrication, utilization and life cycle of the server for the distribution part"""
 
         annual_manufacturing_cost_kgco2: float
@@ -145,7 +362,7 @@ class Framework:
         """Server bandwidth (Ko/s)"""
 
     @dataclass
-    class DistributionNetworkUse:
+    class DistributionNetworkUse(_Parameters):
         """Parameters related to the utilization of the network for the distribution part."""
 
         fixed_network_usage_share: float
@@ -166,7 +383,7 @@ class Framework:
         """Emission factor of the electricity consumed worldwide  (kgCO2e/kWh)"""
 
     @dataclass
-    class DistributionNetworkManufacturing:
+    class DistributionNetworkManufacturing(_Parameters):
         """Parameters related to the fabrication, utilization and life cycle of the network for the distribution part."""
 
         fixed_network_usage_share: float
@@ -179,7 +396,7 @@ class Framework:
         """Impact of transporting 1 KB of data via mobile network including manufacturing, transport and end of life (excluding use) (kgCO2e/ko)"""
 
     @dataclass
-    class DistributionTerminalUse:
+    class DistributionTerminalUse(_Parameters):
         """Parameters related to the utilization of the terminals for the distribution part."""
 
         smartphone_usage: Literal["app", "browser"]
@@ -198,7 +415,7 @@ class Framework:
         """Emission factor of the electricity consumed by the audience"""
 
     @dataclass
-    class DistributionTerminalManufacturing:
+    class DistributionTerminalManufacturing(_Parameters):
         """Parameters related to the fabrication, utilization and life cycle of the terminals for the distribution part."""
 
         desktop_average_lifetime_years: float
@@ -253,11 +470,16 @@ class Framework:
     distribution_terminal_use: DistributionTerminalUse
     distribution_terminal_manufacturing: DistributionTerminalManufacturing
 
-    _emission_factors_dict_iso2 = None
-    _emission_factors_dict_iso3 = None
+    _cache = None
 
     @classmethod
-    def load(cls, config_file: str | None = None):
+    def load(cls, config_file: str | None = None, frozen: bool = False):
+        """
+        Load a framework from a config file.
+
+        :param config_file: path of the config file. Defaults to the ``digital_carbon_framework.yml`` of the package.
+        :param frozen: whether to load a frozen framework. See :meth:`freeze`.
+        """
         logger.info("Starting instanciation of Framework object")
         if config_file is None:
             logger.debug("Loading default config")
@@ -265,29 +487,133 @@ class Framework:
                 os.path.dirname(__file__), "digital_carbon_framework.yml"
             )
 
-        with open(config_file, "r") as file:
-            config_data = yaml.safe_load(file)
-
-        instance = cls(**config_data)
+        with metrics.timer("config_loading"):
+            instance = cls(**load_yaml(config_file))
         logger.debug("config file properly loaded")
         logger.info("Framework object generated")
+        return instance.freeze() if frozen else instance
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the parameters of the framework can no longer be modified."""
+        return self._frozen
+
+    def _derive(self, parameters: dict) -> "Framework":
+        """Return a frozen framework with the given parameters, sharing the other ones with this frozen framework."""
+        for sub_parameters in parameters.values():
+            sub_parameters._frozen = True
+        instance = type(self)(
+            **{
+                f.name: parameters.get(f.name, getattr(self, f.name))
+                for f in dataclasses.fields(self)
+            }
+        )
+        instance._frozen = True
         return instance
 
+    def freeze(self) -> "Framework":
+        """
+        Return a frozen copy of the framework, or the framework itself if it is already frozen.
+
+        The parameters of a frozen framework can not be modified, so that it can safely be shared across threads.
+        Variants are derived with :meth:`with_country` and :meth:`with_overrides`.
+        """
+        if self._frozen:
+            return self
+        return self._derive(
+            {
+                f.name: dataclasses.replace(getattr(self, f.name))
+                for f in dataclasses.fields(self)
+            }
+        )
+
+    def with_country(self, alpha_code: str) -> "Framework":
+        """
+        Return a frozen variant of the framework for the specified target country.
+
+        Only the parameters depending on the target country are copied, the other ones are shared with this framework.
+
+        :param alpha_code: alpha_code of the specified country, either iso2, iso3, numeric, or its name, see :mod:`carbon.countries`.
+        """
+        with metrics.timer("country_switching"):
+            return self.with_emission_factor(self._emission_factor(alpha_code))
+
+    def with_emission_factor(self, emission_factor: float) -> "Framework":
+        """
+        Return a frozen variant of the framework, with the emission factor of the target country set to the given value.
+
+        Only the parameters depending on the target country are copied, the other ones are shared with this framework.
+
+        :param emission_factor: emission factor of the electricity of the target country, such as one in effect at a given time.
+        """
+        frozen = self.freeze()
+        return frozen._derive(frozen._target_country_parameters(emission_factor))
+
+    def with_overrides(self, **overrides: dict) -> "Framework":
+        """
+        Return a frozen variant of the framework, with some parameters overridden.
+
+        Only the overridden sets of parameters are copied, the other ones are shared with this framework.
+
+        >>> framework.with_overrides(allocation_network_use={"nb_requests_per_active_path": 5})
+
+        :param overrides: new values of the parameters, by set of parameters.
+        """
+        frozen = self.freeze()
+        names = {f.name for f in dataclasses.fields(self)}
+        parameters = {}
+        for name, values in overrides.items():
+            if name not in names:
+                raise TypeError(f"Framework has no parameters {name!r}")
+            parameters[name] = dataclasses.replace(getattr(frozen, name), **values)
+        return frozen._derive(parameters)
+
     @property
     def hours_in_years(self) -> int:
-        return 8766
+        return HOURS_IN_YEARS
 
     @property
     def second_in_years(self) -> float:
-        return 24 * 365.25 * 3600
+        return SECONDS_IN_YEARS
 
     @property
     def from_kilo(self) -> float:
-        return 1 / 1000
+        return FROM_KILO
 
     @property
     def seconds_to_hour(self) -> float:
-        return 1 / 3600
+        return SECONDS_TO_HOUR
+
+    _Tcached = TypeVar("_Tcached")
+
+    def cached(self, key: str, compute: Callable[["Framework"], _Tcached]) -> _Tcached:
+        """
+        Return ``compute(self)``, computed once and computed again only after a mutation of the parameters,
+        either through :meth:`change_target_country` or by assigning any parameter.
+        ``compute`` may run concurrently in several threads, and must always return the same result.
+
+        :param key: name under which the result is cached.
+        :param compute: function deriving a value from the parameters of the framework.
+        """
+        cache = self._cache
+        if cache is None or (not self._frozen and cache[0] != _mutation_count):
+            cache = (_mutation_count, {})
+            self._cache = cache
+        values = cache[1]
+        if key not in values:
+            logger.debug("Computing cached %s", key)
+            with metrics.timer(f"cached.{key}"):
+                values[key] = compute(self)
+        return values[key]
+
+    @property
+    def coefficients(self) -> Coefficients:
+        """
+        Snapshot of the per-unit factors of the framework, cached until the next mutation of the parameters.
+
+        :rtype: Coefficients
+        """
+        return self.cached("coefficients", compile_coefficients)
 
     @property
     def smart_phone(self) -> Device:
@@ -336,45 +662,93 @@ class Framework:
 
     @property
     def emission_factors_dict_iso2(self) -> dict:
-        if self._emission_factors_dict_iso2 is None:
-            with open(
-                os.path.join(os.path.dirname(__file__), "iso2.yml"), "r"
-            ) as yaml_file:
-                self._emission_factors_dict_iso2 = yaml.safe_load(yaml_file)
-        else:
-            self._emission_factors_dict_iso2 = self._emission_factors_dict_iso2
-        return self._emission_factors_dict_iso2
+        return _load_emission_factors("iso2.yml")
 
     @property
     def emission_factors_dict_iso3(self) -> dict:
-        if self._emission_factors_dict_iso3 is None:
-            with open(
-                os.path.join(os.path.dirname(__file__), "iso3.yml"), "r"
-            ) as yaml_file:
-                self._emission_factors_dict_iso3 = yaml.safe_load(yaml_file)
-        else:
-            self._emission_factors_dict_iso3 = self._emission_factors_dict_iso3
-        return self._emission_factors_dict_iso3
+        return _load_emission_factors("iso3.yml")
+
+    @property
+    def emission_factors(self) -> dict[str, float]:
+        """Emission factors of all the referenced countries, by iso2 and iso3 alpha code."""
+        return {**self.emission_factors_dict_iso2, **self.emission_factors_dict_iso3}
+
+    def _target_country_parameters(self, emission_factor: float) -> dict:
+        """Return copies of the parameters depending on the target country, set to the given emission factor."""
+        return {
+            name: dataclasses.replace(
+                getattr(self, name), **{parameter: emission_factor}
+            )
+            for name, parameter in _TARGET_COUNTRY_PARAMETERS
+        }
+
+    def coefficients_with_emission_factor(self, emission_factor) -> Coefficients:
+        """
+        Return the coefficients of the framework with the emission factor of the target country set to the given value.
+
+        The framework is not modified. As with :func:`compile_coefficients`, the emission factor may be of any numeric type,
+        such as a NumPy array holding the factor of each row, to compile the coefficients of all the rows at once.
+        """
+        parameters = {f.name: getattr(self, f.name) for f in dataclasses.fields(self)}
+        for name, parameter in _TARGET_COUNTRY_PARAMETERS:
+            group = parameters[name]
+            values = {f.name: getattr(group, f.name) for f in dataclasses.fields(group)}
+            values[parameter] = emission_factor
+            parameters[name] = types.SimpleNamespace(**values)
+        return compile_coefficients(types.SimpleNamespace(**parameters))
+
+    def _compile_country_coefficients(self) -> dict[str, Coefficients]:
+        parameters = {f.name: getattr(self, f.name) for f in dataclasses.fields(self)}
+        by_emission_factor = {}
+        coefficients = {}
+        for alpha_code, emission_factor in self.emission_factors.items():
+            if emission_factor not in by_emission_factor:
+                by_emission_factor[emission_factor] = compile_coefficients(
+                    types.SimpleNamespace(
+                        **{
+                            **parameters,
+                            **self._target_country_parameters(emission_factor),
+                        }
+                    )
+                )
+            coefficients[alpha_code] = by_emission_factor[emission_factor]
+        return coefficients
+
+    @property
+    def coefficients_by_country(self) -> dict[str, Coefficients]:
+        """
+        Coefficients of the framework for each referenced target country, by iso2 and iso3 alpha code.
+
+        The framework itself is not modified, and the result is cached until the next mutation of the parameters.
+        """
+        return self.cached(
+            "coefficients_by_country", Framework._compile_country_coefficients
+        )
+
+    def _emission_factor(self, alpha_code: str) -> float:
+        try:
+            return self.emission_factors_dict_iso2[countries.resolve(alpha_code)]
+        except KeyError:
+            logger.error("Alpha code %s not in database", alpha_code)
+            logger.info("Emission factors not changed: %s not referenced", alpha_code)
+            raise
 
     def change_target_country(self, alpha_code: str):
         """
         Set the emission factors of the specified country
 
-        :param alpha_code:  alpha_code of the specified country. Support iso2 & iso3 countries (ex: country: 'France', alpha_code='FR' or alpha_code='FRA' supported)
+        :param alpha_code:  alpha_code of the specified country. Support iso2, iso3 & numeric codes, and names, in any case (ex: country: 'France', alpha_code='FR', alpha_code='fra', alpha_code='250' or alpha_code='France' supported)
         :type alpha_code: str
 
         """
-        logger.info(f"Changing Target country to {alpha_code}")
-
-        if len(alpha_code) == 3:
-            emission_factors_dict = self.emission_factors_dict_iso3
-        elif len(alpha_code) == 2:
-            emission_factors_dict = self.emission_factors_dict_iso2
-        else:
-            raise ValueError(f"Alpha code {alpha_code} not iso2 or iso3 compliant")
+        logger.info("Changing Target country to %s", alpha_code)
+        if self._frozen:
+            raise dataclasses.FrozenInstanceError(
+                "cannot change the target country of a frozen Framework, use with_country"
+            )
 
-        try:
-            new_emission_factor = emission_factors_dict[alpha_code]
+        with metrics.timer("country_switching"):
+            new_emission_factor = self._emission_factor(alpha_code)
             self.distribution_server_use.emission_factor_target_country = (
                 new_emission_factor
             )
@@ -385,11 +759,7 @@ class Framework:
                 new_emission_factor
             )
             self.allocation_servers_use.emission_factor_country = new_emission_factor
-            logger.info(f"Emission factors changed to {new_emission_factor} ")
-        except KeyError:
-            logger.error(f"Alpha code {alpha_code} not in database")
-            logger.info(f"Emission factors not changed: {alpha_code} not referenced")
-            raise
+        logger.info("Emission factors changed to %s ", new_emission_factor)
 
     @property
     def allocation_factor(self) -> float:
@@ -436,103 +806,43 @@ class Framework:
 
     @property
     def kgco2_allocation_server(self) -> Co2Cost:
+        """Co2 cost of the allocation servers, per active path."""
+        coefficients = self.coefficients
         return Co2Cost(
-            use=(
-                self.allocation_servers_use.nb_server_requests_per_active_path
-                * self.allocation_servers_use.pue
-                * (1 + self.allocation_servers_use.server_consumption)
-                * self.allocation_servers_use.server_time_calculation_during_auction_s
-                * self.allocation_servers_use.vm_mean_power_in_kW
-                * sum(
-                    [
-                        servers.share * servers.emission_factor
-                        for servers in self.alloc_servers
-                    ]
-                )
-            ),
-            manufacturing=(
-                self.allocation_servers_manufacturing.nb_server_requests_per_active_path
-                * self.allocation_servers_manufacturing.annual_manufacturing_cost_kgco2
-                / self.allocation_servers_manufacturing.nb_vm_servers_per_physic_server
-                * (1 + self.allocation_servers_manufacturing.server_consumption)
-                * self.allocation_servers_manufacturing.server_time_calculation_during_auction_s
-                / self.hours_in_years
-            ),
+            use=coefficients.allocation_server_use,
+            manufacturing=coefficients.allocation_server_manufacturing,
         )
 
     @property
     def kgco2_allocation_network(self) -> Co2Cost:
+        """Co2 cost of the allocation network, per active path."""
+        coefficients = self.coefficients
         return Co2Cost(
-            use=(
-                self.allocation_network_use.nb_requests_per_active_path
-                * self.allocation_network_use.mean_https_request_k0
-                * (1 + self.allocation_network_use.uncertainty_margin)
-                * self.allocation_network_use.fixed_network_use
-                * self.allocation_network_use.energy_efficiency_fixed_network_in_use_kWh_per_kO
-                * self.allocation_network_use.network_trafic_in_datacenter_country_share
-                * self.allocation_network_use.emission_factor_server
-            ),
-            manufacturing=(
-                self.allocation_network_manufacturing.nb_requests_per_active_path
-                * self.allocation_network_manufacturing.mean_https_request_k0
-                * (1 + self.allocation_network_manufacturing.uncertainty_margin)
-                * self.allocation_network_manufacturing.fixed_network_use
-                * self.allocation_network_manufacturing.impact_1ko_transport_on_fixed_network_kgCo2_per_kO
-            ),
+            use=coefficients.allocation_network_use,
+            manufacturing=coefficients.allocation_network_manufacturing,
         )
 
     @property
     def kgco2_distrib_server(self) -> Co2Cost:
+        """Co2 cost of the distribution servers, per ko delivered."""
+        coefficients = self.coefficients
         return Co2Cost(
-            use=self.distribution_server_use.pue_mean
-            * sum(
-                [
-                    servers.share
-                    * servers.emission_factor
-                    * servers.energy_efficiency_kwh_per_ko
-                    for servers in self.distrib_servers
-                ]
-            ),
-            manufacturing=self.distribution_server_manufacturing.annual_manufacturing_cost_kgco2
-            / self.distribution_server_manufacturing.bandwidth_server_ko_per_s
-            / self.second_in_years,
+            use=coefficients.distrib_server_use,
+            manufacturing=coefficients.distrib_server_manufacturing,
         )
 
     @property
     def kgco2_distrib_network(self) -> Co2Cost:
+        """Co2 cost of the distribution network, per ko delivered."""
+        coefficients = self.coefficients
         return Co2Cost(
-            use=(
-                self.distribution_network_use.fixed_mobile_usage_share
-                * self.distribution_network_use.energy_efficiency_mobile_in_use_kWh_per_kO
-                + self.distribution_network_use.fixed_network_usage_share
-                * self.distribution_network_use.energy_efficiency_fixed_network_in_use_kWh_per_kO
-            )
-            * (
-                self.distribution_network_use.server_share_local
-                * self.distribution_network_use.emission_factor_target_country
-                + self.distribution_network_use.server_share_datacenter
-                * self.distribution_network_use.emission_factor_worldwide
-            ),
-            manufacturing=(
-                self.distribution_network_manufacturing.fixed_network_usage_share
-                * self.distribution_network_manufacturing.transport_cost_on_fixed_network_kgCo2_per_kO
-                + self.distribution_network_manufacturing.fixed_mobile_usage_share
-                * self.distribution_network_manufacturing.transport_cost_on_mobile_kgCo2_per_kO
-            ),
+            use=coefficients.distrib_network_use,
+            manufacturing=coefficients.distrib_network_manufacturing,
         )
 
     def kgco2_distrib_terminal(self, devices_repartition: Distribution) -> Co2Cost:
-        Co2Cost_terminals = Co2Cost()
-        for device in [self.tv, self.desktop, self.tablet, self.smart_phone]:
-            kgco2_per_device = self.kgco2_device(device)
-            Co2Cost_terminals.use += (
-                kgco2_per_device.use * devices_repartition.get_ratio(device.name, 0)
-            )
-            Co2Cost_terminals.manufacturing += (
-                kgco2_per_device.manufacturing
-                * devices_repartition.get_ratio(device.name, 0)
-            )
-        return Co2Cost_terminals
+        """Co2 cost of the terminals, per second of view over the given devices repartition."""
+        return cached_terminal_cost(self.coefficients, devices_repartition).to_model()
 
     def kgco2_device(self, specified_device) -> Co2Cost:
         return Co2Cost(
@@ -0,0 +1,203 @@
+"""
+Opt-in metrics of the footprint computations: calls and rows per entry point, and time spent per section.
+
+Metrics are disabled by default, and then cost a single flag check per instrumented call.
+
+>>> from carbon import metrics
+>>> metrics.enable()
+>>> ...  # compute some footprints
+>>> metrics.snapshot()["entry_points"]["compute_footprints.impressions_cost"]
+{'calls': 1, 'rows': 1, 'seconds': 2.1e-05}
+>>> print(metrics.to_prometheus())
+"""
+
+import contextlib
+import functools
+import threading
+import time
+import typing
+from collections.abc import Callable
+
+_enabled = False
+_lock = threading.Lock()
+_entry_points: dict[str, list] = {}
+"""[calls, rows, seconds] by entry point."""
+_sections: dict[str, list] = {}
+"""[calls, seconds] by section."""
+_disabled_timer = contextlib.nullcontext()
+
+
+def enable() -> None:
+    """Start collecting metrics."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop collecting metrics. The metrics collected so far are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Forget all the metrics collected so far."""
+    with _lock:
+        _entry_points.clear()
+        _sections.clear()
+
+
+def record_call(entry_point: str, rows: int, seconds: float) -> None:
+    with _lock:
+        values = _entry_points.setdefault(entry_point, [0, 0, 0.0])
+        values[0] += 1
+        values[1] += rows
+        values[2] += seconds
+
+
+def record_section(section: str, seconds: float) -> None:
+    with _lock:
+        values = _sections.setdefault(section, [0, 0.0])
+        values[0] += 1
+        values[1] += seconds
+
+
+class _Timer:
+    __slots__ = ("section", "start")
+
+    def __init__(self, section: str):
+        self.section = section
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record_section(self.section, time.perf_counter() - self.start)
+
+
+def timer(section: str) -> typing.ContextManager:
+    """
+    Return a context manager measuring the time spent in a section, such as ``validation`` or ``pillar.kgco2_distrib_server``.
+
+    :param section: name of the measured section.
+    """
+    return _Timer(section) if _enabled else _disabled_timer
+
+
+_Tcallable = typing.TypeVar("_Tcallable", bound=Callable)
+
+
+def instrument(
+    entry_point: str, rows: Callable[[typing.Any], int] | None = None
+) -> Callable[[_Tcallable], _Tcallable]:
+    """
+    Decorate an entry point to count its calls, the rows it processed and the time spent in it.
+
+    :param entry_point: name of the entry point.
+    :param rows: function returning the number of rows processed, from the result of a call. Each call processes one row by default.
+    """
+
+    def decorator(function: _Tcallable) -> _Tcallable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            record_call(
+                entry_point,
+                1 if rows is None else rows(result),
+                time.perf_counter() - start,
+            )
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def merge(collected: dict[str, dict[str, dict[str, float]]]) -> None:
+    """
+    Add metrics collected elsewhere, such as by the workers of :func:`carbon.parallel.pool`, to the metrics of this process.
+
+    :param collected: metrics, as returned by :func:`snapshot`.
+    """
+    with _lock:
+        for name, metric in collected["entry_points"].items():
+            values = _entry_points.setdefault(name, [0, 0, 0.0])
+            values[0] += metric["calls"]
+            values[1] += metric["rows"]
+            values[2] += metric["seconds"]
+        for name, metric in collected["sections"].items():
+            values = _sections.setdefault(name, [0, 0.0])
+            values[0] += metric["calls"]
+            values[1] += metric["seconds"]
+
+
+def snapshot() -> dict[str, dict[str, dict[str, float]]]:
+    """
+    Return a copy of the metrics collected so far.
+
+    :return: ``{"entry_points": {name: {"calls", "rows", "seconds"}}, "sections": {name: {"calls", "seconds"}}}``
+    """
+    with _lock:
+        return {
+            "entry_points": {
+                name: {"calls": calls, "rows": rows, "seconds": seconds}
+                for name, (calls, rows, seconds) in _entry_points.items()
+            },
+            "sections": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in _sections.items()
+            },
+        }
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(prefix: str = "carbon") -> str:
+    """
+    Return the metrics collected so far in the Prometheus text exposition format.
+
+    :param prefix: prefix of the metric names.
+    """
+    values = snapshot()
+    families = (
+        ("calls_total", "Number of calls", "entry_points", "entry_point", "calls"),
+        (
+            "rows_total",
+            "Number of rows processed",
+            "entry_points",
+            "entry_point",
+            "rows",
+        ),
+        (
+            "entry_point_seconds_total",
+            "Time spent in the entry point",
+            "entry_points",
+            "entry_point",
+            "seconds",
+        ),
+        ("section_calls_total", "Number of runs", "sections", "section", "calls"),
+        (
+            "section_seconds_total",
+            "Time spent in the section",
+            "sections",
+            "section",
+            "seconds",
+        ),
+    )
+    lines = []
+    for suffix, description, group, label, field in families:
+        name = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {name} {description}, by {label.replace('_', ' ')}.")
+        lines.append(f"# TYPE {name} counter")
+        for key, metric in sorted(values[group].items()):
+            lines.append(f'{name}{{{label}="{_escape(key)}"}} {metric[field]!r}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,258 @@
+"""
+Out-of-core computation of the Co2 cost of columns larger than memory, stored as raw binary files or NumPy arrays.
+
+Input columns are read, and computed, ``chunk_size`` rows at a time into ``.npy`` files, one per use and manufacturing
+cost of each pillar, and one for the total cost, of which only the rows of the chunk are memory-mapped. The memory
+used is bounded by the size of a chunk, whatever the number of rows. After each chunk, the results are flushed to disk
+and the progress is recorded in the output directory, so that an interrupted computation resumes from the last
+completed chunk when started again on the same inputs. Inputs are identified in the progress by the path, size and
+modification time of their files, a hash of the arrays, read chunk by chunk, and the value of the scalars.
+
+.. code-block:: python
+
+    from pathlib import Path
+
+    output = outofcore.compute(
+        framework,
+        "costs/",
+        kind="bids",
+        nb_bids=Path("nb_bids.f8"),
+        country=outofcore.RawColumn("countries.bin", "S3"),
+    )
+    output.total  # Memory-mapped total cost of each row
+"""
+
+import hashlib
+import json
+import os
+import typing
+
+import numpy as np
+
+from carbon import batch, logger
+from carbon.digital_carbon_framework import Framework
+from carbon.streaming import KINDS, TOTAL_COLUMN, Kind
+
+CHUNK_SIZE = 1_000_000
+"""Default number of rows computed at once."""
+PROGRESS_FILE = "progress.json"
+"""File of the output directory recording the completed chunks."""
+
+
+class RawColumn(typing.NamedTuple):
+    """Column stored as a raw binary file, without header, such as written by :meth:`numpy.ndarray.tofile`."""
+
+    path: str | os.PathLike
+    dtype: str = "float64"
+    """Type of the values. Text columns are fixed-width byte strings, such as ``"S7"`` for creative types."""
+
+    @property
+    def rows(self) -> int:
+        return os.path.getsize(self.path) // np.dtype(self.dtype).itemsize
+
+    def read(self, chunk: slice) -> np.ndarray:
+        """Read the rows of a chunk from the file, without mapping the rest of the file."""
+        dtype = np.dtype(self.dtype)
+        start, stop, _ = chunk.indices(self.rows)
+        return np.fromfile(
+            self.path, dtype=dtype, count=stop - start, offset=start * dtype.itemsize
+        )
+
+
+class Output(typing.NamedTuple):
+    """Memory-mapped costs of every row, read from the ``.npy`` files of the output directory."""
+
+    costs: batch.Co2CampaignCostArray | batch.BidCostArray | batch.AdcallCostArray
+    """Costs of each pillar."""
+    total: np.ndarray
+    """Total kgco2 cost of each row."""
+
+
+def _open(value: typing.Any) -> typing.Any:
+    if isinstance(value, os.PathLike):
+        return RawColumn(value)
+    return value
+
+
+def _rows(column: typing.Any) -> int | None:
+    if isinstance(column, RawColumn):
+        return column.rows
+    return len(column) if np.ndim(column) > 0 else None
+
+
+def _chunk(column: typing.Any, chunk: slice) -> typing.Any:
+    if isinstance(column, RawColumn):
+        values = column.read(chunk)
+    elif np.ndim(column) == 0:
+        return column
+    else:
+        values = np.asarray(column[chunk])
+    if values.dtype.kind == "S":
+        values = values.astype(str)
+    return values
+
+
+def _fingerprint(column: typing.Any, chunk_size: int) -> dict:
+    """
+    Return what identifies the values of an input column, recorded in the progress of the computation.
+
+    Files are identified by their path, type, size and modification time, arrays by a hash of their values read
+    chunk by chunk, and scalars by their value.
+    """
+    if isinstance(column, RawColumn):
+        stat = os.stat(column.path)
+        return {
+            "path": os.path.abspath(column.path),
+            "dtype": column.dtype,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    if np.ndim(column) == 0:
+        return {"value": column.item() if isinstance(column, np.generic) else column}
+    digest = hashlib.blake2b()
+    for start in range(0, len(column), chunk_size):
+        values = np.asarray(column[start : start + chunk_size])
+        if values.dtype.kind == "O":
+            values = values.astype(str)
+        digest.update(values.dtype.str.encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return {"hash": digest.hexdigest()}
+
+
+def _output_columns(kind: Kind) -> tuple[str, ...]:
+    return tuple(
+        f"{pillar}_{part}"
+        for pillar in KINDS[kind].result._fields
+        for part in ("use", "manufacturing")
+    ) + (TOTAL_COLUMN,)
+
+
+def _read_progress(path: str, expected: dict) -> int:
+    """Return the number of rows already computed into the output directory, 0 if none."""
+    try:
+        with open(path) as file:
+            progress = json.load(file)
+    except FileNotFoundError:
+        return 0
+    computed = progress.pop("computed_rows")
+    if progress != expected:
+        raise ValueError(
+            f"{os.path.dirname(path)} holds the results of another computation, "
+            f"remove it to start over: {progress} != {expected}"
+        )
+    return computed
+
+
+def _write_progress(path: str, progress: dict):
+    # Written aside then renamed, so that an interruption never leaves a partial file.
+    with open(path + ".tmp", "w") as file:
+        json.dump(progress, file)
+    os.replace(path + ".tmp", path)
+
+
+def compute(
+    framework: Framework,
+    directory: str,
+    kind: Kind = "impressions",
+    chunk_size: int = CHUNK_SIZE,
+    **columns: typing.Any,
+) -> Output:
+    """
+    Compute the Co2 cost of every row of the columns, chunk by chunk, into memory-mapped files of ``directory``.
+
+    If ``directory`` holds the results of an interrupted computation with the same inputs, only the remaining chunks
+    are computed.
+
+    Args:
+        framework (Framework): Framework object
+        directory (str): directory of the ``<pillar>_use.npy``, ``<pillar>_manufacturing.npy`` and ``kgco2.npy`` results, created if needed.
+        kind (Kind, optional): kind of the rows, either ``"impressions"``, ``"bids"`` or ``"adcalls"``. Defaults to impressions.
+        chunk_size (int, optional): number of rows computed at once. Defaults to 1 000 000.
+        columns: arguments of the function of :mod:`carbon.batch` computing ``kind``. Each one is a NumPy array,
+            such as a :class:`numpy.memmap`, a :class:`RawColumn` or a :class:`os.PathLike` path of a raw float64 file,
+            or a scalar for all the rows.
+
+    Raises:
+        ValueError: if any row is invalid, the first row of its chunk being given in the message, if the columns have
+            different lengths, or if ``directory`` holds the results of another computation.
+        KeyError: if any country is not referenced.
+
+    Returns:
+        Output: the memory-mapped costs of every row.
+    """
+    columns = {name: _open(value) for name, value in columns.items()}
+    lengths = {_rows(column) for column in columns.values()} - {None}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns of different lengths: {sorted(lengths)}")
+    rows = lengths.pop() if lengths else 1
+
+    os.makedirs(directory, exist_ok=True)
+    progress_file = os.path.join(directory, PROGRESS_FILE)
+    progress = {
+        "kind": kind,
+        "rows": rows,
+        "chunk_size": chunk_size,
+        "coefficients": list(framework.coefficients),
+        "columns": {
+            name: _fingerprint(column, chunk_size)
+            for name, column in sorted(columns.items())
+        },
+    }
+    computed = _read_progress(progress_file, progress)
+    offsets = {}
+    for name in _output_columns(kind):
+        path = os.path.join(directory, f"{name}.npy")
+        if computed:
+            output = np.load(path, mmap_mode="r")
+        else:
+            output = np.lib.format.open_memmap(
+                path, mode="w+", dtype=np.float64, shape=(rows,)
+            )
+        offsets[name] = output.offset
+        del output
+    if computed:
+        logger.info("Resuming from row %s of %s", computed, rows)
+
+    for start in range(computed, rows, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        try:
+            costs = KINDS[kind].function(
+                framework,
+                **{name: _chunk(column, chunk) for name, column in columns.items()},
+            )
+        except (ValueError, KeyError) as error:
+            raise type(error)(f"Chunk starting at row {start}: {error}") from error
+        results = costs.to_dict()
+        results[TOTAL_COLUMN] = costs.overall.total
+        # Only the rows of the chunk are mapped, and unmapped once flushed to disk.
+        for name, offset in offsets.items():
+            output = np.memmap(
+                os.path.join(directory, f"{name}.npy"),
+                dtype=np.float64,
+                mode="r+",
+                offset=offset + start * 8,
+                shape=(min(chunk_size, rows - start),),
+            )
+            output[:] = results[name]
+            output.flush()
+            del output
+        computed = min(start + chunk_size, rows)
+        _write_progress(progress_file, {**progress, "computed_rows": computed})
+        logger.info("Computed rows %s to %s", start, computed)
+
+    results = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in _output_columns(kind)
+    }
+    result = KINDS[kind].result
+    return Output(
+        costs=result(
+            *(
+                batch.Co2CostArray(
+                    results[f"{pillar}_use"], results[f"{pillar}_manufacturing"]
+                )
+                for pillar in result._fields
+            )
+        ),
+        total=results[TOTAL_COLUMN],
+    )
@@ -1,10 +1,99 @@
+import functools
 import typing
 
+import numpy as np
 import pandas as pd
 
-from carbon import logger
+from carbon import batch, logger, metrics, parallel
 from carbon.compute_footprints import Distribution
 from carbon.digital_carbon_framework import Framework
+from carbon.utils import DEVICES
+
+DEVICES_COLUMNS = DEVICES
+"""Columns holding the weights of the devices repartition."""
+IMPRESSIONS_COLUMNS = (
+    "nb_impressions",
+    "creative_type",
+    "allocation",
+    "creative_size_ko",
+    "creative_avg_view_s",
+    *DEVICES_COLUMNS,
+)
+"""Columns read by :func:`impressions_cost`."""
+BIDS_COLUMNS = ("nb_bids",)
+"""Columns read by :func:`bids_cost`."""
+ADCALLS_COLUMNS = ("nb_ad_calls", "creative_type")
+"""Columns read by :func:`adcalls_cost`."""
+CHUNK_SIZE = 1_000_000
+"""Default number of rows of the partitions computed by each worker."""
+
+
+def _column(df: "pd.DataFrame", name: str) -> np.ndarray:
+    """Return a column as a NumPy array, without copying its values when possible."""
+    return np.asarray(df[name].array)
+
+
+def _country(df: "pd.DataFrame", country_column: str | None) -> pd.Categorical | None:
+    """Return the alpha codes of a column as categories, so that each distinct code is resolved only once."""
+    if country_column is None:
+        return None
+    column = df[country_column]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.array
+    return pd.Categorical(column)
+
+
+def _partition_cost(
+    function: typing.Callable,
+    country_column: str | None,
+    framework: Framework,
+    partition: "pd.DataFrame | slice",
+) -> np.ndarray:
+    if isinstance(partition, slice):
+        partition = parallel.shared().iloc[partition]
+    return function(partition, framework, country_column).to_numpy()
+
+
+def _in_parallel(
+    function: typing.Callable,
+    df: "pd.DataFrame",
+    campaign_param: Framework,
+    columns: tuple[str, ...],
+    country_column: str | None,
+    workers: int,
+    chunk_size: int,
+    fork: bool,
+) -> "pd.Series":
+    """Compute ``function`` over partitions of ``chunk_size`` rows by a pool of ``workers`` processes."""
+    warm = []
+    if country_column is not None:
+        columns = (*columns, country_column)
+        warm.append(batch.country_coefficients)
+    slices = [
+        slice(start, start + chunk_size) for start in range(0, len(df), chunk_size)
+    ]
+
+    if fork:
+        # Forked workers read their partitions from the inherited DataFrame, only the slices are sent.
+        shared, partitions = df, slices
+    else:
+        # Only the columns read are sent to the workers, with the countries as categories.
+        shared, read = None, df[list(columns)]
+        if country_column is not None:
+            read = read.assign(**{country_column: _country(read, country_column)})
+        partitions = (read.iloc[partition] for partition in slices)
+
+    with parallel.pool(campaign_param, workers, warm, shared, fork) as executor:
+        totals = [
+            total
+            for _, total in parallel.imap(
+                executor,
+                functools.partial(_partition_cost, function, country_column),
+                partitions,
+                2 * workers,
+            )
+        ]
+    return pd.Series(np.concatenate(totals) if totals else np.empty(0), index=df.index)
 
 
 def get_impressions_cost_aggregator(
@@ -21,28 +110,52 @@ def get_impressions_cost_aggregator(
             creative_size_ko=row["creative_size_ko"],
             creative_avg_view_s=row["creative_avg_view_s"],
             devices_repartition=Distribution(
-                weights={
-                    k: row[k]
-                    for k in (
-                        "desktop",
-                        "smart_phone",
-                        "tablet",
-                        "connected_tv",
-                    )
-                }
+                weights={k: row[k] for k in DEVICES_COLUMNS}
             ),
         ).overall.total
 
     return impressions_cost_aggregator
 
 
-def impressions_cost(df: "pd.DataFrame", campaign_param: Framework) -> "pd.Series":
-    """Compute the C02 emissions for a number of impressions."""
+@metrics.instrument("pandas.impressions_cost", rows=len)
+def impressions_cost(
+    df: "pd.DataFrame",
+    campaign_param: Framework,
+    country_column: str | None = None,
+    workers: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    fork: bool = False,
+) -> "pd.Series":
+    """Compute the C02 emissions for a number of impressions.
+
+    If ``country_column`` is given, each row is computed for the target country whose alpha code is in this column.
+    If ``workers`` is positive, partitions of ``chunk_size`` rows are computed in parallel by as many processes.
+    If ``fork``, the workers are forked and read their partitions from the DataFrame without copying it, which is only
+    safe if the current process runs no other thread.
+    """
     logger.info("Starting impressions cost")
-    return df.aggregate(
-        get_impressions_cost_aggregator(campaign_param),
-        axis="columns",
+    if workers > 0:
+        return _in_parallel(
+            impressions_cost,
+            df,
+            campaign_param,
+            IMPRESSIONS_COLUMNS,
+            country_column,
+            workers,
+            chunk_size,
+            fork,
+        )
+    costs = batch.impressions_cost(
+        campaign_param,
+        nb_impressions=_column(df, "nb_impressions"),
+        creative_type=_column(df, "creative_type"),
+        allocation=_column(df, "allocation"),
+        creative_size_ko=_column(df, "creative_size_ko"),
+        creative_avg_view_s=_column(df, "creative_avg_view_s"),
+        **{k: _column(df, k) for k in DEVICES_COLUMNS},
+        country=_country(df, country_column),
     )
+    return pd.Series(costs.overall.total, index=df.index)
 
 
 def get_bids_cost_aggregator(
@@ -59,10 +172,62 @@ def get_bids_cost_aggregator(
     return bids_cost_aggregator
 
 
-def bids_cost(df: "pd.DataFrame", campaign_param: Framework) -> "pd.Series":
-    """Compute the bids C02 footprints per row."""
+@metrics.instrument("pandas.bids_cost", rows=len)
+def bids_cost(
+    df: "pd.DataFrame",
+    campaign_param: Framework,
+    country_column: str | None = None,
+    workers: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    fork: bool = False,
+) -> "pd.Series":
+    """Compute the bids C02 footprints per row, optionally for the target country of ``country_column``, and in parallel, see :func:`impressions_cost`."""
     logger.info("Starting bids cost")
-    return df.aggregate(
-        get_bids_cost_aggregator(campaign_param),
-        axis="columns",
+    if workers > 0:
+        return _in_parallel(
+            bids_cost,
+            df,
+            campaign_param,
+            BIDS_COLUMNS,
+            country_column,
+            workers,
+            chunk_size,
+            fork,
+        )
+    costs = batch.bids_cost(
+        campaign_param,
+        nb_bids=_column(df, "nb_bids"),
+        country=_country(df, country_column),
+    )
+    return pd.Series(costs.overall.total, index=df.index)
+
+
+@metrics.instrument("pandas.adcalls_cost", rows=len)
+def adcalls_cost(
+    df: "pd.DataFrame",
+    campaign_param: Framework,
+    country_column: str | None = None,
+    workers: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+    fork: bool = False,
+) -> "pd.Series":
+    """Compute the ad calls C02 footprints per row, optionally for the target country of ``country_column``, and in parallel, see :func:`impressions_cost`."""
+    logger.info("Starting adcalls cost")
+    if workers > 0:
+        return _in_parallel(
+            adcalls_cost,
+            df,
+            campaign_param,
+            ADCALLS_COLUMNS,
+            country_column,
+            workers,
+            chunk_size,
+            fork,
+        )
+    costs = batch.adcalls_cost(
+        campaign_param,
+        nb_ad_calls=_column(df, "nb_ad_calls"),
+        creative_type=_column(df, "creative_type"),
+        country=_country(df, country_column),
     )
+    return pd.Series(costs.overall.total, index=df.index)
@@ -0,0 +1,126 @@
+"""
+Pools of worker processes computing costs with a shared Framework.
+
+The Framework is sent once to each worker, when it starts, rather than along with every task.
+It is frozen first, and its coefficients are computed before being sent, so that the workers do not compute them again.
+If :mod:`carbon.metrics` are enabled when the pool is created, the metrics collected by the workers during each task are
+sent back with its result, and merged into the metrics of the current process.
+
+Workers are started with the default method of the platform. Forking them, so that they inherit the data shared by the
+pool without any copy (see :func:`shared`), is opted into with the ``fork`` argument of :func:`pool`: it is only safe if
+the current process runs no other thread, such as an event loop or a thread pool.
+"""
+
+import collections
+import concurrent.futures
+import multiprocessing
+import operator
+import typing
+from collections.abc import Callable, Iterable, Iterator
+
+from carbon import metrics
+from carbon.digital_carbon_framework import Framework
+
+_Ttask = typing.TypeVar("_Ttask")
+_Tresult = typing.TypeVar("_Tresult")
+
+CAN_FORK = "fork" in multiprocessing.get_all_start_methods()
+"""Whether workers can be forked on this platform, see the ``fork`` argument of :func:`pool`."""
+
+_worker_framework: Framework | None = None
+_worker_shared: typing.Any = None
+
+
+def _init_worker(framework: Framework, shared: typing.Any, collect_metrics: bool):
+    global _worker_framework, _worker_shared
+    _worker_framework = framework
+    _worker_shared = shared
+    if collect_metrics:
+        metrics.enable()
+    else:
+        metrics.disable()
+
+
+def shared() -> typing.Any:
+    """Return the data shared by the pool of the current worker."""
+    return _worker_shared
+
+
+def _call(
+    function: Callable[[Framework, _Ttask], _Tresult], task: _Ttask
+) -> tuple[_Tresult, dict | None]:
+    """Return the result of a task, with the metrics collected while computing it, if enabled."""
+    if not metrics.is_enabled():
+        return function(_worker_framework, task), None
+    metrics.reset()
+    result = function(_worker_framework, task)
+    return result, metrics.snapshot()
+
+
+def pool(
+    framework: Framework,
+    workers: int,
+    warm: Iterable[Callable[[Framework], typing.Any]] = (),
+    shared: typing.Any = None,
+    fork: bool = False,
+) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Return a pool of ``workers`` processes, holding a frozen copy of the framework.
+
+    :param framework: framework used by the tasks of the pool.
+    :param workers: number of processes.
+    :param warm: functions computing cached values of the framework, such as :func:`carbon.batch.country_coefficients`,
+        called before sending the framework to the workers.
+    :param shared: data made available to the tasks through :func:`shared`. Sent once to each worker, or inherited without copy
+        if ``fork``.
+    :param fork: whether to fork the workers, only if the current process runs no other thread.
+    :raises ValueError: if ``fork`` but workers can not be forked on this platform, see :data:`CAN_FORK`.
+    """
+    if fork and not CAN_FORK:
+        raise ValueError("Workers can not be forked on this platform")
+    framework = framework.freeze()
+    for function in (operator.attrgetter("coefficients"), *warm):
+        function(framework)
+    return concurrent.futures.ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("fork") if fork else None,
+        initializer=_init_worker,
+        initargs=(framework, shared, metrics.is_enabled()),
+    )
+
+
+def _result(future: concurrent.futures.Future) -> typing.Any:
+    """Return the result of a task, merging the metrics collected by its worker."""
+    result, collected = future.result()
+    if collected is not None:
+        metrics.merge(collected)
+    return result
+
+
+def imap(
+    executor: concurrent.futures.ProcessPoolExecutor,
+    function: Callable[[Framework, _Ttask], _Tresult],
+    tasks: Iterable[_Ttask],
+    max_pending: int,
+) -> Iterator[tuple[_Ttask, _Tresult]]:
+    """
+    Yield each task with its result ``function(framework, task)``, computed by the workers of a :func:`pool`, in the order of the tasks.
+
+    At most ``max_pending`` tasks are submitted ahead of the results consumed, so that the memory used does not depend on the number of tasks.
+    If a task raises, the pending tasks are cancelled and its exception is raised, the metrics of this task being lost.
+
+    :param function: function computing a task, that can be pickled, such as a function of a module.
+    """
+    pending = collections.deque()
+    try:
+        for task in tasks:
+            pending.append((task, executor.submit(_call, function, task)))
+            if len(pending) >= max_pending:
+                task, future = pending.popleft()
+                yield task, _result(future)
+        while pending:
+            task, future = pending.popleft()
+            yield task, _result(future)
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,336 @@
+"""
+Polars expressions computing the Co2 costs of impressions, bids and ad calls, built from a Framework.
+
+The coefficients of the framework are inlined as literals into expressions over the columns of a frame, so that the
+costs are computed by Polars itself, in parallel, and in streaming mode over lazy frames larger than memory. The
+expressions are evaluated in the same order as :mod:`carbon.batch`, so that both give the same results.
+
+.. code-block:: python
+
+    from carbon import polars as carbon_pl
+
+    costs = (
+        pl.scan_parquet("impressions.parquet")
+        .with_columns(carbon_pl.impressions_cost(framework))
+        .group_by("campaign_id")
+        .agg(pl.col("kgco2").sum())
+        .collect(engine="streaming")
+    )
+
+    # With the target country of each row
+    costs = carbon_pl.with_costs(pl.scan_parquet("impressions.parquet"), framework, country_column="country")
+
+Rows are not validated: invalid creative types are computed as display, invalid allocations as programmatic, and
+rows whose device weights are all null give NaN costs. Countries are resolved as by :func:`carbon.countries.resolve`,
+each distinct value once per batch of rows, and unknown ones fail the query with a KeyError.
+"""
+
+import typing
+from collections.abc import Mapping
+
+import polars as pl
+
+from carbon import countries
+from carbon.compute_footprints import (
+    AdcallCostTuple,
+    BidCostTuple,
+    Co2CampaignCostTuple,
+    Co2CostTuple,
+)
+from carbon.digital_carbon_framework import Coefficients, Framework
+from carbon.utils import DEVICES
+
+IMPRESSIONS_COLUMNS = (
+    "nb_impressions",
+    "creative_type",
+    "allocation",
+    "creative_size_ko",
+    "creative_avg_view_s",
+    *DEVICES,
+)
+"""Columns of the impressions, named after the arguments of :func:`carbon.batch.impressions_cost`."""
+BIDS_COLUMNS = ("nb_bids",)
+"""Columns of the bids."""
+ADCALLS_COLUMNS = ("nb_ad_calls", "creative_type")
+"""Columns of the ad calls."""
+TOTAL_COLUMN = "kgco2"
+"""Name of the total cost of each row."""
+ROWS_COLUMN = "__carbon_country_row"
+"""Temporary column of the country of each row, in :func:`with_costs`."""
+
+if typing.TYPE_CHECKING:
+    from carbon.streaming import Kind
+
+FrameT = typing.TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+
+def _country_rows(country_column: str) -> pl.Expr:
+    """Return the index of the country of each row in :func:`_alpha_codes`."""
+    return pl.col(country_column).map_batches(
+        _resolve_rows, return_dtype=pl.UInt32, is_elementwise=True
+    )
+
+
+def _alpha_codes() -> list[str]:
+    """Return the sorted alpha-2 codes of the countries of :mod:`carbon.countries`."""
+    return sorted(set(countries.country_index().alpha_2.values()))
+
+
+def _resolve_rows(values: pl.Series) -> pl.Series:
+    """
+    Return the index in :func:`_alpha_codes` of each country of ``values``, resolved as by :func:`carbon.countries.resolve`.
+
+    Each distinct value is resolved once per batch of rows.
+
+    Raises:
+        KeyError: if any country is not referenced. All the unknown countries are listed in the message.
+    """
+    index = countries.country_index()
+    rows = {code: row for row, code in enumerate(_alpha_codes())}
+    distinct = values.unique().to_list()
+    alpha_codes = [index.get(value) for value in distinct]
+    unknown = [value for value, code in zip(distinct, alpha_codes) if code is None]
+    if unknown:
+        raise KeyError(f"Countries not referenced: {sorted(map(str, unknown))}")
+    return values.replace_strict(
+        distinct, [rows[code] for code in alpha_codes], return_dtype=pl.UInt32
+    )
+
+
+def _coefficients(framework: Framework, country_rows: pl.Expr | None) -> Coefficients:
+    """Return the coefficients of the framework, as expressions of the country of each row if ``country_rows`` is given."""
+    if country_rows is None:
+        return framework.coefficients
+
+    by_country = framework.coefficients_by_country
+    alpha_codes = _alpha_codes()
+    return Coefficients(
+        *(
+            pl.lit(
+                pl.Series(name, [by_country[code][column] for code in alpha_codes])
+            ).gather(country_rows)
+            for column, name in enumerate(Coefficients._fields)
+        )
+    )
+
+
+def _names(columns: Mapping[str, str] | None, names: tuple[str, ...]) -> dict:
+    return {name: pl.col((columns or {}).get(name, name)) for name in names}
+
+
+def _column(name: str, names: dict) -> pl.Expr:
+    return names[name].cast(pl.Float64)
+
+
+def _allocation_costs(coefficients: Coefficients, paths: pl.Expr) -> dict:
+    return {
+        "kgco2_allocation_network": Co2CostTuple(
+            coefficients.allocation_network_use * paths,
+            coefficients.allocation_network_manufacturing * paths,
+        ),
+        "kgco2_allocation_server": Co2CostTuple(
+            coefficients.allocation_server_use * paths,
+            coefficients.allocation_server_manufacturing * paths,
+        ),
+    }
+
+
+def _impressions_costs(
+    framework: Framework,
+    country_rows: pl.Expr | None,
+    columns: Mapping[str, str] | None,
+) -> Co2CampaignCostTuple:
+    coefficients = _coefficients(framework, country_rows)
+    names = _names(columns, IMPRESSIONS_COLUMNS)
+    nb_impressions = _column("nb_impressions", names)
+    video = names["creative_type"] == "video"
+
+    # Same evaluation order as ``batch.impressions_cost``, with the weights summed as ``DistributionMatrix``.
+    weights = {device: _column(device, names) for device in DEVICES}
+    total_weights = (
+        weights["desktop"]
+        + weights["smart_phone"]
+        + weights["tablet"]
+        + weights["connected_tv"]
+    )
+    terminal = Co2CostTuple(0.0, 0.0)
+    for device in ("connected_tv", "desktop", "tablet", "smart_phone"):
+        ratio = weights[device] / total_weights
+        terminal = Co2CostTuple(
+            terminal.use + getattr(coefficients, f"{device}_use") * ratio,
+            terminal.manufacturing
+            + getattr(coefficients, f"{device}_manufacturing") * ratio,
+        )
+
+    volume_ko = _column("creative_size_ko", names) * nb_impressions
+    allocation_factor = (
+        pl.when(names["allocation"] == "direct")
+        .then(pl.lit(1.0))
+        .when(video)
+        .then(coefficients.programmatic_paths_video)
+        .otherwise(coefficients.programmatic_paths_display)
+    )
+    return Co2CampaignCostTuple(
+        Co2CostTuple(
+            coefficients.distrib_server_use * volume_ko,
+            coefficients.distrib_server_manufacturing * volume_ko,
+        ),
+        Co2CostTuple(
+            coefficients.distrib_network_use * volume_ko,
+            coefficients.distrib_network_manufacturing * volume_ko,
+        ),
+        terminal * (_column("creative_avg_view_s", names) * nb_impressions),
+        **_allocation_costs(coefficients, allocation_factor * nb_impressions),
+    )
+
+
+def _bids_costs(
+    framework: Framework,
+    country_rows: pl.Expr | None,
+    columns: Mapping[str, str] | None,
+) -> BidCostTuple:
+    names = _names(columns, BIDS_COLUMNS)
+    allocation_factor = 4
+    return BidCostTuple(
+        **_allocation_costs(
+            _coefficients(framework, country_rows),
+            allocation_factor * _column("nb_bids", names),
+        )
+    )
+
+
+def _adcalls_costs(
+    framework: Framework,
+    country_rows: pl.Expr | None,
+    columns: Mapping[str, str] | None,
+) -> AdcallCostTuple:
+    coefficients = _coefficients(framework, country_rows)
+    names = _names(columns, ADCALLS_COLUMNS)
+    allocation_factor = (
+        pl.when(names["creative_type"] == "video")
+        .then(coefficients.adcall_paths_video)
+        .otherwise(coefficients.adcall_paths_display)
+    )
+    return AdcallCostTuple(
+        **_allocation_costs(
+            coefficients, allocation_factor * _column("nb_ad_calls", names)
+        )
+    )
+
+
+_COSTS = {
+    "impressions": _impressions_costs,
+    "bids": _bids_costs,
+    "adcalls": _adcalls_costs,
+}
+
+
+def _costs(
+    kind: "Kind",
+    framework: Framework,
+    country_column: str | None,
+    columns: Mapping[str, str] | None,
+):
+    country_rows = None if country_column is None else _country_rows(country_column)
+    return _COSTS[kind](framework, country_rows, columns)
+
+
+def _expressions(costs) -> list[pl.Expr]:
+    return [
+        expression.alias(f"{name}_{part}")
+        for name, cost in zip(costs._fields, costs)
+        for part, expression in zip(cost._fields, cost)
+    ]
+
+
+def impressions_expressions(
+    framework: Framework,
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> list[pl.Expr]:
+    """
+    Return the expressions of the ``<pillar>_use`` and ``<pillar>_manufacturing`` costs of each pillar of impressions.
+
+    :param framework: framework whose coefficients are inlined into the expressions.
+    :param country_column: column holding the target country of each row, as any code or name of :mod:`carbon.countries`.
+        Defaults to the target country of the framework. See :func:`with_costs` to resolve the countries only once.
+    :param columns: names of the columns of the frame, by name in :data:`IMPRESSIONS_COLUMNS`, if they differ.
+    """
+    return _expressions(_costs("impressions", framework, country_column, columns))
+
+
+def impressions_cost(
+    framework: Framework,
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> pl.Expr:
+    """Return the expression of the total cost of impressions, named :data:`TOTAL_COLUMN`, see :func:`impressions_expressions`."""
+    costs = _costs("impressions", framework, country_column, columns)
+    return costs.overall.total.alias(TOTAL_COLUMN)
+
+
+def bids_expressions(
+    framework: Framework,
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> list[pl.Expr]:
+    """Return the expressions of the costs of each pillar of bids, see :func:`impressions_expressions`."""
+    return _expressions(_costs("bids", framework, country_column, columns))
+
+
+def bids_cost(
+    framework: Framework,
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> pl.Expr:
+    """Return the expression of the total cost of bids, named :data:`TOTAL_COLUMN`."""
+    costs = _costs("bids", framework, country_column, columns)
+    return costs.overall.total.alias(TOTAL_COLUMN)
+
+
+def adcalls_expressions(
+    framework: Framework,
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> list[pl.Expr]:
+    """Return the expressions of the costs of each pillar of ad calls, see :func:`impressions_expressions`."""
+    return _expressions(_costs("adcalls", framework, country_column, columns))
+
+
+def adcalls_cost(
+    framework: Framework,
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> pl.Expr:
+    """Return the expression of the total cost of ad calls, named :data:`TOTAL_COLUMN`."""
+    costs = _costs("adcalls", framework, country_column, columns)
+    return costs.overall.total.alias(TOTAL_COLUMN)
+
+
+def with_costs(
+    frame: FrameT,
+    framework: Framework,
+    kind: "Kind" = "impressions",
+    country_column: str | None = None,
+    columns: Mapping[str, str] | None = None,
+    details: bool = False,
+) -> FrameT:
+    """
+    Return the frame, eager or lazy, with the :data:`TOTAL_COLUMN` cost of each row appended.
+
+    Unlike the expressions of :func:`impressions_cost`, the countries of ``country_column`` are resolved once for all
+    the coefficients, in a stage of their own.
+
+    :param kind: kind of the rows, either ``"impressions"``, ``"bids"`` or ``"adcalls"``.
+    :param details: whether to append the use and manufacturing costs of every pillar too.
+    """
+    country_rows = None
+    if country_column is not None:
+        frame = frame.with_columns(_country_rows(country_column).alias(ROWS_COLUMN))
+        country_rows = pl.col(ROWS_COLUMN)
+    costs = _COSTS[kind](framework, country_rows, columns)
+    expressions = _expressions(costs) if details else []
+    frame = frame.with_columns(*expressions, costs.overall.total.alias(TOTAL_COLUMN))
+    if country_column is not None:
+        frame = frame.drop(ROWS_COLUMN)
+    return frame
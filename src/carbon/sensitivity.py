@@ -0,0 +1,166 @@
+"""
+Sensitivity of the Co2 costs to every parameter of a Framework.
+
+The formulas of the pillars only multiply, divide and add parameters, so their derivatives are computed exactly in a
+single vectorized pass by complex-step differentiation: each parameter ``p`` is evaluated as ``p + i·h`` along its own
+row, and the imaginary part of the costs, divided by ``h``, is their partial derivative with respect to ``p``, with no
+cancellation error whatever ``h``.
+
+>>> result = sensitivity.impressions_cost(framework, nb_impressions=1e6, creative_type="display",
+...     allocation="programmatic", creative_size_ko=1e3, desktop=1, smart_phone=0, tablet=0, connected_tv=0)
+>>> result.ranked()[:3]  # The parameters with the largest elasticities of the overall cost
+"""
+
+import dataclasses
+import types
+import typing
+
+import numpy as np
+
+from carbon import batch, computation_logger
+from carbon.digital_carbon_framework import (
+    Coefficients,
+    Framework,
+    compile_coefficients,
+)
+
+ArrayLike = batch.ArrayLike
+
+STEP = 1e-100
+"""Imaginary step of the complex-step differentiation."""
+CHUNK_SIZE = 1_000_000
+"""Maximal number of parameter × row evaluations of a single pass, bounding the memory used."""
+
+
+def parameters(framework: Framework) -> dict[str, float]:
+    """Return the numeric parameters of the framework, named ``<set of parameters>.<parameter>``."""
+    values = {}
+    for field in dataclasses.fields(framework):
+        group = getattr(framework, field.name)
+        for parameter in dataclasses.fields(group):
+            value = getattr(group, parameter.name)
+            if isinstance(value, int | float) and not isinstance(value, bool):
+                values[f"{field.name}.{parameter.name}"] = value
+    return values
+
+
+def _perturbed_coefficients(framework: Framework, names: list[str]) -> Coefficients:
+    """Return coefficients with one row per parameter, the parameter of each row being perturbed by ``i·STEP``."""
+    perturbed = {}
+    for row, name in enumerate(names):
+        perturbed[name] = np.zeros(len(names), dtype=np.complex128)
+        perturbed[name][row] = STEP * 1j
+
+    sets = {}
+    for field in dataclasses.fields(framework):
+        group = getattr(framework, field.name)
+        values = {}
+        for parameter in dataclasses.fields(group):
+            value = getattr(group, parameter.name)
+            name = f"{field.name}.{parameter.name}"
+            values[parameter.name] = (
+                value + perturbed[name] if name in perturbed else value
+            )
+        sets[field.name] = types.SimpleNamespace(**values)
+    coefficients = compile_coefficients(types.SimpleNamespace(**sets))
+    return Coefficients(*np.broadcast_arrays(*map(np.asarray, coefficients)))
+
+
+def _pillars(costs: typing.NamedTuple) -> dict[str, np.ndarray]:
+    pillars = {name: cost.total for name, cost in zip(costs._fields, costs)}
+    pillars["overall"] = costs.overall.total
+    return pillars
+
+
+class Sensitivity(typing.NamedTuple):
+    """Partial derivatives of the total cost of each pillar with respect to every parameter."""
+
+    parameters: tuple[str, ...]
+    """Names of the parameters, ``<set of parameters>.<parameter>``."""
+    values: np.ndarray
+    """Value of each parameter."""
+    totals: dict[str, np.ndarray]
+    """Total kgco2 cost of each pillar, and of their ``overall`` sum, one value per row."""
+    derivatives: dict[str, np.ndarray]
+    """Partial derivatives of the totals, with one row per row of the input, and one column per parameter."""
+
+    @property
+    def elasticities(self) -> dict[str, np.ndarray]:
+        """Relative change of the totals per relative change of each parameter, ``∂total/∂p · p / total``."""
+        elasticities = {}
+        for pillar, derivatives in self.derivatives.items():
+            total = self.totals[pillar][..., np.newaxis]
+            elasticities[pillar] = np.divide(
+                derivatives * self.values,
+                total,
+                out=np.zeros_like(derivatives),
+                where=total != 0,
+            )
+        return elasticities
+
+    def ranked(self, pillar: str = "overall", row=()) -> list[tuple[str, float]]:
+        """Return the parameters and their elasticities for a row, by decreasing absolute elasticity."""
+        elasticities = self.elasticities[pillar][row]
+        order = np.argsort(-np.abs(elasticities), kind="stable")
+        return [(self.parameters[i], float(elasticities[i])) for i in order]
+
+
+def _sensitivity(
+    function: typing.Callable, framework: Framework, columns: dict[str, ArrayLike]
+) -> Sensitivity:
+    values = parameters(framework)
+    names = list(values)
+    coefficients = _perturbed_coefficients(framework, names)
+
+    totals = _pillars(function(framework, **columns))
+    shape = np.shape(totals["overall"])
+    columns = {
+        name: np.broadcast_to(column, shape).ravel()
+        for name, column in zip(columns, np.broadcast_arrays(*columns.values()))
+    }
+    rows = int(np.prod(shape))
+    computation_logger.info(
+        "Differentiating %s rows with respect to %s parameters.", rows, len(names)
+    )
+
+    derivatives = {pillar: np.empty((rows, len(names))) for pillar in totals}
+    chunk_size = max(1, CHUNK_SIZE // len(names))
+    for start in range(0, max(rows, 1), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        costs = function(
+            Coefficients(*(c[:, np.newaxis] for c in coefficients)),
+            **{name: column[chunk] for name, column in columns.items()},
+        )
+        for pillar, total in _pillars(costs).items():
+            # The rows of the result are the parameters, and its columns the rows of the chunk.
+            derivatives[pillar][chunk] = total.imag.T / STEP
+    return Sensitivity(
+        parameters=tuple(names),
+        values=np.array([values[name] for name in names], dtype=np.float64),
+        totals=totals,
+        derivatives={
+            pillar: derivative.reshape(shape + (len(names),))
+            for pillar, derivative in derivatives.items()
+        },
+    )
+
+
+def impressions_cost(framework: Framework, **columns: ArrayLike) -> Sensitivity:
+    """
+    Return the sensitivity of the costs of impressions to the parameters of the framework.
+
+    :param framework: framework whose parameters are differentiated.
+    :param columns: arguments of :func:`carbon.batch.impressions_cost`, scalars for a single campaign,
+        or one value per campaign. ``country`` is not supported: use a framework per country.
+    """
+    return _sensitivity(batch.impressions_cost, framework, columns)
+
+
+def bids_cost(framework: Framework, **columns: ArrayLike) -> Sensitivity:
+    """Return the sensitivity of the costs of bids, see :func:`impressions_cost`."""
+    return _sensitivity(batch.bids_cost, framework, columns)
+
+
+def adcalls_cost(framework: Framework, **columns: ArrayLike) -> Sensitivity:
+    """Return the sensitivity of the costs of ad calls, see :func:`impressions_cost`."""
+    return _sensitivity(batch.adcalls_cost, framework, columns)
@@ -0,0 +1,337 @@
+"""
+HTTP service computing Co2 costs, coalescing concurrent requests into micro-batches.
+
+.. code-block:: bash
+
+    python -m carbon serve --port 8080 --batch-window-ms 2 --max-batch-size 1024
+    curl -d '{"nb_bids": 1000, "country": "DE"}' localhost:8080/bids
+
+``POST /impressions``, ``/bids`` and ``/adcalls`` take a JSON object holding the arguments of the matching
+:mod:`carbon.batch` function, such as ``{"nb_bids": 1000}``, or a list of such objects, and answer the costs
+of each pillar and their ``overall`` sum, as the models of :mod:`carbon.compute_footprints`. ``country`` is optional.
+``GET /health`` answers ``{"status": "ok"}``, and ``GET /metrics`` the :mod:`carbon.metrics` in the Prometheus format.
+
+Requests waiting for the same endpoint are computed together in a single vectorized pass: a micro-batch is computed
+once ``max_batch_size`` objects are waiting, or ``max_wait`` seconds after its first object was received.
+Each object is validated before joining a micro-batch, so that an invalid one is answered on its own with a 400, and
+micro-batches are computed in the default executor of the event loop, which keeps serving meanwhile.
+The service is built on :mod:`asyncio` streams only, and implements the subset of HTTP/1.1 needed by clients of a local service.
+"""
+
+import asyncio
+import json
+import math
+import typing
+from collections.abc import Callable
+
+import numpy as np
+
+from carbon import countries, logger, metrics
+from carbon.digital_carbon_framework import Framework
+from carbon.streaming import KINDS
+from carbon.utils import DEVICES
+
+MAX_BODY_SIZE = 16 * 2**20
+"""Maximal size of the body of a request, in bytes."""
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+    500: "Internal Server Error",
+}
+
+
+class MicroBatcher:
+    """
+    Coalesce the objects submitted concurrently into batches, computed together.
+
+    :param compute: compute a batch of objects, returning the result of each object, or the exception it raised.
+    :param max_batch_size: number of waiting objects triggering the computation of a batch.
+    :param max_wait: maximal time an object waits for other objects, in seconds.
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[list], list],
+        max_batch_size: int = 1024,
+        max_wait: float = 0.002,
+    ):
+        self.compute = compute
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        """Number of batches computed."""
+        self.objects = 0
+        """Number of objects computed."""
+        self._pending: list[tuple[typing.Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, item: typing.Any) -> typing.Any:
+        """Return the result of an object, once its batch is computed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        """Start computing the waiting objects now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.objects += len(pending)
+        # Kept until done, as the event loop only holds weak references to its tasks.
+        task = asyncio.ensure_future(self._compute(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _compute(self, pending: list[tuple[typing.Any, asyncio.Future]]):
+        """Compute a batch in the default executor, so that the event loop keeps serving meanwhile."""
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                None, self.compute, [item for item, _ in pending]
+            )
+        except Exception as error:  # noqa: BLE001
+            # Unexpected errors are raised to every waiting request, rather than leaving them pending.
+            results = [error] * len(pending)
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_CHOICES = {
+    "creative_type": ("video", "display"),
+    "allocation": ("direct", "programmatic"),
+}
+"""Values accepted by the text fields."""
+
+
+def _validate_row(kind: str, row: dict) -> str | None:
+    """
+    Return why a row can not be computed, if so, checking it as the :mod:`carbon.batch` functions do.
+
+    Rows are checked one by one before being batched, so that an invalid row is answered on its own, and never fails
+    the computation of the other rows of its batch.
+    """
+    fields = KINDS[kind]
+    values = {**fields.defaults, **row}
+    for name in fields.numeric:
+        value = values.get(name)
+        if name not in values:
+            return f"Missing field {name!r}"
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or not math.isfinite(value)
+        ):
+            return f"Field {name!r} must be a finite number"
+    for name in fields.text:
+        if name not in values:
+            return f"Missing field {name!r}"
+        if values[name] not in _CHOICES[name]:
+            return f"{name} is either {' or '.join(map(repr, _CHOICES[name]))}"
+    if "country" in row and (
+        not isinstance(row["country"], (str, int))
+        or countries.country_index().get(row["country"]) is None
+    ):
+        return f"Country {row['country']!r} not referenced"
+
+    if kind == "impressions":
+        weights = [values[device] for device in DEVICES]
+        if any(weight < 0 for weight in weights):
+            return "Distribution expect only positive weights"
+        if sum(weights) == 0:
+            return "At least one weight must be non-null"
+        if (
+            values["creative_type"] == "display"
+            and not values["creative_avg_view_s"] > 0
+        ):
+            return "creative_avg_view_s is mandatory for creative_type='display'"
+    return None
+
+
+def _compute_rows(framework: Framework, kind: str, rows: list[dict]) -> list[dict]:
+    fields = KINDS[kind]
+    arguments = {}
+    for name in fields.numeric + fields.text:
+        if all(name in row for row in rows):
+            arguments[name] = [row[name] for row in rows]
+        elif name in fields.defaults:
+            arguments[name] = [row.get(name, fields.defaults[name]) for row in rows]
+        else:
+            raise ValueError(f"Missing field {name!r}")
+    for name in fields.numeric:
+        arguments[name] = np.asarray(arguments[name], dtype=np.float64)
+    if "country" in rows[0]:
+        arguments["country"] = np.asarray([row["country"] for row in rows], dtype=str)
+    costs = fields.function(framework, **arguments)
+
+    pillars = {
+        name: (cost.use.tolist(), cost.manufacturing.tolist())
+        for name, cost in zip(costs._fields, costs)
+    }
+    pillars["overall"] = (
+        costs.overall.use.tolist(),
+        costs.overall.manufacturing.tolist(),
+    )
+    return [
+        {
+            name: {"use": use[i], "manufacturing": manufacturing[i]}
+            for name, (use, manufacturing) in pillars.items()
+        }
+        for i in range(len(rows))
+    ]
+
+
+def compute(framework: Framework, kind: str, rows: list[dict]) -> list[dict]:
+    """
+    Return the costs of each row, validated beforehand by :func:`_validate_row`.
+
+    Rows are computed together, those with a ``country`` apart from the other ones.
+    """
+    results: list[dict] = [None] * len(rows)
+    for has_country in (False, True):
+        indices = [i for i, row in enumerate(rows) if ("country" in row) == has_country]
+        if indices:
+            costs = _compute_rows(framework, kind, [rows[i] for i in indices])
+            for i, cost in zip(indices, costs):
+                results[i] = cost
+    return results
+
+
+class Server:
+    """
+    HTTP service computing the costs of impressions, bids and ad calls with a shared framework.
+
+    :param framework: framework used by all the requests. It is frozen, so that it can not be modified while serving.
+    :param max_batch_size: number of waiting objects triggering the computation of a batch.
+    :param max_wait: maximal time an object waits for other objects, in seconds.
+    """
+
+    def __init__(
+        self, framework: Framework, max_batch_size: int = 1024, max_wait: float = 0.002
+    ):
+        self.framework = framework.freeze()
+        self.batchers = {
+            kind: MicroBatcher(
+                lambda rows, kind=kind: compute(self.framework, kind, rows),
+                max_batch_size=max_batch_size,
+                max_wait=max_wait,
+            )
+            for kind in KINDS
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """Start serving, returning the underlying server, bound to its sockets."""
+        server = await asyncio.start_server(self._handle, host, port)
+        logger.info(
+            "Serving on %s", ", ".join(str(s.getsockname()) for s in server.sockets)
+        )
+        return server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def respond(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[int, str, bytes]:
+        """Return the status, content type and body of the response to a request."""
+        kind = path.strip("/")
+        if path == "/health":
+            return _json(200, {"status": "ok"})
+        if path == "/metrics":
+            return 200, "text/plain; version=0.0.4", metrics.to_prometheus().encode()
+        if kind not in self.batchers:
+            return _json(404, {"error": f"Unknown path {path}"})
+        if method != "POST":
+            return _json(405, {"error": f"Use POST to compute {kind} costs"})
+
+        try:
+            rows = json.loads(body)
+        except ValueError as error:
+            return _json(400, {"error": f"Invalid JSON: {error}"})
+        single = isinstance(rows, dict)
+        if single:
+            rows = [rows]
+        if not rows or not all(isinstance(row, dict) for row in rows):
+            return _json(400, {"error": "Expected a JSON object, or a list of objects"})
+        for row in rows:
+            if (error := _validate_row(kind, row)) is not None:
+                return _json(400, {"error": error})
+
+        batcher = self.batchers[kind]
+        costs = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        return _json(200, costs[0] if single else costs)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while request_line := await reader.readline():
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_SIZE:
+                    writer.write(
+                        _response(*_json(413, {"error": "Body too large"}), False)
+                    )
+                    break
+                body = await reader.readexactly(length)
+                try:
+                    status, content_type, content = await self.respond(
+                        method, path.partition("?")[0], body
+                    )
+                except Exception:  # noqa: BLE001
+                    logger.exception("Failed to respond to %s %s", method, path)
+                    status, content_type, content = _json(
+                        500, {"error": "Internal server error"}
+                    )
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                writer.write(_response(status, content_type, content, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as error:
+            logger.debug("Closing connection: %s", error)
+        finally:
+            writer.close()
+
+
+def _json(status: int, payload: typing.Any) -> tuple[int, str, bytes]:
+    return status, "application/json", json.dumps(payload).encode()
+
+
+def _response(
+    status: int, content_type: str, content: bytes, keep_alive: bool
+) -> bytes:
+    return (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("latin-1") + content
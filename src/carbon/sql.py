@@ -0,0 +1,210 @@
+"""
+SQL expressions computing the Co2 costs of impressions, to push the computation down to a SQL warehouse.
+
+The coefficients of a Framework are inlined as literals into expressions over the columns of an impressions table,
+evaluated in the same order as :func:`carbon.compute_footprints.impressions_cost`, so that both give the same results.
+
+.. code-block:: python
+
+    connection.execute(sql.impressions_view(framework, "impressions", country="DE"))
+    connection.execute("SELECT campaign_id, SUM(kgco2) FROM impressions_cost GROUP BY campaign_id")
+
+Only standard SQL is used, checked against SQLite. Rows are not validated: invalid creative types or allocations are
+computed as display and programmatic, and rows whose device weights are all null give NULL costs.
+"""
+
+from collections.abc import Mapping
+
+from carbon.compute_footprints import Co2CampaignCostTuple, Co2CostTuple
+from carbon.digital_carbon_framework import Framework
+from carbon.utils import DEVICES
+
+IMPRESSIONS_COLUMNS = (
+    "nb_impressions",
+    "creative_type",
+    "allocation",
+    "creative_size_ko",
+    "creative_avg_view_s",
+    *DEVICES,
+)
+"""Columns of the impressions, named after the arguments of :func:`carbon.batch.impressions_cost`."""
+TOTAL_COLUMN = "kgco2"
+"""Column of the total cost of each row in the view."""
+
+
+def quote(identifier: str) -> str:
+    """Return a quoted SQL identifier."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def literal(value: float) -> str:
+    """
+    Return a SQL literal of a float, parsed back to the same double.
+
+    Literals always hold an exponent, so that they are parsed as floating point numbers rather than as decimals.
+    """
+    text = repr(float(value))
+    if text in ("inf", "-inf", "nan"):
+        raise ValueError(f"{text} has no SQL literal")
+    return text if "e" in text else text + "e0"
+
+
+class _Expression(str):
+    """SQL expression, combined with the arithmetic operators of Python, with explicit parentheses."""
+
+    def __add__(self, other) -> "_Expression":
+        return _Expression(f"({self} + {_operand(other)})")
+
+    def __radd__(self, other) -> "_Expression":
+        # ``0 + x`` is ``x``, as in the sums starting from 0 of :func:`carbon.compute_footprints.terminal_cost`.
+        return self if other == 0 else _Expression(f"({_operand(other)} + {self})")
+
+    def __mul__(self, other) -> "_Expression":
+        return _Expression(f"({self} * {_operand(other)})")
+
+    def __rmul__(self, other) -> "_Expression":
+        return _Expression(f"({_operand(other)} * {self})")
+
+    def __truediv__(self, other) -> "_Expression":
+        return _Expression(f"({self} / {_operand(other)})")
+
+
+def _operand(value) -> str:
+    return value if isinstance(value, _Expression) else literal(value)
+
+
+def _column(name: str) -> _Expression:
+    return _Expression(f"CAST({quote(name)} AS DOUBLE PRECISION)")
+
+
+def _impressions_costs(
+    framework: Framework, country: str | None, columns: Mapping[str, str] | None
+) -> Co2CampaignCostTuple:
+    if country is not None:
+        framework = framework.with_country(country)
+    coefficients = framework.coefficients
+    names = {name: (columns or {}).get(name, name) for name in IMPRESSIONS_COLUMNS}
+    nb_impressions = _column(names["nb_impressions"])
+
+    allocation_factor = _Expression(
+        f"(CASE WHEN {quote(names['allocation'])} = 'direct' THEN {literal(1)}"
+        f" WHEN {quote(names['creative_type'])} = 'video'"
+        f" THEN {literal(coefficients.programmatic_paths_video)}"
+        f" ELSE {literal(coefficients.programmatic_paths_display)} END)"
+    )
+
+    # Same evaluation order as ``compute_footprints.terminal_cost``, with the weights summed as ``Distribution``.
+    weights = {device: _column(names[device]) for device in DEVICES}
+    total_weights = _Expression(
+        f"NULLIF({weights['desktop'] + weights['smart_phone'] + weights['tablet'] + weights['connected_tv']}, 0)"
+    )
+    terminal = Co2CostTuple()
+    for device in ("connected_tv", "desktop", "tablet", "smart_phone"):
+        ratio = weights[device] / total_weights
+        terminal = Co2CostTuple(
+            terminal.use + getattr(coefficients, f"{device}_use") * ratio,
+            terminal.manufacturing
+            + getattr(coefficients, f"{device}_manufacturing") * ratio,
+        )
+
+    volume_ko = _column(names["creative_size_ko"]) * nb_impressions
+    paths = allocation_factor * nb_impressions
+    return Co2CampaignCostTuple(
+        Co2CostTuple(
+            coefficients.distrib_server_use * volume_ko,
+            coefficients.distrib_server_manufacturing * volume_ko,
+        ),
+        Co2CostTuple(
+            coefficients.distrib_network_use * volume_ko,
+            coefficients.distrib_network_manufacturing * volume_ko,
+        ),
+        terminal * (_column(names["creative_avg_view_s"]) * nb_impressions),
+        Co2CostTuple(
+            coefficients.allocation_network_use * paths,
+            coefficients.allocation_network_manufacturing * paths,
+        ),
+        Co2CostTuple(
+            coefficients.allocation_server_use * paths,
+            coefficients.allocation_server_manufacturing * paths,
+        ),
+    )
+
+
+def impressions_expressions(
+    framework: Framework,
+    country: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> dict[str, str]:
+    """
+    Return the SQL expressions of the ``<pillar>_use`` and ``<pillar>_manufacturing`` costs of each pillar.
+
+    :param framework: framework whose coefficients are inlined into the expressions.
+    :param country: alpha code of the target country. Defaults to the target country of the framework.
+    :param columns: names of the columns of the impressions table, by name in :data:`IMPRESSIONS_COLUMNS`,
+        if they differ.
+    """
+    costs = _impressions_costs(framework, country, columns)
+    return {
+        f"{name}_{kind}": str(expression)
+        for name, cost in zip(costs._fields, costs)
+        for kind, expression in zip(cost._fields, cost)
+    }
+
+
+def impressions_select(
+    framework: Framework,
+    source: str,
+    country: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> str:
+    """
+    Return a ``SELECT`` of the rows of the ``source`` table, with the ``<pillar>_use`` and ``<pillar>_manufacturing``
+    costs of each pillar, their ``overall_use`` and ``overall_manufacturing`` sums, and their :data:`TOTAL_COLUMN` total.
+
+    :param source: table, or parenthesized subquery, holding the impressions. It is aliased as ``impressions``.
+
+    See :func:`impressions_expressions` for the other arguments.
+    """
+    pillars = [
+        f"{expression} AS {quote(name)}"
+        for name, expression in impressions_expressions(
+            framework, country, columns
+        ).items()
+    ]
+    # The sums are computed over the pillars selected by the inner query, in the order of ``Co2CampaignCostTuple.overall``.
+    overall = Co2CampaignCostTuple(
+        *(
+            Co2CostTuple(
+                _Expression(quote(f"{name}_use")),
+                _Expression(quote(f"{name}_manufacturing")),
+            )
+            for name in Co2CampaignCostTuple._fields
+        )
+    ).overall
+    # ``*`` is qualified, as standard SQL does not allow it alongside other columns.
+    return (
+        f"SELECT costs.*, {overall.use} AS {quote('overall_use')},"
+        f" {overall.manufacturing} AS {quote('overall_manufacturing')},"
+        f" {overall.total} AS {quote(TOTAL_COLUMN)}\n"
+        f"FROM (SELECT impressions.*,\n  "
+        + ",\n  ".join(pillars)
+        + f"\nFROM {source} AS impressions) AS costs"
+    )
+
+
+def impressions_view(
+    framework: Framework,
+    source: str,
+    name: str = "impressions_cost",
+    country: str | None = None,
+    columns: Mapping[str, str] | None = None,
+) -> str:
+    """
+    Return the definition of a view of the ``source`` table with the costs of each row, see :func:`impressions_select`.
+
+    :param source: table, or parenthesized subquery, holding the impressions. It is aliased as ``impressions``.
+    :param name: name of the view.
+    """
+    return f"CREATE VIEW {quote(name)} AS\n" + impressions_select(
+        framework, source, country, columns
+    )
@@ -0,0 +1,262 @@
+"""
+Streaming computation of the Co2 cost of log files, too large to be loaded in memory.
+
+Logs are read in chunks of a bounded number of records, each chunk is computed in a single vectorized pass
+(see :mod:`carbon.batch`) and its results are written before the next chunk is read, so that the memory used
+does not depend on the size of the file. Chunks can also be spread across a pool of processes.
+
+Logs are either CSV files with a header, or JSON lines files, holding one record per line, optionally gzipped.
+Their fields are the arguments of the :mod:`carbon.batch` functions, such as ``nb_impressions``, ``creative_type``,
+``allocation``, ``creative_size_ko``, ``creative_avg_view_s`` and the weights of the devices for impressions.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import typing
+
+import numpy as np
+
+from carbon import batch, logger, parallel
+from carbon.digital_carbon_framework import Framework
+
+Kind = typing.Literal["impressions", "bids", "adcalls"]
+Format = typing.Literal["csv", "jsonl"]
+
+
+class _KindFields(typing.NamedTuple):
+    function: typing.Callable
+    result: type
+    numeric: tuple[str, ...]
+    text: tuple[str, ...]
+    defaults: dict[str, typing.Any]
+
+
+KINDS: dict[str, _KindFields] = {
+    "impressions": _KindFields(
+        function=batch.impressions_cost,
+        result=batch.Co2CampaignCostArray,
+        numeric=(
+            "nb_impressions",
+            "creative_size_ko",
+            "creative_avg_view_s",
+            "desktop",
+            "smart_phone",
+            "tablet",
+            "connected_tv",
+        ),
+        text=("creative_type", "allocation"),
+        defaults={"creative_avg_view_s": 3},
+    ),
+    "bids": _KindFields(
+        function=batch.bids_cost,
+        result=batch.BidCostArray,
+        numeric=("nb_bids",),
+        text=(),
+        defaults={},
+    ),
+    "adcalls": _KindFields(
+        function=batch.adcalls_cost,
+        result=batch.AdcallCostArray,
+        numeric=("nb_ad_calls",),
+        text=("creative_type",),
+        defaults={},
+    ),
+}
+"""Functions computing each kind of log, with the fields they read."""
+
+TOTAL_COLUMN = "kgco2"
+"""Column holding the total Co2 cost of each record."""
+
+
+def format_of(path: str) -> Format:
+    """Return the format of a file from its extension, ignoring a trailing ``.gz``."""
+    name = path.removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError(
+        f"Can not infer the format of {path}, expected a csv or jsonl file"
+    )
+
+
+def open_text(path: str, mode: typing.Literal["r", "w"] = "r") -> typing.TextIO:
+    """Open a text file, gzipped if its name ends with ``.gz``."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+class ChunkScorer(typing.NamedTuple):
+    """Compute the Co2 cost of chunks of records, read from and written as lines of text."""
+
+    kind: Kind = "impressions"
+    input_format: Format = "csv"
+    output_format: Format = "csv"
+    fieldnames: tuple[str, ...] = ()
+    """Fields of the CSV records, read from the header of the file."""
+    country_field: str | None = None
+    """Field holding the target country of each record, as any code or name of :mod:`carbon.countries`. Defaults to the target country of the framework."""
+    keep: tuple[str, ...] = ()
+    """Fields of the records copied as is to the output, such as an identifier."""
+    details: bool = False
+    """Whether to write the use and manufacturing costs of every pillar, besides the total cost."""
+
+    @property
+    def output_columns(self) -> tuple[str, ...]:
+        columns = self.keep
+        if self.details:
+            columns += tuple(
+                f"{pillar}_{part}"
+                for pillar in KINDS[self.kind].result._fields
+                for part in ("use", "manufacturing")
+            )
+        return columns + (TOTAL_COLUMN,)
+
+    def header(self) -> str:
+        """Return the header of the output, written before the first chunk."""
+        if self.output_format != "csv":
+            return ""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(self.output_columns)
+        return buffer.getvalue()
+
+    def records(self, source: typing.Iterable[str]) -> typing.Iterable:
+        """
+        Return the records of the lines of ``source``: the rows parsed over the whole stream for CSV records, so that
+        quoted fields spanning several lines are kept whole, and the lines themselves for JSON lines.
+        """
+        if self.input_format == "csv":
+            return csv.reader(source)
+        return source
+
+    def _parse(self, records: list) -> dict[str, typing.Sequence]:
+        """Parse records, as returned by :meth:`records`, into one sequence of values per field."""
+        if self.input_format == "csv":
+            rows = [row for row in records if row]
+            if any(len(row) != len(self.fieldnames) for row in rows):
+                raise ValueError(
+                    f"Expected {len(self.fieldnames)} fields per record: {self.fieldnames}"
+                )
+            return dict(zip(self.fieldnames, zip(*rows)))
+        records = [json.loads(line) for line in records if line.strip()]
+        names = set().union(*records) if records else set()
+        return {name: [record.get(name) for record in records] for name in names}
+
+    def score(self, framework: Framework, records: list) -> str:
+        """
+        Return the lines of the results of a chunk of records, as returned by :meth:`records`.
+
+        Raises:
+            ValueError: if any record holds an invalid value, or misses a field.
+            KeyError: if any country is not referenced.
+        """
+        kind = KINDS[self.kind]
+        fields = self._parse(records)
+
+        def _field(name: str) -> typing.Sequence:
+            if name in fields:
+                return fields[name]
+            if name in kind.defaults:
+                return kind.defaults[name]
+            raise ValueError(f"Missing field {name!r}")
+
+        arguments = {name: _field(name) for name in kind.text}
+        for name in kind.numeric:
+            values = np.asarray(_field(name), dtype=np.float64)
+            batch._raise_on_rows(np.isnan(values), f"Missing value of {name}")
+            arguments[name] = values
+        if self.country_field is not None:
+            arguments["country"] = np.asarray(_field(self.country_field), dtype=str)
+        costs = kind.function(framework, **arguments)
+
+        columns = [_field(name) for name in self.keep]
+        if self.details:
+            columns.extend(column.tolist() for column in costs.to_dict().values())
+        columns.append(costs.overall.total.tolist())
+
+        buffer = io.StringIO()
+        if self.output_format == "csv":
+            csv.writer(buffer).writerows(zip(*columns))
+        else:
+            names = self.output_columns
+            for values in zip(*columns):
+                buffer.write(json.dumps(dict(zip(names, values))))
+                buffer.write("\n")
+        return buffer.getvalue()
+
+
+def read_chunks(
+    records: typing.Iterable[typing.Any], chunk_size: int
+) -> typing.Iterator[list]:
+    """Yield records, such as the lines of a file, by chunks of at most ``chunk_size`` records."""
+    records = iter(records)
+    while chunk := list(itertools.islice(records, chunk_size)):
+        yield chunk
+
+
+def stream(
+    framework: Framework,
+    source: typing.TextIO,
+    destination: typing.TextIO,
+    scorer: ChunkScorer,
+    chunk_size: int = 100_000,
+    workers: int = 0,
+) -> int:
+    """
+    Compute the Co2 cost of all the records of ``source``, and write the results to ``destination``, in the same order.
+
+    At most ``chunk_size`` records are held in memory per chunk being computed, whatever the size of the file.
+
+    Args:
+        framework (Framework): Framework object
+        source (TextIO): records to compute. For CSV records, the header must already be consumed, see :attr:`ChunkScorer.fieldnames`.
+        destination (TextIO): where to write the results
+        scorer (ChunkScorer): how to read and write the records
+        chunk_size (int, optional): number of records computed at once. Defaults to 100 000.
+        workers (int, optional): number of processes computing the chunks. Defaults to 0, computing the chunks in the current process.
+
+    Raises:
+        ValueError: if any record is invalid. The first record of its chunk is given in the message.
+        KeyError: if any country is not referenced.
+
+    Returns:
+        int: the number of records computed.
+    """
+    destination.write(scorer.header())
+    chunks = read_chunks(scorer.records(source), chunk_size)
+    records = 0
+
+    def _write(chunk: list, results: str):
+        nonlocal records
+        destination.write(results)
+        logger.info("Computed records %s to %s", records, records + len(chunk))
+        records += len(chunk)
+
+    def _error(error: Exception) -> Exception:
+        # Raised as the base type, subclasses such as json.JSONDecodeError can not be built from a message.
+        base = KeyError if isinstance(error, KeyError) else ValueError
+        return base(f"Chunk starting at record {records}: {error}")
+
+    if workers <= 0:
+        for chunk in chunks:
+            try:
+                results = scorer.score(framework, chunk)
+            except (ValueError, KeyError) as error:
+                raise _error(error) from error
+            _write(chunk, results)
+        return records
+
+    warm = [batch.country_coefficients] if scorer.country_field is not None else []
+    with parallel.pool(framework, workers, warm) as executor:
+        # Bound the number of chunks in flight, to keep the memory constant.
+        results = parallel.imap(executor, scorer.score, chunks, 2 * workers)
+        try:
+            for chunk, text in results:
+                _write(chunk, text)
+        except (ValueError, KeyError) as error:
+            raise _error(error) from error
+    return records
@@ -0,0 +1,264 @@
+"""
+Evaluation of the Co2 costs over the Cartesian product of axes of inputs, such as creative sizes × countries × device mixes.
+
+Each axis is reshaped along its own dimension, and the whole product is evaluated by broadcasting in a single pass of
+:mod:`carbon.batch`: the coefficients of each country are looked up once per country, and the costs of the pillars
+that do not depend on an axis are broadcast views along it.
+
+>>> result = sweep.impressions_cost(
+...     framework,
+...     nb_impressions=1e6,
+...     creative_type=["display", "video"],
+...     allocation=["direct", "programmatic"],
+...     creative_size_ko=np.linspace(10, 2000, 100),
+...     creative_avg_view_s=[1, 5, 15],
+...     country=["FR", "DE", "USA"],
+...     devices_repartition={"desktop": Distribution(weights={"desktop": 1}), "mobile": Distribution(weights={"smart_phone": 1})},
+... )
+>>> result.total.shape
+(2, 2, 100, 3, 3, 2)
+>>> result.to_frame()  # One row per combination, indexed by the values of the axes
+
+Parameters of the framework are swept as well, by set of parameters as with :meth:`Framework.with_overrides`. Their
+axes are evaluated through :func:`carbon.digital_carbon_framework.compile_coefficients` into coefficients broadcast along
+them, as the samples of :mod:`carbon.uncertainty`, and named ``<set>.<parameter>``:
+
+>>> result = sweep.bids_cost(
+...     framework,
+...     parameters={"allocation_network_use": {"nb_requests_per_active_path": [4, 5, 6]}},
+...     nb_bids=1e6,
+...     country=["FR", "DE"],
+... )
+>>> list(result.axes)
+['country', 'allocation_network_use.nb_requests_per_active_path']
+"""
+
+import dataclasses
+import types
+import typing
+from collections.abc import Mapping
+
+import numpy as np
+
+from carbon import batch, computation_logger
+from carbon.digital_carbon_framework import (
+    _TARGET_COUNTRY_PARAMETERS,
+    Coefficients,
+    Framework,
+    compile_coefficients,
+)
+from carbon.utils import DEVICES, Distribution
+
+
+class Sweep(typing.NamedTuple):
+    """Costs of every combination of the values of the axes, as N-d arrays with one dimension per axis."""
+
+    axes: dict[str, np.ndarray]
+    """Labels of the values of each axis, in the order of the dimensions."""
+    costs: batch.Co2CampaignCostArray | batch.BidCostArray | batch.AdcallCostArray
+    """Costs of each pillar, whose arrays have one dimension per axis."""
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(labels) for labels in self.axes.values())
+
+    @property
+    def total(self) -> np.ndarray:
+        """Total kgco2 cost of each combination."""
+        return self.costs.overall.total
+
+    def to_frame(self) -> "pd.DataFrame":  # noqa: F821
+        """
+        Return a tidy DataFrame, with one row per combination indexed by the labels of the axes, the use and
+        manufacturing costs of each pillar, and the ``total`` cost.
+
+        Requires pandas.
+        """
+        import pandas as pd
+
+        index = pd.MultiIndex.from_product(
+            list(self.axes.values()), names=list(self.axes)
+        )
+        columns = {
+            name: np.broadcast_to(column, self.shape).ravel()
+            for name, column in self.costs.to_dict().items()
+        }
+        columns["total"] = np.broadcast_to(self.total, self.shape).ravel()
+        return pd.DataFrame(columns, index=index)
+
+
+def _devices_repartition(values: typing.Sequence) -> batch.DistributionMatrix:
+    if isinstance(values, batch.DistributionMatrix):
+        return values
+    if all(isinstance(value, Distribution) for value in values):
+        return batch.DistributionMatrix.from_distributions(values)
+    if all(isinstance(value, Mapping) for value in values):
+        return batch.DistributionMatrix.from_weights(
+            [[value.get(device, 0) for device in DEVICES] for value in values]
+        )
+    return batch.DistributionMatrix.from_weights(values)
+
+
+def _add_axis(axes: dict, values: dict, name: str, value: typing.Any) -> None:
+    if isinstance(value, Mapping):
+        axes[name] = list(value.keys())
+        values[name] = list(value.values())
+    elif np.ndim(value) == 0:
+        values[name] = value
+    elif np.ndim(value) == 1:
+        axes[name] = value
+        values[name] = value
+    else:
+        raise ValueError(
+            f"{name} should be a scalar, or a one-dimensional axis of values"
+        )
+
+
+def _coefficients(
+    framework: Framework,
+    overrides: dict[tuple[str, str], typing.Any],
+    country: typing.Any,
+) -> Coefficients:
+    """Return the coefficients of the framework for the overridden parameters and countries, broadcast together."""
+    sets = {}
+    for name in (f.name for f in dataclasses.fields(framework)):
+        parameters = getattr(framework, name)
+        sets[name] = {
+            f.name: getattr(parameters, f.name) for f in dataclasses.fields(parameters)
+        }
+    if country is not None:
+        emission_factor = np.vectorize(framework._emission_factor, otypes=[float])(
+            country
+        )
+        for name, parameter in _TARGET_COUNTRY_PARAMETERS:
+            sets[name][parameter] = emission_factor
+    for (name, field), value in overrides.items():
+        sets[name][field] = value
+    coefficients = compile_coefficients(
+        types.SimpleNamespace(
+            **{name: types.SimpleNamespace(**values) for name, values in sets.items()}
+        )
+    )
+    return Coefficients(*np.broadcast_arrays(*map(np.asarray, coefficients)))
+
+
+def _sweep(
+    function: typing.Callable,
+    framework: Framework,
+    arguments: dict[str, typing.Any],
+    parameters: Mapping[str, Mapping[str, typing.Any]] | None,
+) -> Sweep:
+    axes = {}
+    values = {}
+    for name, value in arguments.items():
+        if name == "devices_repartition" and not isinstance(value, Mapping):
+            if isinstance(value, Distribution):
+                values[name] = batch.DistributionMatrix.from_weights(
+                    value.device_ratios
+                )
+            else:
+                values[name] = _devices_repartition(value)
+                axes[name] = list(range(len(values[name].total_weights)))
+        else:
+            _add_axis(axes, values, name, value)
+
+    overrides = {}
+    names = [f.name for f in dataclasses.fields(framework)]
+    for name, fields in (parameters or {}).items():
+        if name not in names:
+            raise TypeError(f"Framework has no parameters {name!r}")
+        parameter_set = getattr(framework, name)
+        for field, value in fields.items():
+            if field not in {f.name for f in dataclasses.fields(parameter_set)}:
+                raise TypeError(
+                    f"{type(parameter_set).__name__} has no parameter {field!r}"
+                )
+            overrides[name, field] = f"{name}.{field}"
+            _add_axis(axes, values, f"{name}.{field}", value)
+
+    dimensions = len(axes)
+    columns = {}
+    for name, value in values.items():
+        if name not in axes:
+            columns[name] = value
+            continue
+        shape = [1] * dimensions
+        shape[list(axes).index(name)] = -1
+        if name == "devices_repartition":
+            matrix = _devices_repartition(value)
+            columns[name] = batch.DistributionMatrix(
+                matrix.weights.reshape(shape + [len(DEVICES)]),
+                matrix.total_weights.reshape(shape),
+            )
+        else:
+            columns[name] = np.asarray(value).reshape(shape)
+    axes = {name: np.asarray(labels) for name, labels in axes.items()}
+    computation_logger.info(
+        "Sweeping %s combinations of %s axes.",
+        int(np.prod([len(labels) for labels in axes.values()])),
+        dimensions,
+    )
+    if overrides:
+        framework = _coefficients(
+            framework,
+            {key: columns.pop(axis) for key, axis in overrides.items()},
+            columns.pop("country", None),
+        )
+    costs = function(framework, **columns)
+
+    shape = tuple(len(labels) for labels in axes.values())
+    costs = type(costs)(
+        *(
+            batch.Co2CostArray(
+                np.broadcast_to(cost.use, shape),
+                np.broadcast_to(cost.manufacturing, shape),
+            )
+            for cost in costs
+        )
+    )
+    return Sweep(axes, costs)
+
+
+def impressions_cost(
+    framework: Framework,
+    *,
+    parameters: Mapping[str, Mapping[str, typing.Any]] | None = None,
+    **arguments: typing.Any,
+) -> Sweep:
+    """
+    Return the costs of impressions for every combination of the values of the axes.
+
+    :param framework: framework of the costs.
+    :param arguments: arguments of :func:`carbon.batch.impressions_cost`. Each one is a scalar, fixed for all the combinations,
+        or a one-dimensional axis of values, such as a list of ``country`` codes. An axis may also be given as a mapping from the
+        labels of its values to its values. The device mixes are given as an axis of ``devices_repartition``, a sequence
+        of :class:`Distribution`, of ``{device: weight}`` mappings, or a :class:`carbon.batch.DistributionMatrix`.
+    :param parameters: numeric parameters of the framework, by set of parameters, each one a scalar or an axis of values
+        as the arguments. Their axes follow those of the arguments.
+
+    Raises:
+        ValueError: if any value is invalid, or an axis is not one-dimensional.
+        TypeError: if a parameter does not match any parameter of the framework.
+        KeyError: if any country is not referenced.
+    """
+    return _sweep(batch.impressions_cost, framework, arguments, parameters)
+
+
+def bids_cost(
+    framework: Framework,
+    *,
+    parameters: Mapping[str, Mapping[str, typing.Any]] | None = None,
+    **arguments: typing.Any,
+) -> Sweep:
+    """Return the costs of bids for every combination of the values of the axes, see :func:`impressions_cost`."""
+    return _sweep(batch.bids_cost, framework, arguments, parameters)
+
+
+def adcalls_cost(
+    framework: Framework,
+    *,
+    parameters: Mapping[str, Mapping[str, typing.Any]] | None = None,
+    **arguments: typing.Any,
+) -> Sweep:
+    """Return the costs of ad calls for every combination of the values of the axes, see :func:`impressions_cost`."""
+    return _sweep(batch.adcalls_cost, framework, arguments, parameters)
@@ -0,0 +1,146 @@
+"""
+Time-resolved emission factors, to compute the Co2 cost of timestamped rows with the emission factor in effect at their time.
+
+A timeline holds, for each country, the times from which each emission factor is in effect, such as hourly or monthly
+factors of the electricity grid. The factors of all the rows are looked up at once, by a single binary search over
+the starts of all the countries sorted by country then time.
+
+.. code-block:: python
+
+    timeline = timeseries.EmissionFactorTimeline.load("emission_factors.csv")
+    coefficients = timeline.coefficients(framework, impressions["country"], impressions["timestamp"])
+    costs = batch.impressions_cost(coefficients, nb_impressions=impressions["nb_impressions"], ...)
+"""
+
+import csv
+import typing
+
+import numpy as np
+
+from carbon import batch, metrics
+from carbon.digital_carbon_framework import Coefficients, Framework
+
+ArrayLike = batch.ArrayLike
+
+COLUMNS = ("country", "start", "emission_factor")
+"""Columns of the CSV files of emission factors."""
+
+
+def _as_datetime(timestamps: ArrayLike) -> np.ndarray:
+    """Return timestamps as UTC datetimes to the second, from datetimes or ISO 8601 strings."""
+    return np.asarray(timestamps, dtype="datetime64[s]")
+
+
+class EmissionFactorTimeline(typing.NamedTuple):
+    """Emission factors of each country, each one in effect from its start until the start of the next one."""
+
+    alpha_codes: np.ndarray
+    """Sorted alpha-2 codes of the countries."""
+    offsets: np.ndarray
+    """Index of the first start of each country, followed by the number of starts."""
+    starts: np.ndarray
+    """Times from which each emission factor is in effect, sorted by country then time."""
+    emission_factors: np.ndarray
+    """Emission factor in effect from each start."""
+
+    @classmethod
+    def from_columns(
+        cls, country: ArrayLike, start: ArrayLike, emission_factor: ArrayLike
+    ) -> "EmissionFactorTimeline":
+        """
+        Return the timeline of emission factors given as columns, in any order.
+
+        Countries are given by any code or name of :mod:`carbon.countries`.
+
+        Raises:
+            KeyError: if any country is not referenced.
+            ValueError: if any emission factor is negative or not a number, or any country has two factors with the same start.
+        """
+        country = batch.resolve_countries(country)
+        start = _as_datetime(start)
+        emission_factor = np.asarray(emission_factor, dtype=np.float64)
+        batch._raise_on_rows(
+            np.isnat(start), "The start of each emission factor is required"
+        )
+        batch._raise_on_rows(
+            ~(emission_factor >= 0), "Emission factors must be positive numbers"
+        )
+
+        alpha_codes, country_ids = np.unique(country, return_inverse=True)
+        order = np.lexsort((start, country_ids))
+        country_ids, start = country_ids[order], start[order]
+        duplicated = np.zeros(order.shape, dtype=bool)
+        duplicated[order[1:]] = (country_ids[1:] == country_ids[:-1]) & (
+            start[1:] == start[:-1]
+        )
+        batch._raise_on_rows(duplicated, "Emission factors with the same start")
+        return cls(
+            alpha_codes=alpha_codes,
+            offsets=np.searchsorted(country_ids, np.arange(len(alpha_codes) + 1)),
+            starts=start,
+            emission_factors=emission_factor[order],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "EmissionFactorTimeline":
+        """
+        Load a timeline from a CSV file with ``country``, ``start`` and ``emission_factor`` columns.
+
+        Starts are ISO 8601 UTC times, such as ``2024-01-01`` or ``2024-01-01T13:00``.
+        """
+        with open(path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        return cls.from_columns(*([row[column] for row in rows] for column in COLUMNS))
+
+    def lookup(self, country: ArrayLike, timestamp: ArrayLike) -> np.ndarray:
+        """
+        Return the emission factor in effect for each country at each timestamp.
+
+        Raises:
+            KeyError: if any country has no emission factor. All the unknown countries are listed in the message.
+            ValueError: if any timestamp is before the first emission factor of its country.
+        """
+        with metrics.timer("emission_factor_lookup"):
+            timestamp = _as_datetime(timestamp)
+            country_ids, unknown = batch.search_countries(self.alpha_codes, country)
+            batch._raise_on_unknown_countries(country, unknown)
+            country_ids, timestamp = np.broadcast_arrays(country_ids, timestamp)
+            batch._raise_on_rows(np.isnat(timestamp), "Missing timestamp")
+
+            # Starts and timestamps are searched together, as one key per country and time: each country spans
+            # its own range of keys, and timestamps out of the range of the starts are clipped to its bounds.
+            origin = self.starts.min().astype(np.int64)
+            span = self.starts.max().astype(np.int64) - origin + 2
+            keys = np.repeat(np.arange(len(self.alpha_codes)), np.diff(self.offsets))
+            keys = keys * span + (self.starts.astype(np.int64) - origin)
+            searched = country_ids * span + np.clip(
+                timestamp.astype(np.int64) - origin, -1, span - 1
+            )
+            rows = np.searchsorted(keys, searched, side="right") - 1
+            batch._raise_on_rows(
+                rows < self.offsets[country_ids],
+                "No emission factor in effect before the first start of the country",
+            )
+            return self.emission_factors[rows]
+
+    def emission_factor(self, country: str, timestamp) -> float:
+        """Return the emission factor in effect for a country at a given time."""
+        return float(self.lookup(country, timestamp))
+
+    def framework_at(self, framework: Framework, country: str, timestamp) -> Framework:
+        """Return a variant of the framework targeting the country, with the emission factor in effect at the given time."""
+        return framework.with_emission_factor(self.emission_factor(country, timestamp))
+
+    def coefficients(
+        self, framework: Framework, country: ArrayLike, timestamp: ArrayLike
+    ) -> Coefficients:
+        """
+        Return the coefficients of the framework for each row, with the emission factor of its country at its time.
+
+        The coefficients are given in place of the framework to the functions of :mod:`carbon.batch`,
+        with the other columns of the rows.
+        """
+        coefficients = framework.coefficients_with_emission_factor(
+            self.lookup(country, timestamp)
+        )
+        return Coefficients(*np.broadcast_arrays(*map(np.asarray, coefficients)))
@@ -0,0 +1,228 @@
+"""
+Monte Carlo estimation of the uncertainty of the Co2 costs, from distributions of the parameters of a Framework.
+
+Parameters are sampled as NumPy arrays, and evaluated through :func:`carbon.digital_carbon_framework.compile_coefficients`
+into one set of coefficients per sample. The costs of all the samples of a campaign are then computed in a single
+vectorized pass of :mod:`carbon.batch`.
+
+>>> summary = uncertainty.impressions_cost(
+...     framework,
+...     {"allocation_network_use": {"uncertainty_margin": uncertainty.Uniform(0.1, 0.3)}},
+...     nb_impressions=[1e6, 1e4], creative_type="display", allocation="programmatic", creative_size_ko=1e3,
+...     desktop=1, smart_phone=0, tablet=0, connected_tv=0,
+... )
+>>> summary.totals["overall"]  # One row per campaign, one column per percentile
+"""
+
+import dataclasses
+import types
+import typing
+
+import numpy as np
+
+from carbon import batch, computation_logger
+from carbon.digital_carbon_framework import (
+    Coefficients,
+    Framework,
+    compile_coefficients,
+)
+
+ArrayLike = batch.ArrayLike
+
+SAMPLES = 100_000
+"""Default number of samples."""
+PERCENTILES = (5.0, 50.0, 95.0)
+"""Default percentiles of the costs."""
+
+
+class Uniform(typing.NamedTuple):
+    """Values uniformly distributed in ``[low, high)``."""
+
+    low: float
+    high: float
+
+    def sample(self, random: np.random.Generator, size: int) -> np.ndarray:
+        return random.uniform(self.low, self.high, size)
+
+
+class Normal(typing.NamedTuple):
+    """Normally distributed values."""
+
+    mean: float
+    std: float
+
+    def sample(self, random: np.random.Generator, size: int) -> np.ndarray:
+        return random.normal(self.mean, self.std, size)
+
+
+class LogNormal(typing.NamedTuple):
+    """Values whose logarithm is normally distributed, with the given mean and standard deviation."""
+
+    mean: float
+    sigma: float
+
+    def sample(self, random: np.random.Generator, size: int) -> np.ndarray:
+        return random.lognormal(self.mean, self.sigma, size)
+
+
+class Triangular(typing.NamedTuple):
+    """Values distributed over ``[left, right]`` with a triangular density peaking at ``mode``."""
+
+    left: float
+    mode: float
+    right: float
+
+    def sample(self, random: np.random.Generator, size: int) -> np.ndarray:
+        return random.triangular(self.left, self.mode, self.right, size)
+
+
+class Sampler(typing.Protocol):
+    def sample(self, random: np.random.Generator, size: int) -> np.ndarray: ...
+
+
+Distributions = dict[str, dict[str, Sampler]]
+"""Distributions of parameters, by set of parameters, as the overrides of :meth:`Framework.with_overrides`."""
+
+
+def sample_coefficients(
+    framework: Framework,
+    distributions: Distributions,
+    samples: int = SAMPLES,
+    seed: int | np.random.Generator | None = None,
+) -> Coefficients:
+    """
+    Return the coefficients of ``samples`` variants of the framework, as one array per coefficient.
+
+    Each parameter is sampled independently, including the parameters sharing the same name in several sets.
+    The parameters without distribution keep the value of the framework.
+
+    Raises:
+        TypeError: if a distribution does not match any parameter of the framework.
+    """
+    random = np.random.default_rng(seed)
+    # Sampled in the order of the parameters, so that a seed always gives the same samples.
+    names = [f.name for f in dataclasses.fields(framework)]
+    for name in distributions:
+        if name not in names:
+            raise TypeError(f"Framework has no parameters {name!r}")
+
+    sets = {}
+    for name in names:
+        parameters = getattr(framework, name)
+        values = {
+            f.name: getattr(parameters, f.name) for f in dataclasses.fields(parameters)
+        }
+        for field, distribution in distributions.get(name, {}).items():
+            if field not in values:
+                raise TypeError(
+                    f"{type(parameters).__name__} has no parameter {field!r}"
+                )
+            values[field] = distribution.sample(random, samples)
+        sets[name] = types.SimpleNamespace(**values)
+    coefficients = compile_coefficients(types.SimpleNamespace(**sets))
+    return Coefficients(*np.broadcast_arrays(*map(np.asarray, coefficients)))
+
+
+class Summary(typing.NamedTuple):
+    """Percentiles of the total kgco2 cost of campaigns."""
+
+    percentiles: tuple[float, ...]
+    totals: dict[str, np.ndarray]
+    """Percentiles of the total cost of each pillar, and of their ``overall`` sum, with one row per campaign."""
+
+
+def _simulate(
+    function: typing.Callable,
+    framework: Framework,
+    distributions: Distributions,
+    columns: dict[str, ArrayLike],
+    samples: int,
+    seed: int | np.random.Generator | None,
+    percentiles: typing.Sequence[float],
+) -> Summary:
+    coefficients = sample_coefficients(framework, distributions, samples, seed)
+    columns = dict(
+        zip(columns, np.broadcast_arrays(*map(np.asarray, columns.values())))
+    )
+    campaigns = np.shape(next(iter(columns.values()), ()))
+    computation_logger.info(
+        "Simulating %s samples of %s campaigns.", samples, int(np.prod(campaigns))
+    )
+
+    totals = {}
+    for index in np.ndindex(campaigns):
+        # The same samples are used for every campaign, so that their costs can be compared.
+        costs = function(coefficients, **{k: v[index] for k, v in columns.items()})
+        pillars = {name: cost.total for name, cost in zip(costs._fields, costs)}
+        pillars["overall"] = costs.overall.total
+        for name, total in pillars.items():
+            if name not in totals:
+                totals[name] = np.empty(campaigns + (len(percentiles),))
+            totals[name][index] = np.percentile(total, percentiles)
+    return Summary(tuple(percentiles), totals)
+
+
+def impressions_cost(
+    framework: Framework,
+    distributions: Distributions,
+    *,
+    samples: int = SAMPLES,
+    seed: int | np.random.Generator | None = None,
+    percentiles: typing.Sequence[float] = PERCENTILES,
+    **columns: ArrayLike,
+) -> Summary:
+    """
+    Return the percentiles of the costs of campaigns of impressions, over samples of the parameters.
+
+    :param framework: framework whose parameters are sampled.
+    :param distributions: distributions of the sampled parameters, by set of parameters.
+    :param samples: number of samples of the parameters.
+    :param seed: seed of the random generator, for reproducible results.
+    :param percentiles: percentiles of the costs, between 0 and 100.
+    :param columns: arguments of :func:`carbon.batch.impressions_cost`, one value per campaign.
+    """
+    return _simulate(
+        batch.impressions_cost,
+        framework,
+        distributions,
+        columns,
+        samples,
+        seed,
+        percentiles,
+    )
+
+
+def bids_cost(
+    framework: Framework,
+    distributions: Distributions,
+    *,
+    samples: int = SAMPLES,
+    seed: int | np.random.Generator | None = None,
+    percentiles: typing.Sequence[float] = PERCENTILES,
+    **columns: ArrayLike,
+) -> Summary:
+    """Return the percentiles of the costs of bids, see :func:`impressions_cost`."""
+    return _simulate(
+        batch.bids_cost, framework, distributions, columns, samples, seed, percentiles
+    )
+
+
+def adcalls_cost(
+    framework: Framework,
+    distributions: Distributions,
+    *,
+    samples: int = SAMPLES,
+    seed: int | np.random.Generator | None = None,
+    percentiles: typing.Sequence[float] = PERCENTILES,
+    **columns: ArrayLike,
+) -> Summary:
+    """Return the percentiles of the costs of ad calls, see :func:`impressions_cost`."""
+    return _simulate(
+        batch.adcalls_cost,
+        framework,
+        distributions,
+        columns,
+        samples,
+        seed,
+        percentiles,
+    )
@@ -1,14 +1,46 @@
+import hashlib
+import marshal
+import os
+import tempfile
 import typing
 
-from pydantic import BaseModel
+import yaml
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from carbon import logger
+
+DEVICES = ("desktop", "smart_phone", "tablet", "connected_tv")
+"""Registry of the devices of a delivery repartition, ordering their ratio vectors."""
+
+
+class _Weights(dict):
+    """Weights of a :class:`Distribution`, that can not be modified, so that the ratios computed from them stay valid."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(
+            "The weights of a Distribution can not be modified, create another one"
+        )
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
 
 
 class Distribution(BaseModel):
-    """Represent a distribution over multiple keys."""
+    """Represent a distribution over multiple keys, that can not be modified once created."""
+
+    model_config = ConfigDict(frozen=True)
 
     weights: dict[typing.Any, float]
     """Set of weights for different keys"""
 
+    @field_validator("weights")
+    @classmethod
+    def _freeze_weights(cls, weights: dict) -> _Weights:
+        return _Weights(weights)
+
     def model_post_init(self, __context) -> None:
         del __context
         if any(x < 0 for x in self.weights.values()):
@@ -16,6 +48,33 @@ class Distribution(BaseModel):
         self._total_weights = sum(self.weights.values())
         if self._total_weights == 0:
             raise ValueError("At least one weight must be non-null")
+        self._ratios = frozenset(
+            (key, weight / self._total_weights)
+            for key, weight in self.weights.items()
+            if weight
+        )
+        self._hash = hash(self._ratios)
+        self._device_ratios = tuple(self.get_ratio(device, 0.0) for device in DEVICES)
+
+    def __eq__(self, other) -> bool:
+        """Distributions are equal if they have the same ratios, whatever the scale of their weights."""
+        if not isinstance(other, Distribution):
+            return NotImplemented
+        return self._hash == other._hash and self._ratios == other._ratios
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def model_copy(self, *, update: dict | None = None, deep: bool = False):
+        """Return a copy of the distribution, validated again if ``update`` changes its weights."""
+        if update:
+            return self.model_validate({**dict(self), **update})
+        return super().model_copy(deep=deep)
+
+    @property
+    def device_ratios(self) -> tuple[float, ...]:
+        """Ratio of each device of :data:`DEVICES`, in their order, null for the devices without weight."""
+        return self._device_ratios
 
     @property
     def get_weight(self):
@@ -29,3 +88,58 @@ class Distribution(BaseModel):
         return (
             self.weights[key] / self._total_weights if key in self.weights else default
         )
+
+
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+"""Safe YAML loader, backed by libyaml when available."""
+
+
+def yaml_cache_dir() -> str | None:
+    """
+    Return the directory of the compiled YAML files, or None if the cache is disabled.
+
+    Defaults to ``$XDG_CACHE_HOME/digital-carbon-framework``, and is set with the ``CARBON_CACHE_DIR``
+    environment variable, the cache being disabled if this variable is empty.
+    """
+    cache_dir = os.environ.get("CARBON_CACHE_DIR")
+    if cache_dir is None:
+        cache_dir = os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+            "digital-carbon-framework",
+        )
+    return cache_dir or None
+
+
+def load_yaml(path: str) -> typing.Any:
+    """
+    Load a YAML file, from its compiled counterpart in :func:`yaml_cache_dir` when it exists.
+
+    The file is compiled with :mod:`marshal` on its first load, and named after the hash of its content,
+    so that any change of the file is compiled again.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+    cache_dir = yaml_cache_dir()
+    if cache_dir is None:
+        return yaml.load(content, Loader=_YamlLoader)
+
+    digest = hashlib.sha256(content).hexdigest()
+    cache_file = os.path.join(cache_dir, f"{digest}.{marshal.version}.marshal")
+    try:
+        with open(cache_file, "rb") as file:
+            return marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    data = yaml.load(content, Loader=_YamlLoader)
+    try:
+        compiled = marshal.dumps(data)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Written aside then renamed, so that concurrent loads never read a partial file.
+        with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as file:
+            file.write(compiled)
+        os.replace(file.name, cache_file)
+    except (OSError, ValueError) as error:
+        # Not cacheable, or read-only file system: the file is parsed again on the next load.
+        logger.debug("Could not compile %s: %s", path, error)
+    return data
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from carbon import batch, digital_carbon_framework
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from carbon import arrow
+except ImportError:
+    pa = None
+
+COLUMNS = {
+    "id": ["a", "b", "c"],
+    "nb_impressions": [10000, 10000, 1000],
+    "creative_type": ["video", "display", "video"],
+    "allocation": ["direct", "programmatic", "direct"],
+    "creative_size_ko": [1200.0, 1200.0, 5000.0],
+    "desktop": [10.0, 10.0, 0.0],
+    "smart_phone": [20.0, 20.0, 1.0],
+    "tablet": [5.0, 5.0, 0.0],
+    "connected_tv": [20.0, 20.0, 1.0],
+    "country": ["FR", "DEU", "US"],
+}
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class ArrowTest(unittest.TestCase):
+    def test_transform_parquet(self):
+        campaign = digital_carbon_framework.Framework.load()
+        expected = batch.impressions_cost(
+            campaign, **{k: v for k, v in COLUMNS.items() if k != "id"}
+        ).overall.total.tolist()
+
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "impressions.parquet")
+            destination = os.path.join(directory, "costs.arrow")
+            pq.write_table(pa.table(COLUMNS), source)
+            rows = arrow.transform(
+                campaign,
+                source,
+                destination,
+                arrow.BatchScorer(country_column="country"),
+                batch_size=2,
+            )
+            self.assertEqual(rows, 3)
+            with pa.memory_map(destination) as file:
+                table = pa.ipc.open_file(file).read_all()
+        self.assertEqual(table.column("id").to_pylist(), COLUMNS["id"])
+        self.assertEqual(table.column(arrow.TOTAL_COLUMN).to_pylist(), expected)
+
+    def test_missing_values_are_reported(self):
+        campaign = digital_carbon_framework.Framework.load()
+        record_batch = pa.RecordBatch.from_pydict(
+            {**COLUMNS, "nb_impressions": [1, None, 3]}
+        )
+        with self.assertRaisesRegex(
+            ValueError, r"nb_impressions \(invalid rows: \[1\]"
+        ):
+            arrow.BatchScorer().score(campaign, record_batch)
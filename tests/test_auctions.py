@@ -0,0 +1,111 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from carbon import auctions, digital_carbon_framework
+from carbon.compute_footprints import adcalls_cost, bids_cost
+
+LINES = [
+    {"ssp": "appnexus", "creative_type": "video", "country": "FR", "timestamp": "2024-01-01T13:05:00Z"},
+    {"ssp": "appnexus", "creative_type": "display", "country": "FR", "timestamp": "2024-01-01T13:59:59Z"},
+    {"ssp": "appnexus", "creative_type": "video", "country": "DE", "timestamp": "2024-01-01T14:00:00Z"},
+    {"ssp": "magnite", "creative_type": "display", "country": "fra", "timestamp": "2024-01-01T13:30:00Z"},
+    {"ssp": "appnexus", "creative_type": "video", "country": "FR", "timestamp": "2024-01-01T13:10:00Z"},
+]  # fmt: skip
+
+
+class AuctionLogTest(unittest.TestCase):
+    def setUp(self):
+        self.campaign = digital_carbon_framework.Framework.load()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.jsonl = os.path.join(self.directory.name, "bids.jsonl")
+        with open(self.jsonl, "w") as file:
+            file.writelines(json.dumps(line) + "\n" for line in LINES[:3])
+            file.write("\n")
+        self.csv = os.path.join(self.directory.name, "bids.csv.gz")
+        with gzip.open(self.csv, "wt") as file:
+            file.write("timestamp,ssp,country,creative_type\n")
+            for line in LINES[3:]:
+                file.write(
+                    "{timestamp},{ssp},{country},{creative_type}\n".format(**line)
+                )
+
+    def test_count(self):
+        log = auctions.AuctionLog(
+            keys=("ssp", "timestamp"), country_field="country", period="hour"
+        )
+        self.assertEqual(
+            log.count(json.dumps(line) for line in LINES),
+            {
+                ("appnexus", "2024-01-01T13", "FR"): 3,
+                ("appnexus", "2024-01-01T14", "DE"): 1,
+                ("magnite", "2024-01-01T13", "fra"): 1,
+            },
+        )
+        with self.assertRaisesRegex(ValueError, "without the"):
+            log.count(['{"ssp": "appnexus"}'])
+        with self.assertRaisesRegex(ValueError, r"\['country'\] not in"):
+            log._replace(input_format="csv", fieldnames=("ssp", "timestamp")).count([])
+
+    def test_count_reports_invalid_lines(self):
+        log = auctions.AuctionLog(keys=("ssp", "timestamp"), country_field="country")
+        valid = json.dumps(LINES[0])
+        with self.assertRaisesRegex(ValueError, r"^Line 3 without the .*'country'"):
+            log.count([valid, "", '{"ssp": "appnexus", "timestamp": "2024"}'])
+        with self.assertRaisesRegex(
+            ValueError, "^Line 2 with an invalid value .*unhashable"
+        ):
+            log.count([valid, json.dumps({**LINES[0], "ssp": ["appnexus"]})])
+        with self.assertRaisesRegex(ValueError, "^Line 1 with an invalid value"):
+            log.count(["[1, 2, 3]"])
+        with self.assertRaisesRegex(ValueError, "^Line 2 is not a valid jsonl record"):
+            log.count([valid, '{"ssp":', valid])
+
+        with gzip.open(self.csv, "at") as file:
+            file.write("2024-01-01T15:00:00Z,magnite\n")
+        with self.assertRaisesRegex(ValueError, r"bids.csv.gz: Line 4 without the"):
+            auctions.ingest(self.campaign, [self.csv], log)
+
+    def test_bids_match_scalar(self):
+        totals = auctions.ingest(
+            self.campaign,
+            [self.jsonl, self.csv],
+            auctions.AuctionLog(keys=("ssp", "country"), country_field="country"),
+        )
+        self.assertEqual(
+            totals.keys(), {("appnexus", "FR"), ("appnexus", "DE"), ("magnite", "fra")}
+        )
+        self.assertEqual(totals["appnexus", "FR"].count, 3)
+        self.assertEqual(
+            totals["appnexus", "FR"].to_model(),
+            bids_cost(self.campaign.with_country("FR"), nb_bids=3),
+        )
+
+        by_ssp = auctions.ingest(
+            self.campaign,
+            [self.jsonl, self.csv],
+            auctions.AuctionLog(country_field="country"),
+        )
+        self.assertEqual(by_ssp.keys(), {("appnexus",), ("magnite",)})
+        self.assertEqual(by_ssp["appnexus",].count, 4)
+        self.assertAlmostEqual(
+            by_ssp["appnexus",].overall.total,
+            bids_cost(self.campaign.with_country("FR"), nb_bids=3).overall.total
+            + bids_cost(self.campaign.with_country("DE"), nb_bids=1).overall.total,
+        )
+
+    def test_adcalls_match_scalar(self):
+        totals = auctions.ingest(
+            self.campaign,
+            [self.jsonl, self.csv],
+            auctions.AuctionLog(kind="adcalls", keys=("ssp", "creative_type")),
+        )
+        self.assertEqual(totals["appnexus", "video"].count, 3)
+        self.assertEqual(
+            totals["appnexus", "video"].to_model(),
+            adcalls_cost(self.campaign, nb_ad_calls=3, creative_type="video"),
+        )
+        self.assertEqual(auctions.AuctionLog().costs(self.campaign, {}), {})
@@ -0,0 +1,168 @@
+import unittest
+
+import numpy as np
+
+from carbon import batch, digital_carbon_framework
+from carbon.compute_footprints import adcalls_cost, bids_cost, impressions_cost
+from carbon.utils import DEVICES
+
+ROWS = {
+    "nb_impressions": np.array([10000, 10000, 1000, 123456, 7]),
+    "creative_type": np.array(["video", "display", "video", "display", "display"]),
+    "allocation": np.array(
+        ["direct", "programmatic", "direct", "direct", "programmatic"]
+    ),
+    "creative_size_ko": np.array([1200, 1200, 5000, 30.5, 1e6]),
+    "creative_avg_view_s": np.array([5, 5, 3, 0.25, 12]),
+    "desktop": np.array([10, 10, 0, 1, 0.3]),
+    "smart_phone": np.array([20, 20, 1.0, 0, 0.3]),
+    "tablet": np.array([5, 5, 0, 0, 0.3]),
+    "connected_tv": np.array([20, 20, 1, 0, 0.1]),
+}
+
+
+class BatchTest(unittest.TestCase):
+    def test_impressions_cost_matches_scalar(self):
+        campaign = digital_carbon_framework.Framework.load()
+        costs = batch.impressions_cost(campaign, **ROWS)
+        for i in range(len(ROWS["nb_impressions"])):
+            expected = impressions_cost(
+                campaign,
+                nb_impressions=ROWS["nb_impressions"][i],
+                creative_type=ROWS["creative_type"][i],
+                allocation=ROWS["allocation"][i],
+                creative_size_ko=ROWS["creative_size_ko"][i],
+                creative_avg_view_s=ROWS["creative_avg_view_s"][i],
+                devices_repartition=digital_carbon_framework.Distribution(
+                    weights={
+                        k: ROWS[k][i]
+                        for k in ("desktop", "smart_phone", "tablet", "connected_tv")
+                    }
+                ),
+            )
+            self.assertEqual(costs.row(i), expected)
+            self.assertEqual(costs.overall.total[i], expected.overall.total)
+
+    def test_impressions_cost_broadcasts_scalars(self):
+        campaign = digital_carbon_framework.Framework.load()
+        costs = batch.impressions_cost(
+            campaign,
+            nb_impressions=[1, 10, 100],
+            creative_type="video",
+            allocation="direct",
+            creative_size_ko=1200,
+            desktop=1,
+            smart_phone=0,
+            tablet=0,
+            connected_tv=0,
+        )
+        self.assertEqual(costs.kgco2_distrib_terminal.use.shape, (3,))
+        self.assertEqual(len(costs.to_dict()), 10)
+
+    def test_impressions_cost_reports_invalid_rows(self):
+        campaign = digital_carbon_framework.Framework.load()
+        with self.assertRaisesRegex(ValueError, r"invalid rows: \[1, 3\]"):
+            batch.impressions_cost(
+                campaign,
+                **{**ROWS, "creative_type": ["video", "audio", "video", "", "display"]},
+            )
+        with self.assertRaisesRegex(ValueError, r"invalid rows: \[2\]"):
+            batch.impressions_cost(
+                campaign,
+                **{**ROWS, "smart_phone": 0, "connected_tv": [1, 1, 0, 1, 1]},
+            )
+
+    def test_distribution_matrix(self):
+        devices = {k: ROWS[k] for k in DEVICES}
+        matrix = batch.DistributionMatrix.from_columns(**devices)
+        self.assertEqual(matrix.weights.shape, (5, 4))
+        np.testing.assert_array_equal(matrix.column("tablet"), ROWS["tablet"])
+        np.testing.assert_allclose(matrix.ratios.sum(axis=1), 1)
+
+        distributions = batch.DistributionMatrix.from_distributions(
+            [digital_carbon_framework.Distribution(weights={"tablet": 2, "other": 2})]
+        )
+        np.testing.assert_array_equal(distributions.weights, [[0, 0, 0.5, 0]])
+
+        campaign = digital_carbon_framework.Framework.load()
+        rows = {k: v for k, v in ROWS.items() if k not in devices}
+        np.testing.assert_array_equal(
+            batch.impressions_cost(
+                campaign, **rows, devices_repartition=matrix
+            ).overall.total,
+            batch.impressions_cost(campaign, **ROWS).overall.total,
+        )
+
+        weights = np.column_stack(list(devices.values()))
+        weights[[1, 4], 2] = -1
+        with self.assertRaisesRegex(ValueError, r"positive.*invalid rows: \[1, 4\]"):
+            batch.DistributionMatrix.from_weights(weights)
+
+    def test_impressions_cost_per_row_country(self):
+        campaign = digital_carbon_framework.Framework.load()
+        countries = np.array(["DE", "FRA", "US", "DEU", "FR"])
+        costs = batch.impressions_cost(campaign, **ROWS, country=countries)
+        self.assertEqual(
+            campaign.distribution_server_use.emission_factor_target_country, 0.052
+        )
+        for i, country in enumerate(countries):
+            local = digital_carbon_framework.Framework.load()
+            local.change_target_country(country)
+            expected = batch.impressions_cost(local, **ROWS)
+            self.assertEqual(costs.row(i), expected.row(i))
+
+    def test_bids_and_adcalls_cost_per_row_country(self):
+        campaign = digital_carbon_framework.Framework.load()
+        germany = digital_carbon_framework.Framework.load()
+        germany.change_target_country("DE")
+        bids = batch.bids_cost(campaign, nb_bids=[10, 10], country=["FR", "DE"])
+        self.assertEqual(bids.row(0), bids_cost(campaign, nb_bids=10))
+        self.assertEqual(bids.row(1), bids_cost(germany, nb_bids=10))
+        adcalls = batch.adcalls_cost(
+            campaign, nb_ad_calls=10, creative_type="video", country=["DEU"]
+        )
+        self.assertEqual(
+            adcalls.row(0),
+            adcalls_cost(germany, nb_ad_calls=10, creative_type="video"),
+        )
+
+    def test_unknown_countries_are_reported_in_bulk(self):
+        campaign = digital_carbon_framework.Framework.load()
+        with self.assertRaisesRegex(KeyError, r"\['XX', 'ZZZ'\].*2 codes in 3 rows"):
+            batch.bids_cost(campaign, nb_bids=1, country=["ZZZ", "FR", "XX", "XX"])
+
+    def test_countries_are_resolved_by_code_and_name(self):
+        campaign = digital_carbon_framework.Framework.load()
+        bids = batch.bids_cost(
+            campaign, nb_bids=10, country=["de", " DEU", "276", "Germany", "DE"]
+        )
+        for row in range(4):
+            self.assertEqual(bids.row(row), bids.row(4))
+        np.testing.assert_array_equal(
+            batch.resolve_countries(["fra", "250", "United Kingdom", "fra"]),
+            ["FR", "FR", "GB", "FR"],
+        )
+        with self.assertRaisesRegex(KeyError, r"\['Atlantis'\].*1 codes in 2 rows"):
+            batch.resolve_countries(["Atlantis", "FR", "Atlantis"])
+
+    def test_country_coefficients_follow_mutations(self):
+        campaign = digital_carbon_framework.Framework.load()
+        before = batch.country_coefficients(campaign)
+        self.assertIs(before, batch.country_coefficients(campaign))
+        campaign.allocation_network_use.nb_requests_per_active_path = 6
+        self.assertIsNot(before, batch.country_coefficients(campaign))
+
+    def test_accumulate_by_key(self):
+        campaign = digital_carbon_framework.Framework.load()
+        costs = batch.impressions_cost(campaign, **ROWS)
+        totals = batch.accumulate(costs, ["a", "b", "a", "b", "b"])
+        self.assertEqual(sorted(totals), ["a", "b"])
+        self.assertEqual(totals["a"].count, 2)
+        self.assertEqual(
+            totals["a"].to_model().kgco2_distrib_server.use,
+            costs.row(0).kgco2_distrib_server.use
+            + costs.row(2).kgco2_distrib_server.use,
+        )
+        self.assertAlmostEqual(
+            (totals["a"] + totals["b"]).overall.total, costs.overall.total.sum()
+        )
@@ -0,0 +1,28 @@
+import json
+import unittest
+
+from carbon import benchmark
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_run_and_compare(self):
+        cases = benchmark.benchmarks(sizes=[10])
+        names = [case.name for case in cases]
+        self.assertIn("Framework.change_target_country", names)
+        self.assertIn("pandas.impressions_cost[country][10]", names)
+
+        results = [
+            benchmark.run(case, min_time=0.001, repeat=1)
+            for case in cases
+            if case.name in ("compute_footprints.bids_cost", "pandas.bids_cost[10]")
+        ]
+        self.assertEqual(results[1].rows, 10)
+        self.assertGreater(results[1].peak_memory, 0)
+
+        baseline = json.loads(benchmark.to_json(results))
+        baseline["pandas.bids_cost[10]"]["throughput"] *= 10
+        self.assertEqual(
+            benchmark.regressions(results, baseline, tolerance=0.5),
+            ["pandas.bids_cost[10]"],
+        )
+        self.assertIn("0.10x", benchmark.report(results, baseline))
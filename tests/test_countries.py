@@ -0,0 +1,35 @@
+import unittest
+
+from carbon import countries, digital_carbon_framework
+
+
+class CountryIndexTest(unittest.TestCase):
+    def test_codes_and_names_are_resolved(self):
+        for code in ("FR", "fr", "FRA", " fra ", "250", "France", "FRANCE"):
+            self.assertEqual(countries.resolve(code), "FR")
+        self.assertEqual(countries.resolve(8), "AL")
+        self.assertEqual(countries.resolve("008"), "AL")
+        self.assertEqual(countries.resolve("united  states"), "US")
+        with self.assertRaisesRegex(KeyError, "Atlantis"):
+            countries.resolve("Atlantis")
+
+    def test_every_country_of_the_framework_is_indexed(self):
+        campaign = digital_carbon_framework.Framework.load()
+        for alpha_code, emission_factor in campaign.emission_factors.items():
+            resolved = countries.resolve(alpha_code)
+            self.assertEqual(
+                campaign.emission_factors_dict_iso2[resolved], emission_factor
+            )
+        self.assertEqual(
+            campaign.with_country("germany").coefficients,
+            campaign.with_country("DE").coefficients,
+        )
+
+    def test_ambiguous_countries_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, "CONGO refers to both"):
+            countries.CountryIndex.from_countries(
+                {
+                    "CD": {"alpha_3": "COD", "names": ["Congo"]},
+                    "CG": {"alpha_3": "COG", "names": ["Congo"]},
+                }
+            )
@@ -1,7 +1,18 @@
+import concurrent.futures
+import dataclasses
+import pickle
 import unittest
 
 from carbon import digital_carbon_framework
-from carbon.compute_footprints import Co2Cost, impressions_cost
+from carbon.compute_footprints import (
+    BidCostAccumulator,
+    Co2CampaignCostAccumulator,
+    Co2Cost,
+    adcalls_cost,
+    bids_cost,
+    cached_terminal_cost,
+    impressions_cost,
+)
 
 DEVICES_REPARTITION = digital_carbon_framework.Distribution(
     weights={
@@ -82,3 +93,192 @@ class DigitalCarbonTest(unittest.TestCase):
                     devices_repartition=limited_devices, creative_avg_view_s=3)
         self.assertEqual(carbon_all_devices.kgco2_distrib_terminal.total
                             , carbon_limited_devices.kgco2_distrib_terminal.total) 
+
+    def test_distributions_are_normalized(self):
+        scaled = digital_carbon_framework.Distribution(
+            weights={"desktop": 20, "smart_phone": 40, "tablet": 10, "connected_tv": 40}
+        )
+        self.assertEqual(scaled, DEVICES_REPARTITION)
+        self.assertEqual(hash(scaled), hash(DEVICES_REPARTITION))
+        self.assertNotEqual(
+            digital_carbon_framework.Distribution(weights={"desktop": 1}),
+            DEVICES_REPARTITION,
+        )
+
+    def test_terminal_cost_is_cached(self):
+        campaign = digital_carbon_framework.Framework.load()
+        cached_terminal_cost.cache_clear()
+        cost = campaign.kgco2_distrib_terminal(DEVICES_REPARTITION)
+        self.assertEqual(cached_terminal_cost.cache_info().misses, 1)
+
+        scaled = digital_carbon_framework.Distribution(
+            weights={"desktop": 2, "smart_phone": 4, "tablet": 1, "connected_tv": 4}
+        )
+        self.assertEqual(campaign.kgco2_distrib_terminal(scaled), cost)
+        self.assertEqual(cached_terminal_cost.cache_info().hits, 1)
+
+        campaign.change_target_country(alpha_code="DE")
+        self.assertNotEqual(campaign.kgco2_distrib_terminal(scaled), cost)
+        self.assertEqual(cached_terminal_cost.cache_info().misses, 2)
+
+    def test_cached_terminal_cost_of_modified_distributions(self):
+        campaign = digital_carbon_framework.Framework.load()
+        desktop = digital_carbon_framework.Distribution(weights={"desktop": 1})
+        smart_phone = digital_carbon_framework.Distribution(
+            weights={"smart_phone": 1}
+        )
+        campaign.kgco2_distrib_terminal(desktop)
+
+        copy = desktop.model_copy(update={"weights": {"smart_phone": 1}})
+        self.assertEqual(copy, smart_phone)
+        self.assertEqual(
+            campaign.kgco2_distrib_terminal(copy),
+            campaign.kgco2_distrib_terminal(smart_phone),
+        )
+        with self.assertRaises(TypeError):
+            desktop.weights["desktop"] = 0
+        with self.assertRaises(ValueError):
+            desktop.weights = {"smart_phone": 1}
+        self.assertEqual(desktop.device_ratios, (1.0, 0.0, 0.0, 0.0))
+
+    def test_coefficients_are_cached(self):
+        campaign = digital_carbon_framework.Framework.load()
+        self.assertIs(campaign.coefficients, campaign.coefficients)
+
+    def test_coefficients_invalidated_by_mutations(self):
+        campaign = digital_carbon_framework.Framework.load()
+        coefficients = campaign.coefficients
+
+        campaign.change_target_country(alpha_code="DE")
+        self.assertGreater(
+            campaign.coefficients.distrib_server_use, coefficients.distrib_server_use
+        )
+
+        coefficients = campaign.coefficients
+        campaign.allocation_network_use.nb_requests_per_active_path = 6
+        self.assertAlmostEqual(
+            campaign.coefficients.allocation_network_use,
+            2 * coefficients.allocation_network_use,
+        )
+        self.assertEqual(
+            campaign.kgco2_allocation_network.use,
+            campaign.coefficients.allocation_network_use,
+        )
+
+    def test_frozen_framework_cant_be_modified(self):
+        campaign = digital_carbon_framework.Framework.load(frozen=True)
+        self.assertTrue(campaign.frozen)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            campaign.allocation_network_use.nb_requests_per_active_path = 5
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            campaign.change_target_country("DE")
+        self.assertEqual(
+            campaign.distribution_server_use.emission_factor_target_country, 0.052
+        )
+
+    def test_framework_variants(self):
+        mutable = digital_carbon_framework.Framework.load()
+        campaign = mutable.freeze()
+        self.assertFalse(mutable.frozen)
+        self.assertIs(campaign.freeze(), campaign)
+
+        germany = campaign.with_country("DEU")
+        self.assertIs(
+            germany.allocation_network_use, campaign.allocation_network_use
+        )
+        mutable.change_target_country("DEU")
+        self.assertEqual(germany.coefficients, mutable.coefficients)
+        self.assertEqual(
+            campaign.distribution_server_use.emission_factor_target_country, 0.052
+        )
+
+        variant = germany.with_overrides(
+            allocation_network_use={"nb_requests_per_active_path": 6}
+        )
+        self.assertEqual(variant.allocation_network_use.nb_requests_per_active_path, 6)
+        self.assertIs(variant.distribution_server_use, germany.distribution_server_use)
+        with self.assertRaises(TypeError):
+            campaign.with_overrides(unknown={"nb_requests_per_active_path": 6})
+
+    def test_variants_are_shared_across_threads(self):
+        campaign = digital_carbon_framework.Framework.load(frozen=True)
+        countries = ["FR", "DE", "USA", "BE"] * 8
+
+        def score(alpha_code):
+            return impressions_cost(
+                campaign.with_country(alpha_code),
+                nb_impressions=10000,
+                creative_type="display",
+                allocation="programmatic",
+                creative_size_ko=1200,
+                devices_repartition=DEVICES_REPARTITION,
+                creative_avg_view_s=5,
+            ).overall.total
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            totals = list(executor.map(score, countries))
+        self.assertEqual(totals, [score(alpha_code) for alpha_code in countries])
+        self.assertAlmostEqual(
+            totals[1],
+            Co2Cost(use=7.83829675080798, manufacturing=3.2045569703363834).total,
+        )
+
+    def test_compact_costs(self):
+        campaign = digital_carbon_framework.Framework.load()
+        parameters = {
+            "nb_impressions": 10000,
+            "creative_type": "display",
+            "allocation": "programmatic",
+            "creative_size_ko": 1200,
+            "devices_repartition": DEVICES_REPARTITION,
+            "creative_avg_view_s": 5,
+        }
+        compact = impressions_cost(campaign, **parameters, as_model=False)
+        self.assertIsInstance(compact, tuple)
+        self.assertEqual(compact.to_model(), impressions_cost(campaign, **parameters))
+        self.assertEqual(
+            compact.overall.total, impressions_cost(campaign, **parameters).overall.total
+        )
+        self.assertEqual(
+            bids_cost(campaign, nb_bids=10, as_model=False).to_model(),
+            bids_cost(campaign, nb_bids=10),
+        )
+        self.assertEqual(
+            adcalls_cost(
+                campaign, nb_ad_calls=10, creative_type="video", as_model=False
+            ).to_model(),
+            adcalls_cost(campaign, nb_ad_calls=10, creative_type="video"),
+        )
+
+    def test_accumulator(self):
+        campaign = digital_carbon_framework.Framework.load()
+        costs = [
+            impressions_cost(
+                campaign,
+                nb_impressions=nb_impressions,
+                creative_type="video",
+                allocation="direct",
+                creative_size_ko=1200,
+                devices_repartition=DEVICES_REPARTITION,
+                as_model=as_model,
+            )
+            for nb_impressions, as_model in ((10, True), (200, False), (3000, True))
+        ]
+        total = Co2CampaignCostAccumulator()
+        for cost in costs:
+            total.add(cost)
+        self.assertEqual(total.count, 3)
+        self.assertAlmostEqual(
+            total.overall.total, sum(cost.overall.total for cost in costs)
+        )
+
+        shards = [Co2CampaignCostAccumulator().add(cost) for cost in costs]
+        shards = [pickle.loads(pickle.dumps(shard)) for shard in shards]
+        merged = Co2CampaignCostAccumulator.from_bytes(
+            (shards[0] + shards[1]).to_bytes()
+        ).merge(shards[2])
+        self.assertEqual(merged.count, 3)
+        self.assertEqual(merged.to_model(), total.to_model())
+        self.assertEqual(len(merged.to_bytes()), 88)
+        with self.assertRaises(TypeError):
+            merged.merge(BidCostAccumulator())
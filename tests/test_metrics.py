@@ -0,0 +1,85 @@
+import unittest
+
+from carbon import batch, digital_carbon_framework, metrics, parallel
+from carbon.compute_footprints import bids_cost, impressions_cost
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.addCleanup(metrics.disable)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(metrics.is_enabled())
+        campaign = digital_carbon_framework.Framework.load()
+        bids_cost(campaign, nb_bids=10)
+        self.assertEqual(metrics.snapshot(), {"entry_points": {}, "sections": {}})
+
+    def test_snapshot(self):
+        metrics.enable()
+        campaign = digital_carbon_framework.Framework.load()
+        campaign.change_target_country("DE")
+        impressions_cost(
+            campaign,
+            nb_impressions=1000,
+            creative_type="video",
+            allocation="programmatic",
+            creative_size_ko=100,
+            devices_repartition=digital_carbon_framework.Distribution(
+                weights={"desktop": 1}
+            ),
+        )
+        batch.bids_cost(campaign, nb_bids=[1, 2, 3], country=["FR", "DE", "US"])
+
+        snapshot = metrics.snapshot()
+        entry_points = snapshot["entry_points"]
+        self.assertEqual(entry_points["compute_footprints.impressions_cost"]["rows"], 1)
+        self.assertEqual(entry_points["batch.bids_cost"]["calls"], 1)
+        self.assertEqual(entry_points["batch.bids_cost"]["rows"], 3)
+        self.assertGreater(entry_points["batch.bids_cost"]["seconds"], 0)
+        for section in (
+            "config_loading",
+            "country_switching",
+            "validation",
+            "country_lookup",
+            "cached.coefficients",
+            "pillar.kgco2_distrib_server",
+            "pillar.kgco2_distrib_network",
+            "pillar.kgco2_distrib_terminal",
+            "pillar.allocation",
+        ):
+            self.assertEqual(snapshot["sections"][section]["calls"], 1, section)
+
+    def test_metrics_of_workers_are_merged(self):
+        metrics.enable()
+        campaign = digital_carbon_framework.Framework.load()
+        with parallel.pool(campaign, 2) as executor:
+            for _ in parallel.imap(executor, batch.bids_cost, [[1, 2], [3]], 2):
+                pass
+        entry_point = metrics.snapshot()["entry_points"]["batch.bids_cost"]
+        self.assertEqual((entry_point["calls"], entry_point["rows"]), (2, 3))
+
+    def test_to_prometheus(self):
+        metrics.enable()
+        campaign = digital_carbon_framework.Framework.load()
+        batch.impressions_cost(
+            campaign,
+            nb_impressions=[1, 10],
+            creative_type="display",
+            allocation="direct",
+            creative_size_ko=100,
+            desktop=1,
+            smart_phone=0,
+            tablet=0,
+            connected_tv=0,
+        )
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE carbon_rows_total counter\n", text)
+        self.assertIn(
+            'carbon_rows_total{entry_point="batch.impressions_cost"} 2\n', text
+        )
+        self.assertIn(
+            'carbon_section_calls_total{section="pillar.kgco2_distrib_terminal"} 1\n',
+            text,
+        )
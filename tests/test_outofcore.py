@@ -0,0 +1,112 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from carbon import batch, digital_carbon_framework, outofcore
+
+ROWS = 10
+
+
+class OutOfCoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = pathlib.Path(self.directory.name)
+        self.nb_impressions = np.arange(1, ROWS + 1, dtype=np.float64) * 1000
+        self.nb_impressions.tofile(self.path / "nb_impressions.f8")
+        self.creative_type = np.array(["video", "display"] * (ROWS // 2), dtype="S7")
+        self.creative_type.tofile(self.path / "creative_type.bin")
+        self.columns = {
+            "nb_impressions": self.path / "nb_impressions.f8",
+            "creative_type": outofcore.RawColumn(self.path / "creative_type.bin", "S7"),
+            "allocation": "programmatic",
+            "creative_size_ko": np.memmap(
+                self.path / "creative_size_ko.f8", np.float64, "w+", shape=(ROWS,)
+            ),
+            "desktop": 1,
+            "smart_phone": 2,
+            "tablet": 0,
+            "connected_tv": 1,
+        }
+        self.columns["creative_size_ko"][:] = 500
+
+    def test_matches_batch(self):
+        campaign = digital_carbon_framework.Framework.load()
+        output = outofcore.compute(
+            campaign, self.path / "costs", chunk_size=3, **self.columns
+        )
+        expected = batch.impressions_cost(
+            campaign,
+            **{
+                **self.columns,
+                "nb_impressions": self.nb_impressions,
+                "creative_type": self.creative_type.astype(str),
+            },
+        )
+        for name, column in expected.to_dict().items():
+            np.testing.assert_array_equal(output.costs.to_dict()[name], column)
+        np.testing.assert_array_equal(output.total, expected.overall.total)
+        self.assertIsInstance(output.total, np.memmap)
+
+    def test_resumes_from_the_last_completed_chunk(self):
+        campaign = digital_carbon_framework.Framework.load()
+        directory = self.path / "costs"
+        compute = batch.impressions_cost
+        calls = []
+
+        def interrupted(*args, **kwargs):
+            calls.append(kwargs["nb_impressions"][0])
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return compute(*args, **kwargs)
+
+        patch = mock.patch.dict(
+            outofcore.KINDS,
+            impressions=outofcore.KINDS["impressions"]._replace(function=interrupted),
+        )
+        with patch, self.assertRaises(KeyboardInterrupt):
+            outofcore.compute(campaign, directory, chunk_size=4, **self.columns)
+        self.assertEqual(calls, [1000, 5000, 9000])
+
+        calls.clear()
+        with patch:
+            output = outofcore.compute(
+                campaign, directory, chunk_size=4, **self.columns
+            )
+        self.assertEqual(calls, [9000])
+        np.testing.assert_array_equal(
+            output.total,
+            outofcore.compute(
+                campaign, self.path / "expected", chunk_size=4, **self.columns
+            ).total,
+        )
+
+        with self.assertRaisesRegex(ValueError, "another computation"):
+            outofcore.compute(campaign, directory, chunk_size=5, **self.columns)
+        self.assertTrue(os.path.exists(directory / outofcore.PROGRESS_FILE))
+
+    def test_rejects_changed_columns(self):
+        campaign = digital_carbon_framework.Framework.load()
+        directory = self.path / "bids"
+        outofcore.compute(campaign, directory, kind="bids", nb_bids=[1, 2, 3])
+        for changed in (
+            {"nb_bids": [100, 200, 300]},
+            {"nb_bids": [1, 2, 3], "country": "DE"},
+        ):
+            with self.assertRaisesRegex(ValueError, "another computation"):
+                outofcore.compute(campaign, directory, kind="bids", **changed)
+
+        outofcore.compute(campaign, self.path / "raw", **self.columns)
+        self.creative_type[::-1].tofile(self.path / "creative_type.bin")
+        os.utime(self.path / "creative_type.bin", ns=(0, 0))
+        with self.assertRaisesRegex(ValueError, "another computation"):
+            outofcore.compute(campaign, self.path / "raw", **self.columns)
+
+        outofcore.compute(campaign, self.path / "memmap", **self.columns)
+        self.columns["creative_size_ko"][0] = 600
+        with self.assertRaisesRegex(ValueError, "another computation"):
+            outofcore.compute(campaign, self.path / "memmap", **self.columns)
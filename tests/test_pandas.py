@@ -0,0 +1,90 @@
+import unittest
+
+import pandas as pd
+
+from carbon import digital_carbon_framework, parallel
+from carbon import pandas as carbon_pd
+from carbon.compute_footprints import adcalls_cost
+
+IMPRESSIONS = pd.DataFrame(
+    {
+        "nb_impressions": [10000, 10000, 1000, 123456],
+        "creative_type": ["video", "display", "video", "display"],
+        "allocation": ["direct", "programmatic", "direct", "direct"],
+        "creative_size_ko": [1200, 1200, 5000, 30.5],
+        "creative_avg_view_s": [5, 5, 3, 0.25],
+        "desktop": [10, 10, 0, 1],
+        "smart_phone": [20, 20, 1.0, 0],
+        "tablet": [5, 5, 0, 0],
+        "connected_tv": [20, 20, 1, 0],
+    },
+    index=[3, 1, 4, 1],
+)
+
+
+class PandasTest(unittest.TestCase):
+    def test_impressions_cost_matches_row_wise(self):
+        campaign = digital_carbon_framework.Framework.load()
+        expected = IMPRESSIONS.aggregate(
+            carbon_pd.get_impressions_cost_aggregator(campaign), axis="columns"
+        )
+        pd.testing.assert_series_equal(
+            carbon_pd.impressions_cost(IMPRESSIONS, campaign),
+            expected,
+            check_exact=True,
+        )
+
+    def test_bids_cost_matches_row_wise(self):
+        campaign = digital_carbon_framework.Framework.load()
+        df = pd.DataFrame({"nb_bids": [1, 10000, 0, 7]})
+        expected = df.aggregate(
+            carbon_pd.get_bids_cost_aggregator(campaign), axis="columns"
+        )
+        pd.testing.assert_series_equal(
+            carbon_pd.bids_cost(df, campaign), expected, check_exact=True
+        )
+
+    def test_adcalls_cost(self):
+        campaign = digital_carbon_framework.Framework.load()
+        df = pd.DataFrame(
+            {"nb_ad_calls": [10000, 3], "creative_type": ["video", "display"]}
+        )
+        costs = carbon_pd.adcalls_cost(df, campaign)
+        for i, row in df.iterrows():
+            self.assertEqual(
+                costs[i],
+                adcalls_cost(
+                    campaign,
+                    nb_ad_calls=row["nb_ad_calls"],
+                    creative_type=row["creative_type"],
+                ).overall.total,
+            )
+
+    def test_impressions_cost_per_row_country(self):
+        campaign = digital_carbon_framework.Framework.load()
+        df = IMPRESSIONS.assign(country=["DE", "FR", "USA", "FR"])
+        costs = carbon_pd.impressions_cost(df, campaign, country_column="country")
+        germany = digital_carbon_framework.Framework.load()
+        germany.change_target_country("DE")
+        self.assertEqual(
+            costs.iloc[0], carbon_pd.impressions_cost(IMPRESSIONS, germany).iloc[0]
+        )
+        self.assertEqual(
+            costs.iloc[1], carbon_pd.impressions_cost(IMPRESSIONS, campaign).iloc[1]
+        )
+
+    def test_parallel(self):
+        campaign = digital_carbon_framework.Framework.load()
+        df = IMPRESSIONS.assign(country=["DE", "FR", "USA", "FR"], nb_bids=[1, 2, 3, 4])
+        for function, country_column, fork in (
+            (carbon_pd.impressions_cost, None, parallel.CAN_FORK),
+            (carbon_pd.impressions_cost, "country", parallel.CAN_FORK),
+            (carbon_pd.bids_cost, "country", False),
+        ):
+            pd.testing.assert_series_equal(
+                function(
+                    df, campaign, country_column, workers=2, chunk_size=3, fork=fork
+                ),
+                function(df, campaign, country_column),
+                check_exact=True,
+            )
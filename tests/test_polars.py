@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from carbon import batch, digital_carbon_framework
+
+try:
+    import polars as pl
+
+    from carbon import polars as carbon_pl
+except ImportError:
+    pl = None
+
+COLUMNS = {
+    "nb_impressions": [10000, 10000, 1000],
+    "creative_type": ["video", "display", "video"],
+    "allocation": ["direct", "programmatic", "programmatic"],
+    "creative_size_ko": [1200.0, 1200.0, 5000.0],
+    "creative_avg_view_s": [3.0, 3.0, 15.0],
+    "desktop": [10.0, 10.0, 0.0],
+    "smart_phone": [20.0, 20.0, 1.0],
+    "tablet": [5.0, 5.0, 0.0],
+    "connected_tv": [20.0, 20.0, 1.0],
+    "country": ["FR", "deu", "United States"],
+}
+
+
+@unittest.skipIf(pl is None, "polars is not installed")
+class PolarsTest(unittest.TestCase):
+    def test_impressions_match_batch(self):
+        campaign = digital_carbon_framework.Framework.load()
+        frame = (
+            pl.LazyFrame(COLUMNS)
+            .with_columns(
+                *carbon_pl.impressions_expressions(campaign, country_column="country"),
+                carbon_pl.impressions_cost(campaign, country_column="country"),
+            )
+            .collect()
+        )
+        expected = batch.impressions_cost(
+            campaign, **{**COLUMNS, "country": ["FR", "DEU", "US"]}
+        )
+        for name, column in expected.to_dict().items():
+            np.testing.assert_array_equal(frame[name].to_numpy(), column)
+        np.testing.assert_array_equal(
+            frame[carbon_pl.TOTAL_COLUMN].to_numpy(), expected.overall.total
+        )
+
+    def test_bids_and_adcalls_match_batch(self):
+        campaign = digital_carbon_framework.Framework.load()
+        frame = pl.DataFrame(
+            {
+                "bids": [10, 1000],
+                "nb_ad_calls": [5, 7],
+                "creative_type": ["video", "display"],
+            }
+        ).with_columns(
+            carbon_pl.bids_cost(campaign, columns={"nb_bids": "bids"}).alias(
+                "bids_kgco2"
+            ),
+            carbon_pl.adcalls_cost(campaign),
+        )
+        np.testing.assert_array_equal(
+            frame["bids_kgco2"].to_numpy(),
+            batch.bids_cost(campaign, nb_bids=[10, 1000]).overall.total,
+        )
+        np.testing.assert_array_equal(
+            frame[carbon_pl.TOTAL_COLUMN].to_numpy(),
+            batch.adcalls_cost(
+                campaign, nb_ad_calls=[5, 7], creative_type=["video", "display"]
+            ).overall.total,
+        )
+
+    def test_with_costs_resolves_countries_once(self):
+        campaign = digital_carbon_framework.Framework.load()
+        frame = pl.LazyFrame(
+            {
+                "nb_bids": [10, 10, 10, 10],
+                "country": ["0276", " de", "FR", "united   states"],
+            }
+        )
+        result = carbon_pl.with_costs(
+            frame, campaign, "bids", country_column="country", details=True
+        ).collect()
+        self.assertEqual(
+            result.columns,
+            [
+                "nb_bids",
+                "country",
+                "kgco2_allocation_network_use",
+                "kgco2_allocation_network_manufacturing",
+                "kgco2_allocation_server_use",
+                "kgco2_allocation_server_manufacturing",
+                carbon_pl.TOTAL_COLUMN,
+            ],
+        )
+        np.testing.assert_array_equal(
+            result[carbon_pl.TOTAL_COLUMN].to_numpy(),
+            batch.bids_cost(
+                campaign, nb_bids=10, country=["DE", "DE", "FR", "US"]
+            ).overall.total,
+        )
+        with self.assertRaisesRegex(KeyError, "Countries not referenced"):
+            carbon_pl.with_costs(
+                pl.DataFrame({"nb_bids": [1], "country": ["Atlantis"]}),
+                campaign,
+                "bids",
+                country_column="country",
+            )
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from carbon import batch, digital_carbon_framework, sensitivity
+
+CAMPAIGNS = {
+    "nb_impressions": [1e6, 1e4],
+    "creative_type": ["display", "video"],
+    "allocation": ["programmatic", "direct"],
+    "creative_size_ko": 1e3,
+    "creative_avg_view_s": 1,
+    "desktop": 1,
+    "smart_phone": 2,
+    "tablet": 0,
+    "connected_tv": 1,
+}
+
+
+class SensitivityTest(unittest.TestCase):
+    def test_derivatives_match_finite_differences(self):
+        campaign = digital_carbon_framework.Framework.load()
+        result = sensitivity.impressions_cost(campaign, **CAMPAIGNS)
+        self.assertEqual(
+            result.derivatives["overall"].shape, (2, len(result.parameters))
+        )
+        np.testing.assert_array_equal(
+            result.totals["overall"],
+            batch.impressions_cost(campaign, **CAMPAIGNS).overall.total,
+        )
+
+        for name in (
+            "allocation_network_use.uncertainty_margin",
+            "allocation_network_servers.nb_paths_display",
+            "distribution_terminal_manufacturing.tv_average_lifetime_years",
+        ):
+            group, parameter = name.split(".")
+            value = getattr(getattr(campaign, group), parameter)
+            step = 1 if isinstance(value, int) else value * 0.001
+            perturbed = campaign.with_overrides(**{group: {parameter: value + step}})
+            expected = (
+                batch.impressions_cost(perturbed, **CAMPAIGNS).overall.total
+                - result.totals["overall"]
+            ) / step
+            np.testing.assert_allclose(
+                result.derivatives["overall"][:, result.parameters.index(name)],
+                expected,
+                rtol=1e-3,
+                atol=1e-9,
+            )
+
+    def test_elasticities_of_a_single_campaign(self):
+        campaign = digital_carbon_framework.Framework.load()
+        result = sensitivity.bids_cost(campaign, nb_bids=1000)
+        elasticities = result.elasticities["kgco2_allocation_network"]
+        self.assertEqual(elasticities.shape, (len(result.parameters),))
+        # The allocation network cost is proportional to the number of requests per path.
+        self.assertAlmostEqual(
+            elasticities[
+                result.parameters.index(
+                    "allocation_network_use.nb_requests_per_active_path"
+                )
+            ],
+            campaign.kgco2_allocation_network.use
+            / campaign.kgco2_allocation_network.total,
+        )
+        _, elasticity = result.ranked()[0]
+        self.assertEqual(abs(elasticity), max(np.abs(result.elasticities["overall"])))
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from carbon import batch, digital_carbon_framework, server
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.campaign = digital_carbon_framework.Framework.load()
+        self.service = server.Server(self.campaign, max_batch_size=8, max_wait=0.05)
+        self.server = await self.service.start("127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _post(self, path: str, payload) -> tuple[int, dict]:
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode()
+            + body
+        )
+        response = await reader.read()
+        writer.close()
+        head, _, content = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(content)
+
+    async def test_concurrent_requests_are_batched(self):
+        responses = await asyncio.gather(
+            *(self._post("/bids", {"nb_bids": n}) for n in range(1, 6)),
+            self._post("/bids", {"nb_bids": 3, "country": "DE"}),
+        )
+        expected = batch.bids_cost(
+            self.campaign, nb_bids=[1, 2, 3, 4, 5, 3], country=[*["FR"] * 5, "DE"]
+        )
+        for i, (status, costs) in enumerate(responses):
+            self.assertEqual(status, 200)
+            self.assertEqual(costs["overall"]["use"], expected.overall.use[i])
+        self.assertEqual(self.service.batchers["bids"].batches, 1)
+
+    async def test_invalid_requests_are_isolated(self):
+        valid = {"nb_ad_calls": 10, "creative_type": "video"}
+        (status, costs), (error, message), (unknown, _) = await asyncio.gather(
+            self._post("/adcalls", valid),
+            self._post("/adcalls", {"nb_ad_calls": 10, "creative_type": "audio"}),
+            self._post("/adcalls", {**valid, "country": "XX"}),
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            costs["kgco2_allocation_network"]["use"],
+            float(
+                batch.adcalls_cost(self.campaign, **valid).kgco2_allocation_network.use
+            ),
+        )
+        self.assertEqual(error, 400)
+        self.assertIn("creative_type", message["error"])
+        self.assertEqual(unknown, 400)
+        # Invalid rows are answered before being batched with the valid ones.
+        self.assertEqual(self.service.batchers["adcalls"].objects, 1)
+
+    async def test_list_of_objects(self):
+        status, costs = await self._post(
+            "/impressions",
+            [
+                {
+                    "nb_impressions": 1000,
+                    "creative_type": "video",
+                    "allocation": "direct",
+                    "creative_size_ko": 1200,
+                    "desktop": 1,
+                    "smart_phone": 0,
+                    "tablet": 0,
+                    "connected_tv": 0,
+                }
+            ]
+            * 3,
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(len(costs), 3)
+        self.assertEqual(len(costs[0]), 6)
+        status, _ = await self._post("/unknown", {})
+        self.assertEqual(status, 404)
+
+    async def test_non_scalar_fields_are_rejected(self):
+        status, message = await self._post("/bids", {"nb_bids": [1, 2]})
+        self.assertEqual(status, 400)
+        self.assertIn("nb_bids", message["error"])
+        status, _ = await self._post("/bids", [{"nb_bids": 1, "country": {"a": 1}}])
+        self.assertEqual(status, 400)
+
+    async def test_null_and_non_finite_numbers_are_rejected(self):
+        for value in (None, float("nan"), float("inf"), "10", True):
+            status, message = await self._post("/bids", {"nb_bids": value})
+            self.assertEqual(status, 400)
+            self.assertIn("must be a finite number", message["error"])
+        status, message = await self._post(
+            "/impressions",
+            {
+                "nb_impressions": 1000,
+                "creative_type": "display",
+                "allocation": "direct",
+                "creative_size_ko": 1200,
+                "desktop": 0,
+                "smart_phone": 0,
+                "tablet": 0,
+                "connected_tv": 0,
+            },
+        )
+        self.assertEqual(
+            (status, message["error"]), (400, "At least one weight must be non-null")
+        )
+        self.assertEqual(self.service.batchers["bids"].objects, 0)
+
+    async def test_unexpected_errors_answer_500(self):
+        with (
+            mock.patch.object(
+                server, "compute", side_effect=FloatingPointError("overflow")
+            ),
+            self.assertLogs(level="ERROR"),
+        ):
+            status, message = await self._post("/bids", {"nb_bids": 1})
+        self.assertEqual(status, 500)
+        self.assertEqual(message, {"error": "Internal server error"})
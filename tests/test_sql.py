@@ -0,0 +1,97 @@
+import sqlite3
+import unittest
+
+from carbon import digital_carbon_framework, sql
+from carbon.compute_footprints import impressions_cost
+
+ROWS = [
+    (1, 10000, "video", "direct", 1200, 5, 10, 20, 5, 20),
+    (2, 10000, "display", "programmatic", 1200, 5, 10, 20, 5, 20),
+    (3, 1000, "video", "programmatic", 5000, 3, 0, 1.0, 0, 1),
+    (4, 123456, "display", "direct", 30.5, 0.25, 1, 0, 0, 0),
+    (5, 7, "display", "programmatic", 1e6, 12, 0.3, 0.3, 0.3, 0.1),
+]
+
+
+class SqlTest(unittest.TestCase):
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(":memory:")
+        self.addCleanup(connection.close)
+        connection.execute(
+            "CREATE TABLE impressions (campaign_id INTEGER, nb_impressions INTEGER, creative_type TEXT,"
+            " allocation TEXT, size REAL, creative_avg_view_s REAL,"
+            " desktop REAL, smart_phone REAL, tablet INTEGER, connected_tv REAL)"
+        )
+        connection.executemany(
+            "INSERT INTO impressions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", ROWS
+        )
+        return connection
+
+    def test_view_matches_impressions_cost(self):
+        campaign = digital_carbon_framework.Framework.load()
+        connection = self._connect()
+        connection.execute(
+            sql.impressions_view(
+                campaign,
+                "impressions",
+                country="DE",
+                columns={"creative_size_ko": "size"},
+            )
+        )
+        cursor = connection.execute(
+            "SELECT * FROM impressions_cost ORDER BY campaign_id"
+        )
+        names = [description[0] for description in cursor.description]
+        german = campaign.with_country("DE")
+        for row, values in zip(ROWS, cursor):
+            result = dict(zip(names, values))
+            expected = impressions_cost(
+                german,
+                nb_impressions=row[1],
+                creative_type=row[2],
+                allocation=row[3],
+                creative_size_ko=row[4],
+                creative_avg_view_s=row[5],
+                devices_repartition=digital_carbon_framework.Distribution(
+                    weights=dict(zip(sql.DEVICES, row[6:]))
+                ),
+                as_model=False,
+            )
+            for pillar, cost in zip(expected._fields, expected):
+                self.assertEqual(result[f"{pillar}_use"], cost.use)
+                self.assertEqual(result[f"{pillar}_manufacturing"], cost.manufacturing)
+            self.assertEqual(result["kgco2"], expected.overall.total)
+
+    def test_select_from_subquery(self):
+        campaign = digital_carbon_framework.Framework.load()
+        connection = self._connect()
+        select = sql.impressions_select(
+            campaign,
+            "(SELECT * FROM impressions WHERE campaign_id > 3)",
+            columns={"creative_size_ko": "size"},
+        )
+        self.assertNotIn("SELECT *,", select)
+        totals = connection.execute(
+            f"SELECT campaign_id, kgco2 FROM ({select}) AS costs ORDER BY campaign_id"
+        ).fetchall()
+        self.assertEqual([campaign_id for campaign_id, _ in totals], [4, 5])
+        self.assertEqual(
+            totals[0][1],
+            impressions_cost(
+                campaign,
+                nb_impressions=123456,
+                creative_type="display",
+                allocation="direct",
+                creative_size_ko=30.5,
+                creative_avg_view_s=0.25,
+                devices_repartition=digital_carbon_framework.Distribution(
+                    weights={"desktop": 1}
+                ),
+            ).overall.total,
+        )
+
+    def test_literals_round_trip(self):
+        connection = self._connect()
+        for value in (0.1, 1 / 3, 1e-300, 12345678901234567.0, 2):
+            (parsed,) = connection.execute(f"SELECT {sql.literal(value)}").fetchone()
+            self.assertEqual(parsed, value)
@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from carbon import batch, cli, digital_carbon_framework, streaming
+
+CSV = """id,nb_impressions,creative_type,allocation,creative_size_ko,desktop,smart_phone,tablet,connected_tv,country
+a,10000,video,direct,1200,10,20,5,20,FR
+b,10000,display,programmatic,1200,10,20,5,20,DEU
+c,1000,video,direct,5000,0,1,0,1,US
+"""
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self):
+        self.campaign = digital_carbon_framework.Framework.load()
+        self.expected = batch.impressions_cost(
+            self.campaign,
+            nb_impressions=[10000, 10000, 1000],
+            creative_type=["video", "display", "video"],
+            allocation=["direct", "programmatic", "direct"],
+            creative_size_ko=[1200, 1200, 5000],
+            desktop=[10, 10, 0],
+            smart_phone=[20, 20, 1],
+            tablet=[5, 5, 0],
+            connected_tv=[20, 20, 1],
+            country=["FR", "DEU", "US"],
+        ).overall.total.tolist()
+
+    def _stream(self, source: str, scorer: streaming.ChunkScorer, **kwargs) -> str:
+        destination = io.StringIO()
+        streaming.stream(
+            self.campaign, io.StringIO(source), destination, scorer, **kwargs
+        )
+        return destination.getvalue()
+
+    def test_stream_csv_by_chunks(self):
+        header, records = CSV.split("\n", 1)
+        scorer = streaming.ChunkScorer(
+            fieldnames=tuple(header.split(",")),
+            country_field="country",
+            keep=("id",),
+        )
+        for workers in (0, 1):
+            results = self._stream(records, scorer, chunk_size=2, workers=workers)
+            self.assertEqual(
+                results.splitlines(),
+                ["id,kgco2"]
+                + [f"{i},{total!r}" for i, total in zip("abc", self.expected)],
+            )
+
+    def test_stream_csv_quoted_newlines(self):
+        header, records = CSV.split("\n", 1)
+        records = records.replace("a,", '"first\nline",', 1)
+        scorer = streaming.ChunkScorer(
+            fieldnames=tuple(header.split(",")), country_field="country", keep=("id",)
+        )
+        for chunk_size in (1, 2):
+            results = self._stream(records, scorer, chunk_size=chunk_size)
+            self.assertEqual(
+                results.splitlines()[1:3],
+                ['"first', f'line",{self.expected[0]!r}'],
+            )
+
+    def test_stream_jsonl(self):
+        header, *records = CSV.splitlines()
+        source = "".join(
+            json.dumps(dict(zip(header.split(","), record.split(",")))) + "\n"
+            for record in records
+        )
+        scorer = streaming.ChunkScorer(
+            input_format="jsonl",
+            output_format="jsonl",
+            country_field="country",
+            details=True,
+        )
+        results = [
+            json.loads(line) for line in self._stream(source, scorer).splitlines()
+        ]
+        self.assertEqual([r["kgco2"] for r in results], self.expected)
+        self.assertEqual(len(results[0]), 11)
+
+    def test_stream_reports_invalid_chunk(self):
+        scorer = streaming.ChunkScorer(
+            kind="bids", input_format="jsonl", output_format="jsonl"
+        )
+        source = '{"nb_bids": 1}\n{"nb_bids": 1}\n{"nb_bids": 1}\n{"other": 1}\n'
+        with self.assertRaisesRegex(
+            ValueError, r"record 2: Missing value of nb_bids \(invalid rows: \[1\]"
+        ):
+            self._stream(source, scorer, chunk_size=2)
+
+        source = '{"nb_bids": 1}\n{"nb_bids": 1}\n{"nb_bids": 1}\n{"nb_bids":\n'
+        for workers in (0, 1):
+            with self.assertRaisesRegex(ValueError, "record 2: Expecting value"):
+                self._stream(source, scorer, chunk_size=2, workers=workers)
+
+    def test_cli_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "impressions.csv")
+            destination = os.path.join(directory, "costs.jsonl.gz")
+            with open(source, "w") as file:
+                file.write(CSV)
+            cli.main(["batch", source, "-o", destination, "--country-field", "country"])
+            with streaming.open_text(destination) as file:
+                results = [json.loads(line)["kgco2"] for line in file]
+        self.assertEqual(results, self.expected)
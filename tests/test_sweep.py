@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from carbon import digital_carbon_framework, sweep
+from carbon.compute_footprints import impressions_cost
+
+DESKTOP = digital_carbon_framework.Distribution(weights={"desktop": 1})
+MIX = digital_carbon_framework.Distribution(
+    weights={"desktop": 1, "smart_phone": 2, "connected_tv": 1}
+)
+
+
+class SweepTest(unittest.TestCase):
+    def test_cartesian_product_matches_scalar(self):
+        campaign = digital_carbon_framework.Framework.load()
+        result = sweep.impressions_cost(
+            campaign,
+            nb_impressions=1e4,
+            creative_type=["display", "video"],
+            allocation="programmatic",
+            creative_size_ko=[10, 500, 2000],
+            creative_avg_view_s=2,
+            country=["FR", "DE"],
+            devices_repartition={"desktop": DESKTOP, "mix": MIX},
+        )
+        self.assertEqual(result.total.shape, (2, 3, 2, 2))
+        self.assertEqual(list(result.axes["devices_repartition"]), ["desktop", "mix"])
+        for creative_type, size, country, devices in np.ndindex(result.shape):
+            expected = impressions_cost(
+                campaign.with_country(result.axes["country"][country]),
+                nb_impressions=1e4,
+                creative_type=result.axes["creative_type"][creative_type],
+                allocation="programmatic",
+                creative_size_ko=result.axes["creative_size_ko"][size],
+                creative_avg_view_s=2,
+                devices_repartition=(DESKTOP, MIX)[devices],
+            )
+            self.assertEqual(
+                result.total[creative_type, size, country, devices],
+                expected.overall.total,
+            )
+
+    def test_to_frame(self):
+        campaign = digital_carbon_framework.Framework.load()
+        result = sweep.bids_cost(campaign, nb_bids=[1, 10, 100], country=["FR", "DE"])
+        df = result.to_frame()
+        self.assertEqual(df.index.names, ["nb_bids", "country"])
+        self.assertEqual(len(df), 6)
+        self.assertEqual(df.loc[(10, "DE"), "total"], result.total[1, 1])
+
+    def test_sweep_parameters(self):
+        campaign = digital_carbon_framework.Framework.load()
+        result = sweep.impressions_cost(
+            campaign,
+            parameters={
+                "allocation_network_use": {"nb_requests_per_active_path": [4, 6]},
+                "distribution_terminal_use": {"desktop_average_power_watt": 60},
+            },
+            nb_impressions=1e4,
+            creative_type="display",
+            allocation="programmatic",
+            creative_size_ko=[10, 500],
+            creative_avg_view_s=2,
+            country=["FR", "DE", "USA"],
+            devices_repartition=MIX,
+        )
+        self.assertEqual(
+            list(result.axes),
+            [
+                "creative_size_ko",
+                "country",
+                "allocation_network_use.nb_requests_per_active_path",
+            ],
+        )
+        self.assertEqual(result.total.shape, (2, 3, 2))
+        for size, country, paths in np.ndindex(result.shape):
+            expected = impressions_cost(
+                campaign.with_country(result.axes["country"][country]).with_overrides(
+                    allocation_network_use={
+                        "nb_requests_per_active_path": (4, 6)[paths]
+                    },
+                    distribution_terminal_use={"desktop_average_power_watt": 60},
+                ),
+                nb_impressions=1e4,
+                creative_type="display",
+                allocation="programmatic",
+                creative_size_ko=result.axes["creative_size_ko"][size],
+                creative_avg_view_s=2,
+                devices_repartition=MIX,
+            )
+            self.assertAlmostEqual(
+                result.total[size, country, paths], expected.overall.total, places=12
+            )
+
+        bids = sweep.bids_cost(
+            campaign,
+            parameters={"allocation_network_use": {"uncertainty_margin": {"low": 0.1}}},
+            nb_bids=[1, 10],
+        )
+        self.assertEqual(
+            bids.to_frame().index.names,
+            ["nb_bids", "allocation_network_use.uncertainty_margin"],
+        )
+        with self.assertRaisesRegex(TypeError, "has no parameter 'unknown'"):
+            sweep.bids_cost(
+                campaign, parameters={"allocation_servers_use": {"unknown": 1}}
+            )
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from carbon import batch, digital_carbon_framework, timeseries
+from carbon.compute_footprints import bids_cost
+
+TIMELINE = timeseries.EmissionFactorTimeline.from_columns(
+    country=["FR", "DE", "FR", "FR", "DE"],
+    start=["2024-01-01T12:00", "2024-01-01", "2024-01-01", "2024-02-01", "2024-03-01"],
+    emission_factor=[0.06, 0.4, 0.05, 0.07, 0.3],
+)
+
+
+class EmissionFactorTimelineTest(unittest.TestCase):
+    def test_lookup(self):
+        np.testing.assert_array_equal(
+            TIMELINE.lookup(
+                ["FR", "FR", "FR", "FR", "DE", "DE"],
+                [
+                    "2024-01-01T11:59:59",
+                    "2024-01-01T12:00",
+                    "2024-06-01",
+                    "2030-01-01",
+                    "2024-01-01",
+                    "2024-03-01T00:00:01",
+                ],
+            ),
+            [0.05, 0.06, 0.07, 0.07, 0.4, 0.3],
+        )
+        self.assertEqual(TIMELINE.emission_factor("DE", "2024-02-29"), 0.4)
+
+        with self.assertRaisesRegex(
+            KeyError, r"\['ES', 'IT'\], total: 2 codes in 3 rows"
+        ):
+            TIMELINE.lookup(["IT", "ES", "fra", "IT"], "2024-06-01")
+        with self.assertRaisesRegex(ValueError, r"invalid rows: \[1\]"):
+            TIMELINE.lookup(["DE", "FR"], ["2024-06-01", "2023-12-31T23:59"])
+        with self.assertRaisesRegex(ValueError, "same start"):
+            timeseries.EmissionFactorTimeline.from_columns(
+                ["FR", "FR"], ["2024-01-01", "2024-01-01T00:00"], [0.05, 0.06]
+            )
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "emission_factors.csv")
+            with open(path, "w") as file:
+                file.write("country,start,emission_factor\nFR,2024-01-01,0.05\n")
+                file.write("FR,2024-02-01,0.07\nDE,2024-01-01,0.4\n")
+            timeline = timeseries.EmissionFactorTimeline.load(path)
+        np.testing.assert_array_equal(
+            timeline.lookup(["FR", "DE"], "2024-02-01"), [0.07, 0.4]
+        )
+
+    def test_batch_matches_scalar(self):
+        campaign = digital_carbon_framework.Framework.load()
+        countries = ["FR", "DE", "FR", "FR"]
+        timestamps = np.array(
+            ["2024-01-01T06:00", "2024-06-01", "2024-01-10", "2024-05-01"],
+            dtype="datetime64[s]",
+        )
+        costs = batch.bids_cost(
+            TIMELINE.coefficients(campaign, countries, timestamps),
+            nb_bids=[1e6, 1e5, 1e4, 1e3],
+        )
+        for row, (country, timestamp) in enumerate(zip(countries, timestamps)):
+            expected = bids_cost(
+                TIMELINE.framework_at(campaign, country, timestamp),
+                nb_bids=[1e6, 1e5, 1e4, 1e3][row],
+            )
+            self.assertEqual(costs.row(row), expected)
@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from carbon import batch, digital_carbon_framework, uncertainty
+
+CAMPAIGNS = {
+    "nb_impressions": [1e6, 1e4],
+    "creative_type": ["display", "video"],
+    "allocation": "programmatic",
+    "creative_size_ko": 1e3,
+    "creative_avg_view_s": 1,
+    "desktop": 1,
+    "smart_phone": 0,
+    "tablet": 0,
+    "connected_tv": 0,
+}
+
+
+class UncertaintyTest(unittest.TestCase):
+    def test_without_distributions_matches_batch(self):
+        campaign = digital_carbon_framework.Framework.load()
+        summary = uncertainty.impressions_cost(campaign, {}, samples=10, **CAMPAIGNS)
+        expected = batch.impressions_cost(campaign, **CAMPAIGNS).overall.total
+        self.assertEqual(summary.totals["overall"].shape, (2, 3))
+        np.testing.assert_allclose(
+            summary.totals["overall"], np.column_stack([expected] * 3)
+        )
+
+    def test_percentiles_of_sampled_parameters(self):
+        campaign = digital_carbon_framework.Framework.load()
+        margin = campaign.allocation_network_use.uncertainty_margin
+        distributions = {
+            "allocation_network_use": {
+                "uncertainty_margin": uncertainty.Uniform(margin - 0.1, margin + 0.1)
+            }
+        }
+        summary = uncertainty.bids_cost(
+            campaign, distributions, seed=0, percentiles=(0, 50, 100), nb_bids=1000
+        )
+        network = summary.totals["kgco2_allocation_network"][()]
+        expected = batch.bids_cost(campaign, nb_bids=1000).kgco2_allocation_network
+        self.assertLess(network[0], expected.total)
+        self.assertGreater(network[2], expected.total)
+        self.assertAlmostEqual(network[1] / expected.total, 1, places=2)
+        np.testing.assert_array_equal(
+            uncertainty.bids_cost(
+                campaign, distributions, seed=0, percentiles=(0, 50, 100), nb_bids=1000
+            ).totals["overall"],
+            summary.totals["overall"],
+        )
+
+        with self.assertRaisesRegex(TypeError, "no parameter 'margin'"):
+            uncertainty.bids_cost(
+                campaign, {"allocation_network_use": {"margin": None}}, nb_bids=1
+            )
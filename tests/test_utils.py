@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from carbon import utils
+
+
+class LoadYamlTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = os.path.join(directory.name, "cache")
+        self.path = os.path.join(directory.name, "config.yml")
+
+    def _write(self, content: str):
+        with open(self.path, "w") as file:
+            file.write(content)
+
+    def test_compiled_cache(self):
+        with mock.patch.dict(os.environ, {"CARBON_CACHE_DIR": self.cache_dir}):
+            self._write("a:\n  b: 1.5\n")
+            self.assertEqual(utils.load_yaml(self.path), {"a": {"b": 1.5}})
+            self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+            with mock.patch.object(utils.yaml, "load") as load:
+                self.assertEqual(utils.load_yaml(self.path), {"a": {"b": 1.5}})
+            load.assert_not_called()
+
+            self._write("a:\n  b: 2\n")
+            self.assertEqual(utils.load_yaml(self.path), {"a": {"b": 2}})
+            self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_cache_disabled(self):
+        with mock.patch.dict(os.environ, {"CARBON_CACHE_DIR": ""}):
+            self._write("- FR\n")
+            self.assertEqual(utils.load_yaml(self.path), ["FR"])
+        self.assertFalse(os.path.exists(self.cache_dir))